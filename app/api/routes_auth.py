@@ -4,13 +4,17 @@ from typing import Optional
 import os
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
-from sqlmodel import Session, select
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User
+from app.services.auth_cache import Principal, principal_cache
+from app.services.model_router import set_user_tier
+from app.services.password_hashing import hash_password, verify_and_update
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
@@ -23,10 +27,19 @@ JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "CHANGE_ME_SUPER_SECRET")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+# Password hashing settings and the hashing worker pool live in
+# app/services/password_crypto.py and app/services/password_hashing.py
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Accounts allowed to see operational endpoints (e.g. /health/models),
+# comma-separated emails; empty = nobody
+ADMIN_EMAILS = {
+    email.strip().lower()
+    for email in os.getenv("ADMIN_EMAILS", "").split(",")
+    if email.strip()
+}
+
 
 # =========================
 # Pydantic Schemas
@@ -53,18 +66,6 @@ class Token(BaseModel):
     token_type: str
 
 
-# =========================
-# Password Helpers
-# =========================
-
-def hash_password(plain_password: str) -> str:
-    return pwd_context.hash(plain_password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
 # =========================
 # JWT Helpers
 # =========================
@@ -78,13 +79,15 @@ def create_access_token(
         expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode.update({"exp": expire})
+    from jose import jwt  # ~85 ms to import; only on first use
+
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -92,20 +95,49 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
         subject: str | None = payload.get("sub")
         if subject is None:
             raise credentials_exception
         email = subject
+        # Tokens issued before the "uid" claim existed only have the email
+        user_id = payload.get("uid")
+        if user_id is not None and not isinstance(user_id, int):
+            raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    statement = select(User).where(User.email == email)
-    user = db.exec(statement).first()
-    if not user:
+    # Most requests are answered from the principal cache, without the DB
+    cache_key = user_id if user_id is not None else email
+    principal = principal_cache.get(cache_key)
+    if principal is None:
+        if user_id is not None:
+            user = await db.get(User, user_id)
+        else:
+            user = (await db.exec(select(User).where(User.email == email))).first()
+        if not user:
+            raise credentials_exception
+        principal = Principal.from_user(user)
+        principal_cache.set(cache_key, principal)
+
+    # The token is for whoever had this email when it was issued
+    if principal.email != email:
         raise credentials_exception
 
+    # The AI calls of this request use the models for the user's tier
+    set_user_tier(principal.tier)
+    return principal.to_user()
+
+
+async def get_admin_user(user: User = Depends(get_current_user)) -> User:
+    if user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required.",
+        )
     return user
 
 
@@ -114,25 +146,38 @@ async def get_current_user(
 # =========================
 
 @router.post("/signup", response_model=UserRead)
-def signup(user_in: UserCreate, db: Session = Depends(get_db)) -> UserRead:
+async def signup(
+    user_in: UserCreate,
+    db: AsyncSession = Depends(get_async_db),
+) -> UserRead:
+    email_taken = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Email is already registered.",
+    )
+
     # Check if user already exists
     existing_stmt = select(User).where(User.email == user_in.email)
-    existing_user = db.exec(existing_stmt).first()
+    existing_user = (await db.exec(existing_stmt)).first()
     if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email is already registered.",
-        )
+        raise email_taken
+
+    # Give the DB connection back while the password is hashed
+    await db.rollback()
+    hashed = await hash_password(user_in.password)
 
     # Create user
-    hashed = hash_password(user_in.password)
     user = User(
         email=user_in.email,
         hashed_password=hashed,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Someone signed up with the same email while we were hashing
+        await db.rollback()
+        raise email_taken
+    await db.refresh(user)
 
     return UserRead(
         id=user.id,
@@ -142,23 +187,37 @@ def signup(user_in: UserCreate, db: Session = Depends(get_db)) -> UserRead:
 
 
 @router.post("/login", response_model=Token)
-def login(user_in: UserLogin, db: Session = Depends(get_db)) -> Token:
+async def login(
+    user_in: UserLogin,
+    db: AsyncSession = Depends(get_async_db),
+) -> Token:
     stmt = select(User).where(User.email == user_in.email)
-    user = db.exec(stmt).first()
+    user = (await db.exec(stmt)).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password.",
         )
+    user_id, email, stored_hash = user.id, user.email, user.hashed_password
 
-    if not verify_password(user_in.password, user.hashed_password):
+    # Give the DB connection back while the password is checked
+    await db.rollback()
+    valid, new_hash = await verify_and_update(user_in.password, stored_hash)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password.",
         )
 
+    if new_hash is not None:
+        # Stored with older hash settings: upgrade it while we have the password
+        await db.exec(
+            update(User).where(User.id == user_id).values(hashed_password=new_hash)
+        )
+        await db.commit()
+
     access_token = create_access_token(
-        data={"sub": user.email}
+        data={"sub": email, "uid": user_id}
     )
 
     return Token(
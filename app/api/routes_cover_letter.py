@@ -1,24 +1,37 @@
-from typing import Any, Dict
-import json
+from typing import AsyncIterator, List, Optional
 import logging
 
-from app.services.usage_limits import check_and_record_usage
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from openai import OpenAI
-from sqlmodel import Session, select
+from sqlmodel import Session
 
 from app.database import get_db
-from app.models import User, Resume
+from app.models import User
 from app.api.routes_auth import get_current_user
+from app.services.job_descriptions import resolve_job_text
+from app.services.llm_cache import get_cached, make_cache_key, set_cached
+from app.services.llm_gateway import stream_chat_completion
+from app.services.model_router import cache_model_key
+from app.services.prompt_builder import fit_prompt_inputs
+from app.services.resume_selection import select_resume
+from app.services.streaming import JsonFieldStreamer, sse_event
+from app.services.structured_output import (
+    StructuredOutputError,
+    generate_structured,
+    json_schema_format,
+    parse_structured,
+    repair_structured,
+    validate_structured,
+)
+from app.services.usage_limits import UsageReservation
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/cover-letter", tags=["cover-letter"])
 
-# OpenAI client (uses OPENAI_API_KEY from environment)
-client = OpenAI()
-MODEL_NAME = "gpt-4o-mini"
+# Bump whenever the prompt below changes so stale cached results are ignored
+PROMPT_VERSION = "1"
 
 
 class CoverLetterRequest(BaseModel):
@@ -27,58 +40,29 @@ class CoverLetterRequest(BaseModel):
 
 
 class CoverLetterFromSavedRequest(BaseModel):
-    job_description: str
+    # Either the posting text, or the id of one analyzed via /job-descriptions
+    job_description: Optional[str] = None
+    job_id: Optional[int] = None
+    # Saved resume to use; by default the best fit for this job is picked
+    resume_id: Optional[int] = None
 
 
-class CoverLetterResponse(BaseModel):
+# What the model returns; sent as its JSON schema and validated by
+# app/services/structured_output.py
+class CoverLetterDraft(BaseModel):
     cover_letter: str
 
 
-def _clean_and_parse_cover_letter_json(raw_output: str) -> Dict[str, Any]:
-    """
-    Clean the model output and parse JSON safely.
-    Expected final shape: {"cover_letter": "..."}
-    """
-    clean_output = raw_output.strip()
-
-    # Strip ``` or ```json fences if model added them
-    if clean_output.startswith("```"):
-        lines = clean_output.splitlines()
-        stripped_lines = [
-            line for line in lines if not line.strip().startswith("```")
-        ]
-        clean_output = "\n".join(stripped_lines).strip()
-
-    # Grab the JSON object between first { and last }
-    if "{" in clean_output and "}" in clean_output:
-        start = clean_output.find("{")
-        end = clean_output.rfind("}")
-        clean_output = clean_output[start : end + 1]
-
-    try:
-        data = json.loads(clean_output)
-    except json.JSONDecodeError as exc:
-        logger.exception("Failed to decode JSON from cover letter output: %s", clean_output)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate cover letter. Please try again later.",
-        ) from exc
+class CoverLetterResponse(CoverLetterDraft):
+    # Saved resume the letter is based on (from-saved endpoints only)
+    resume_id: Optional[int] = None
 
-    return data
 
-
-def _generate_cover_letter_text(
-    resume_text: str,
-    job_description: str,
-) -> str:
-    """
-    Shared helper that:
-    - Builds the prompt
-    - Calls OpenAI
-    - Parses JSON
-    - Returns the cover letter string
-    """
-    prompt = f"""
+def _build_cover_letter_prompt(resume_text: str, job_description: str) -> str:
+    resume_text, job_description = fit_prompt_inputs(
+        "cover_letter", resume_text, job_description
+    )
+    return f"""
 You are an expert career coach and professional writer.
 
 Using the resume and job description below, generate a concise, professional cover letter tailored specifically to this job.
@@ -104,36 +88,108 @@ JOB DESCRIPTION:
 \"\"\"{job_description}\"\"\"
 """
 
-    # Call OpenAI
+
+async def _generate_cover_letter_text(
+    resume_text: str,
+    job_description: str,
+) -> str:
+    """
+    Shared helper that:
+    - Builds the prompt
+    - Calls OpenAI
+    - Parses JSON
+    - Returns the cover letter string
+    """
+    prompt = _build_cover_letter_prompt(resume_text, job_description)
+
+    # Call OpenAI (schema-constrained) and validate the JSON
     try:
-        response = client.responses.create(
-            model=MODEL_NAME,
-            input=prompt,
+        draft = await generate_structured(
+            "cover_letter",
+            [{"role": "user", "content": prompt}],
+            CoverLetterDraft,
         )
     except Exception as exc:
-        logger.exception("OpenAI API call failed for cover letter generation")
+        logger.exception("Cover letter generation failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to generate cover letter. Please try again later.",
         ) from exc
 
-    raw_output = response.output_text
-    logger.info("Raw cover letter model output: %s", raw_output)
+    return draft.cover_letter
 
-    # Clean + parse JSON
-    try:
-        data = _clean_and_parse_cover_letter_json(raw_output)
-        cover_letter = data["cover_letter"]
-    except (KeyError, TypeError) as exc:
-        logger.exception(
-            "Cover letter JSON missing expected 'cover_letter' field: %s", raw_output
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate cover letter. Please try again later.",
-        ) from exc
 
-    return cover_letter
+async def _stream_cover_letter_events(
+    resume_text: str,
+    job_description: str,
+    cache_key: Optional[str] = None,
+    resume_id: Optional[int] = None,
+    reservation: Optional[UsageReservation] = None,
+) -> AsyncIterator[str]:
+    """
+    SSE generator used by the /stream endpoints:
+    - "token" events carry the cover letter text as the model writes it
+    - one final "result" event carries the validated CoverLetterResponse
+    - an "error" event replaces "result" if generation or parsing fails
+
+    `reservation` (daily-limit slot) is committed with the "result" event
+    and released otherwise.
+    """
+    try:
+        prompt = _build_cover_letter_prompt(resume_text, job_description)
+        messages = [{"role": "user", "content": prompt}]
+        streamer = JsonFieldStreamer()
+        raw_chunks: List[str] = []
+
+        try:
+            async for chunk in stream_chat_completion(
+                "cover_letter",
+                messages,
+                response_format=json_schema_format(CoverLetterDraft),
+            ):
+                raw_chunks.append(chunk)
+                for field, text in streamer.feed(chunk):
+                    if field == "cover_letter":
+                        yield sse_event("token", {"text": text})
+        except Exception:
+            logger.exception("OpenAI streaming call failed for cover letter generation")
+            yield sse_event(
+                "error",
+                {"detail": "Failed to generate cover letter. Please try again later."},
+            )
+            return
+
+        try:
+            try:
+                if streamer.complete:
+                    draft = validate_structured(streamer.values, CoverLetterDraft)
+                else:
+                    # Not a well-formed object; fall back to the tolerant parser
+                    draft = parse_structured("".join(raw_chunks), CoverLetterDraft)
+            except StructuredOutputError as exc:
+                draft = await repair_structured(
+                    "cover_letter", messages, CoverLetterDraft, exc
+                )
+        except Exception:
+            logger.exception(
+                "Could not parse streamed cover letter output: %s", "".join(raw_chunks)
+            )
+            yield sse_event(
+                "error",
+                {"detail": "Failed to generate cover letter. Please try again later."},
+            )
+            return
+
+        result = CoverLetterResponse(cover_letter=draft.cover_letter, resume_id=resume_id)
+        if reservation is not None:
+            reservation.commit()
+        if cache_key is not None:
+            set_cached(cache_key, result.model_dump())
+        yield sse_event("result", result.model_dump())
+    finally:
+        # Errors and disconnects before the result don't use up the slot
+        if reservation is not None:
+            reservation.release()
 
 
 @router.post("/generate", response_model=CoverLetterResponse)
@@ -143,7 +199,7 @@ async def generate_cover_letter(
     """
     Generate a cover letter from explicit resume_text + job_description.
     """
-    cover_letter = _generate_cover_letter_text(
+    cover_letter = await _generate_cover_letter_text(
         resume_text=payload.resume_text,
         job_description=payload.job_description,
     )
@@ -158,26 +214,97 @@ async def generate_cover_letter_from_saved(
 ) -> CoverLetterResponse:
     """
     Generate a cover letter using the logged-in user's saved resume.
-    Only requires job_description in the request body.
+    Only requires job_description (or job_id) in the request body.
     """
 
-    # 🔥 DAILY LIMIT CHECK (added here)
-    from app.services.usage_limits import check_and_record_usage
-    check_and_record_usage(db, current_user.id, "cover_letter_saved")
-
-    # Look up the user's saved resume
-    statement = select(Resume).where(Resume.user_id == current_user.id)
-    resume = db.exec(statement).first()
+    job_description = resolve_job_text(
+        db, current_user.id, payload.job_id, payload.job_description
+    )
 
-    if not resume:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No saved resume found for this user.",
+    # Pick the user's saved resume that fits this job best
+    # (or the one they asked for)
+    resume = select_resume(db, current_user.id, job_description, payload.resume_id)
+    resume_text = resume.text
+
+    # Same resume + same job description -> reuse the earlier letter
+    # (and don't charge a daily slot for it)
+    cache_key = make_cache_key(
+        "cover_letter",
+        cache_model_key("cover_letter"),
+        PROMPT_VERSION,
+        resume_text,
+        job_description,
+    )
+    cached = get_cached("cover_letter", cache_key)
+    if cached is not None:
+        return CoverLetterResponse(**{**cached, "resume_id": resume.id})
+
+    # 🔥 DAILY LIMIT CHECK (added here): only kept if generation succeeds
+    from app.services.usage_limits import reserved_usage
+    with reserved_usage(db, current_user.id, "cover_letter_saved"):
+        cover_letter = await _generate_cover_letter_text(
+            resume_text=resume_text,
+            job_description=job_description,
         )
 
-    cover_letter = _generate_cover_letter_text(
-        resume_text=resume.extracted_text,
-        job_description=payload.job_description,
+    result = CoverLetterResponse(cover_letter=cover_letter, resume_id=resume.id)
+    set_cached(cache_key, result.model_dump())
+    return result
+
+
+@router.post("/generate/stream")
+async def generate_cover_letter_stream(
+    payload: CoverLetterRequest,
+) -> StreamingResponse:
+    """
+    Streaming variant of /generate (Server-Sent Events).
+    """
+    return StreamingResponse(
+        _stream_cover_letter_events(payload.resume_text, payload.job_description),
+        media_type="text/event-stream",
     )
 
-    return CoverLetterResponse(cover_letter=cover_letter)
+
+@router.post("/generate-from-saved/stream")
+async def generate_cover_letter_from_saved_stream(
+    payload: CoverLetterFromSavedRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Streaming variant of /generate-from-saved (Server-Sent Events).
+    Cache hits are sent as a single "result" event.
+    """
+    job_description = resolve_job_text(
+        db, current_user.id, payload.job_id, payload.job_description
+    )
+    resume = select_resume(db, current_user.id, job_description, payload.resume_id)
+    resume_text = resume.text
+
+    cache_key = make_cache_key(
+        "cover_letter",
+        cache_model_key("cover_letter"),
+        PROMPT_VERSION,
+        resume_text,
+        job_description,
+    )
+    cached = get_cached("cover_letter", cache_key)
+    if cached is not None:
+        return StreamingResponse(
+            iter([sse_event("result", {**cached, "resume_id": resume.id})]),
+            media_type="text/event-stream",
+        )
+
+    from app.services.usage_limits import reserve_usage
+    reservation = reserve_usage(db, current_user.id, "cover_letter_saved")
+
+    return StreamingResponse(
+        _stream_cover_letter_events(
+            resume_text,
+            job_description,
+            cache_key=cache_key,
+            resume_id=resume.id,
+            reservation=reservation,
+        ),
+        media_type="text/event-stream",
+    )
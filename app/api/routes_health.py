@@ -1,7 +1,43 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.api.routes_auth import get_admin_user
+
+from app.database import pool_stats
+from app.services.llm_cache import cache_stats
+from app.services.model_router import model_stats
+from app.services.prompt_builder import prompt_stats
+from app.services.stage_timing import stage_stats
 
 router = APIRouter()
 
 @router.get("/")
 async def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.get("/cache")
+async def llm_cache_stats():
+    """Hit / miss counters for the AI result cache."""
+    return cache_stats()
+
+@router.get("/db")
+async def db_pool_stats():
+    """Connection pool gauges (checked out, overflow, waiting) per engine."""
+    return pool_stats()
+
+@router.get("/prompts")
+async def prompt_token_stats():
+    """Prompt input tokens per route, before and after budgeting."""
+    return prompt_stats()
+
+@router.get("/stages")
+async def pipeline_stage_stats():
+    """Runs, outcomes and timings per stage of the multi-step AI pipelines."""
+    return stage_stats()
+
+@router.get("/models", dependencies=[Depends(get_admin_user)])
+async def llm_model_stats():
+    """
+    Rolling p50/p95 latency, error rate and health per route and model.
+    Admins only (ADMIN_EMAILS): it shows how requests are routed.
+    """
+    return model_stats()
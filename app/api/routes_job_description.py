@@ -0,0 +1,124 @@
+# app/api/routes_job_description.py
+
+import json
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import get_async_db, get_db
+from app.models import JobDescription, User, UserJobDescription
+from app.api.routes_auth import get_current_user
+from app.services.job_descriptions import (
+    create_job_description,
+    find_job_description,
+    get_user_job_description,
+    record_submitter,
+)
+
+router = APIRouter(prefix="/job-descriptions", tags=["job-descriptions"])
+
+
+class JobDescriptionCreate(BaseModel):
+    job_description: str
+
+
+class JobDescriptionRead(BaseModel):
+    id: int
+    title: Optional[str]
+    company: Optional[str]
+    seniority: Optional[str]
+    summary: Optional[str]
+    required_skills: List[str]
+    nice_to_have_skills: List[str]
+    keywords: List[str]
+    created_at: datetime
+
+
+class JobDescriptionSearchResult(JobDescriptionRead):
+    score: float  # cosine similarity to the query, higher is closer
+
+
+def _to_read(job: JobDescription) -> JobDescriptionRead:
+    return JobDescriptionRead(
+        id=job.id,
+        title=job.title,
+        company=job.company,
+        seniority=job.seniority,
+        summary=job.summary,
+        required_skills=json.loads(job.required_skills_json),
+        nice_to_have_skills=json.loads(job.nice_to_have_json),
+        keywords=json.loads(job.keywords_json),
+        created_at=job.created_at,
+    )
+
+
+@router.post("", response_model=JobDescriptionRead)
+async def submit_job_description(
+    payload: JobDescriptionCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> JobDescriptionRead:
+    """
+    Analyze a job posting once and return its id + structured analysis.
+
+    Pass the returned `id` as `job_id` to /job-match/analyze-from-saved,
+    /resume/tailor-from-saved and /cover-letter/generate-from-saved to
+    reuse the analysis. Postings already analyzed (by anyone) are returned
+    immediately and don't count against the daily limit.
+    """
+    job = find_job_description(db, payload.job_description)
+    if job is None:
+        # The slot is given back if the analysis fails
+        from app.services.usage_limits import reserved_usage
+        with reserved_usage(db, current_user.id, "job_description_analyze"):
+            job = await create_job_description(db, payload.job_description)
+
+    record_submitter(db, current_user.id, job)
+    return _to_read(job)
+
+
+@router.get("/search", response_model=List[JobDescriptionSearchResult])
+def search(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> List[JobDescriptionSearchResult]:
+    """
+    Job descriptions the caller submitted, most similar to `q` (free text,
+    a skill list, or a pasted resume) first.
+    """
+    from app.services.vector_index import search_job_descriptions
+    job_ids = db.exec(
+        select(UserJobDescription.job_description_id).where(
+            UserJobDescription.user_id == current_user.id
+        )
+    ).all()
+    hits = search_job_descriptions(db, q, job_ids, limit)
+    jobs = {
+        job.id: job
+        for job in db.exec(
+            select(JobDescription).where(
+                JobDescription.id.in_([job_id for job_id, _ in hits])
+            )
+        ).all()
+    }
+    return [
+        JobDescriptionSearchResult(**_to_read(jobs[job_id]).model_dump(), score=score)
+        for job_id, score in hits
+        if job_id in jobs
+    ]
+
+
+@router.get("/{job_id}", response_model=JobDescriptionRead)
+async def get_job_description(
+    job_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> JobDescriptionRead:
+    job = await db.run_sync(get_user_job_description, current_user.id, job_id)
+    return _to_read(job)
@@ -1,92 +1,144 @@
-import json
+import asyncio
 import logging
-from typing import List, Optional
-from pydantic import BaseModel
+import os
+from typing import Any, AsyncIterator, List, NamedTuple, Optional, Tuple
+from pydantic import BaseModel, field_validator
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from openai import OpenAI
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
 
-from app.database import get_db
-from app.models import Resume, User
+from app.database import engine, get_db
+from app.models import User, UserProfile
 from app.api.routes_auth import get_current_user
+from app.services.job_descriptions import resolve_job_text
+from app.services.llm_cache import get_cached, make_cache_key, set_cached
+from app.services.match_scoring import score_match
+from app.services.model_router import cache_model_key
+from app.services.prompt_builder import fit_prompt_inputs
+from app.services.resume_selection import best_resume, load_candidates, select_resume
+from app.services.streaming import sse_event
+from app.services.structured_output import StructuredOutputError, generate_structured
+from app.services.tokens import count_tokens
+from app.services.usage_limits import UsageReservation
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/job-match", tags=["job-match"])
 
-# Reuse the same OpenAI client + model as other endpoints
-client = OpenAI()
-MODEL_NAME = "gpt-4o-mini"
+# Bump whenever the prompt below changes so stale cached results are ignored
+PROMPT_VERSION = "1"
+
+# Pairs whose local pre-score (app/services/match_scoring.py) is below this
+# get the local result without an LLM call. 0 disables the cut-off.
+JOB_MATCH_MIN_LOCAL_SCORE = int(os.getenv("JOB_MATCH_MIN_LOCAL_SCORE", "0"))
+
+# Batch endpoint: max postings per request, and how many of its LLM
+# analyses may run at once (the gateway's global limit still applies)
+MAX_BATCH_JOBS = int(os.getenv("JOB_MATCH_MAX_BATCH_JOBS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("JOB_MATCH_BATCH_CONCURRENCY", "5"))
+
+# Longer resumes are cut down to the sections most relevant to the posting
+# (by embedding similarity) before the LLM analysis sees them
+RESUME_SECTION_TOKENS = int(os.getenv("JOB_MATCH_RESUME_SECTION_TOKENS", "1000"))
 
 
 class JobMatchRequest(BaseModel):
-    job_description: str
+    # Either the posting text, or the id of one analyzed via /job-descriptions
+    job_description: Optional[str] = None
+    job_id: Optional[int] = None
+    # Saved resume to use; by default the best fit for this job is picked
+    resume_id: Optional[int] = None
+    # False -> return the instant local pre-score, no LLM call or daily slot
+    refine: bool = True
 
 
-class JobMatchResponse(BaseModel):
+# What the model returns; sent as its JSON schema and validated by
+# app/services/structured_output.py
+class JobMatchAnalysis(BaseModel):
     match_score: int
     strong_points: List[str]
     missing_skills: List[str]
     red_flags: List[str]
     recommendations: List[str]
 
+    @field_validator(
+        "strong_points", "missing_skills", "red_flags", "recommendations", mode="before"
+    )
+    @classmethod
+    def _null_as_empty(cls, value: Any) -> Any:
+        return [] if value is None else value
 
-def clean_json_output(raw_output: str) -> str:
-    """
-    Clean model output so it's valid JSON:
-    - Strip ``` and ```json fences if present
-    - Trim extra text before/after the main JSON object
-    """
-    text = raw_output.strip()
 
-    # Strip code fences like ```json ... ```
-    if text.startswith("```"):
-        # remove leading/trailing backticks
-        text = text.strip("`")
-        # if it starts with json\n, drop that prefix
-        if text.lower().startswith("json"):
-            text = text[4:].lstrip()  # remove 'json' and following newline/space
+class JobMatchResponse(JobMatchAnalysis):
+    # Saved resume the analysis is for (see app/services/resume_selection.py)
+    resume_id: Optional[int] = None
+    # True -> local pre-score (app/services/match_scoring.py), not the LLM's
+    provisional: bool = False
 
-    # Keep only the first JSON object between { and }
-    start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        text = text[start : end + 1]
 
-    return text
+class JobMatchBatchJob(BaseModel):
+    # Either the posting text, or the id of one analyzed via /job-descriptions
+    job_description: Optional[str] = None
+    job_id: Optional[int] = None
 
 
-@router.post("/analyze-from-saved", response_model=JobMatchResponse)
-async def analyze_from_saved(
-    payload: JobMatchRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> JobMatchResponse:
-    
-    from app.services.usage_limits import check_and_record_usage, DAILY_LIMITS
-    check_and_record_usage(
-        db,
-        current_user.id,
-        "job_match_saved",
-        DAILY_LIMITS["job_match_saved"],
-    )
+class JobMatchBatchRequest(BaseModel):
+    jobs: List[JobMatchBatchJob]
+    # Saved resume to use for every job; by default the best fit per job
+    resume_id: Optional[int] = None
+    # How many of the best local matches get a full LLM analysis
+    # (each one uses a job_match_saved daily slot unless cached)
+    refine_top: int = 5
+
+
+class JobMatchBatchItem(BaseModel):
+    index: int  # position in the request's `jobs`
+    job_id: Optional[int] = None
+    refined: bool  # False -> local pre-score only
+    result: JobMatchResponse
+
+
+class JobMatchBatchResponse(BaseModel):
+    results: List[JobMatchBatchItem]  # best match first
 
-    # 1) Fetch saved resume for this user
-    resume: Optional[Resume] = (
-        db.query(Resume).filter(Resume.user_id == current_user.id).first()
+
+def _profile_skills(db: Session, user_id: int) -> Optional[str]:
+    return (
+        db.query(UserProfile.skills)
+        .filter(UserProfile.user_id == user_id)
+        .scalar()
     )
 
-    if resume is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No saved resume found for this user.",
-        )
 
-    resume_text = resume.extracted_text
-    job_description = payload.job_description
+def _relevant_resume(
+    db: Session,
+    user_id: int,
+    resume_id: int,
+    resume_text: str,
+    job_description: str,
+) -> str:
+    """
+    The resume as the LLM analysis should see it: whole if it is within
+    RESUME_SECTION_TOKENS, otherwise only its sections most relevant to
+    the posting (app/services/vector_index.py).
+    """
+    if count_tokens(resume_text) <= RESUME_SECTION_TOKENS:
+        return resume_text
+
+    from app.services.vector_index import relevant_resume_text
+    sections = relevant_resume_text(
+        db, user_id, resume_id, job_description, RESUME_SECTION_TOKENS
+    )
+    return sections or resume_text
+
 
-    # 2) Build prompt
+async def _llm_match(resume_text: str, job_description: str) -> JobMatchResponse:
+    """Full LLM analysis of one resume / job description pair."""
+    # Build prompt (inputs trimmed to this route's token budget)
+    resume_text, job_description = fit_prompt_inputs(
+        "job_match", resume_text, job_description
+    )
     prompt = f"""
 You are an expert recruiter and career coach. You will receive a candidate's resume and a job description. Analyze how well the resume fits this job.
 
@@ -106,43 +158,300 @@ Job Description:
 \"\"\"{job_description}\"\"\"
 """
 
-    # 3) Call OpenAI
+    # Call OpenAI (schema-constrained) and validate into the response model
     try:
-        response = client.responses.create(
-            model=MODEL_NAME,
-            input=prompt,
+        analysis = await generate_structured(
+            "job_match",
+            [{"role": "user", "content": prompt}],
+            JobMatchAnalysis,
         )
-        raw_output = response.output_text
-    except Exception as exc:
-        logger.exception("OpenAI API call failed for job match")
+    except StructuredOutputError as exc:
+        logger.error("Failed to parse job match output: %s", exc)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to analyze job match. Please try again later.",
+            detail="Failed to parse AI response for job match.",
         ) from exc
-
-    # 4) Clean + parse JSON
-    try:
-        cleaned = clean_json_output(raw_output)
-        data = json.loads(cleaned)
     except Exception as exc:
-        logger.exception("Failed to parse job match JSON output: %s", raw_output)
+        logger.exception("OpenAI API call failed for job match")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to parse AI response for job match.",
+            detail="Failed to analyze job match. Please try again later.",
         ) from exc
 
-    # 5) Map into response model (with safe defaults)
-    try:
-        return JobMatchResponse(
-            match_score=int(data.get("match_score", 0)),
-            strong_points=data.get("strong_points", []) or [],
-            missing_skills=data.get("missing_skills", []) or [],
-            red_flags=data.get("red_flags", []) or [],
-            recommendations=data.get("recommendations", []) or [],
+    return JobMatchResponse(**analysis.model_dump())
+
+
+@router.post("/analyze-from-saved", response_model=JobMatchResponse)
+async def analyze_from_saved(
+    payload: JobMatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> JobMatchResponse:
+    job_description = resolve_job_text(
+        db, current_user.id, payload.job_id, payload.job_description
+    )
+
+    # 1) Pick the user's saved resume that fits this job best
+    #    (or the one they asked for)
+    profile_skills = _profile_skills(db, current_user.id)
+    resume = select_resume(
+        db, current_user.id, job_description, payload.resume_id, profile_skills
+    )
+    resume_text = resume.text
+
+    # Same resume + same job description -> reuse the earlier analysis
+    # (and don't charge a daily slot for it)
+    cache_key = make_cache_key(
+        "job_match", cache_model_key("job_match"), PROMPT_VERSION, resume_text, job_description
+    )
+    cached = get_cached("job_match", cache_key)
+    if cached is not None:
+        return JobMatchResponse(**{**cached, "resume_id": resume.id})
+
+    # Instant local pre-score: answers on its own when no refinement is
+    # wanted or the pair is an obvious mismatch
+    local = JobMatchResponse(
+        **score_match(resume_text, job_description, profile_skills),
+        resume_id=resume.id,
+        provisional=True,
+    )
+    if not payload.refine or local.match_score < JOB_MATCH_MIN_LOCAL_SCORE:
+        return local
+
+    from app.services.usage_limits import reserved_usage, DAILY_LIMITS
+    with reserved_usage(
+        db,
+        current_user.id,
+        "job_match_saved",
+        DAILY_LIMITS["job_match_saved"],
+    ) as reservation:
+        prompt_resume = _relevant_resume(
+            db, current_user.id, resume.id, resume_text, job_description
         )
-    except Exception as exc:
-        logger.exception("Failed to map AI job match output to schema: %s", data)
+        try:
+            result = await _llm_match(prompt_resume, job_description)
+        except HTTPException:
+            # Give the slot back and answer with the pre-score rather than
+            # a 500 the client would just retry
+            reservation.release()
+            logger.warning("LLM job match failed; returning the local pre-score")
+            return local
+
+    result.resume_id = resume.id
+    set_cached(cache_key, result.model_dump())
+    return result
+
+
+class _PendingRefinement(NamedTuple):
+    item: JobMatchBatchItem
+    resume_text: str  # as the LLM sees it (see _relevant_resume)
+    job_description: str
+    cache_key: str
+
+
+def _plan_batch(
+    payload: JobMatchBatchRequest,
+    user_id: int,
+    db: Session,
+) -> Tuple[List[JobMatchBatchItem], List[_PendingRefinement]]:
+    """
+    Score every posting locally (or from cache) and pick the ones that
+    should get an LLM analysis. Returns (items, wanted refinements).
+    """
+    if not payload.jobs or len(payload.jobs) > MAX_BATCH_JOBS:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to format job match analysis.",
-        ) from exc
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Send between 1 and {MAX_BATCH_JOBS} job descriptions.",
+        )
+
+    # Resumes and profile are loaded once for the whole batch; each job
+    # then gets the saved resume that fits it best
+    profile_skills = _profile_skills(db, user_id)
+    candidates = None
+    if payload.resume_id is None:
+        candidates = load_candidates(db, user_id)
+    else:
+        chosen = select_resume(db, user_id, "", payload.resume_id)
+
+    items: List[JobMatchBatchItem] = []
+    uncached: List[_PendingRefinement] = []
+    for index, job in enumerate(payload.jobs):
+        job_description = resolve_job_text(db, user_id, job.job_id, job.job_description)
+        resume = chosen if candidates is None else best_resume(
+            db, user_id, candidates, job_description, profile_skills
+        )
+        cache_key = make_cache_key(
+            "job_match", cache_model_key("job_match"), PROMPT_VERSION, resume.text, job_description
+        )
+        cached = get_cached("job_match", cache_key)
+        if cached is not None:
+            result = JobMatchResponse(**{**cached, "resume_id": resume.id})
+            refined = True
+        else:
+            result = JobMatchResponse(
+                **score_match(resume.text, job_description, profile_skills),
+                resume_id=resume.id,
+                provisional=True,
+            )
+            refined = False
+
+        item = JobMatchBatchItem(
+            index=index, job_id=job.job_id, refined=refined, result=result
+        )
+        items.append(item)
+        if not refined and result.match_score >= JOB_MATCH_MIN_LOCAL_SCORE:
+            uncached.append(
+                _PendingRefinement(item, resume.text, job_description, cache_key)
+            )
+
+    uncached.sort(key=lambda p: (-p.item.result.match_score, p.item.index))
+    wanted = [
+        p._replace(
+            resume_text=_relevant_resume(
+                db, user_id, p.item.result.resume_id, p.resume_text, p.job_description
+            )
+        )
+        for p in uncached[: max(0, payload.refine_top)]
+    ]
+    return items, wanted
+
+
+def _reserve_refinements(
+    db: Session,
+    user_id: int,
+    wanted: List[_PendingRefinement],
+) -> Tuple[List[_PendingRefinement], Optional[UsageReservation]]:
+    """
+    Reserve daily slots for the wanted refinements in one usage write,
+    clamped to what the user has left today: the rest keep their
+    provisional local score instead of failing the batch with a 429.
+    Returns (refinements to run, reservation or None).
+    """
+    if not wanted:
+        return [], None
+
+    from app.services.usage_limits import reserve_available_usage
+    reservation = reserve_available_usage(
+        db, user_id, "job_match_saved", count=len(wanted)
+    )
+    if reservation.pending < len(wanted):
+        logger.info(
+            "Daily limit allows %d of %d batch refinements for user %s",
+            reservation.pending,
+            len(wanted),
+            user_id,
+        )
+    if not reservation.pending:
+        return [], None
+    return wanted[: reservation.pending], reservation
+
+
+def _ranked(items: List[JobMatchBatchItem]) -> List[JobMatchBatchItem]:
+    return sorted(items, key=lambda item: (-item.result.match_score, item.index))
+
+
+async def _refine(
+    pending: _PendingRefinement,
+    semaphore: asyncio.Semaphore,
+    reservation: UsageReservation,
+) -> JobMatchBatchItem:
+    """
+    Replace an item's local score with the LLM analysis. On failure the
+    local score stays and its daily slot is given back, so one bad posting
+    doesn't fail (or cost) the whole batch.
+    """
+    item = pending.item
+    try:
+        async with semaphore:
+            result = await _llm_match(pending.resume_text, pending.job_description)
+    except HTTPException:
+        reservation.release(1)
+        logger.warning("LLM refinement failed for batch item %d", item.index)
+        return item
+
+    reservation.commit(1)
+    result.resume_id = item.result.resume_id
+    set_cached(pending.cache_key, result.model_dump())
+    item.result = result
+    item.refined = True
+    return item
+
+
+@router.post("/analyze-batch-from-saved", response_model=JobMatchBatchResponse)
+async def analyze_batch_from_saved(
+    payload: JobMatchBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> JobMatchBatchResponse:
+    """
+    Rank the saved resume against many job descriptions at once.
+
+    Every posting gets an instant local score; the `refine_top` best are
+    then analyzed by the LLM concurrently (BATCH_CONCURRENCY at a time), as
+    many as the user's daily limit allows. Results come back best match
+    first; those not refined have `provisional` set.
+    """
+    items, wanted = _plan_batch(payload, current_user.id, db)
+    pending, reservation = _reserve_refinements(db, current_user.id, wanted)
+
+    if pending:
+        semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+        try:
+            await asyncio.gather(
+                *(_refine(p, semaphore, reservation) for p in pending)
+            )
+        finally:
+            # Only left over if the request was cancelled mid-way
+            reservation.release()
+
+    return JobMatchBatchResponse(results=_ranked(items))
+
+
+@router.post("/analyze-batch-from-saved/stream")
+async def analyze_batch_from_saved_stream(
+    payload: JobMatchBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Streaming variant of /analyze-batch-from-saved (Server-Sent Events):
+    - "ranking": the provisional ranking (local scores and cache hits)
+    - "result":  one item each time an LLM analysis finishes
+    - "done":    the final ranking
+    """
+    items, wanted = _plan_batch(payload, current_user.id, db)
+    user_id = current_user.id
+
+    async def events() -> AsyncIterator[str]:
+        # Slots are only reserved once the response is actually streaming,
+        # so a client that never reads it can't hold them
+        tasks: List["asyncio.Task[JobMatchBatchItem]"] = []
+        reservation: Optional[UsageReservation] = None
+        try:
+            with Session(engine) as session:
+                pending, reservation = _reserve_refinements(session, user_id, wanted)
+
+            yield sse_event(
+                "ranking",
+                [item.model_dump() for item in _ranked(items)],
+            )
+
+            semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+            tasks = [
+                asyncio.create_task(_refine(p, semaphore, reservation))
+                for p in pending
+            ]
+            for next_done in asyncio.as_completed(tasks):
+                item = await next_done
+                yield sse_event("result", item.model_dump())
+        finally:
+            # Client went away: don't keep paying for analyses nobody reads,
+            # and don't charge for the ones that never finished
+            for task in tasks:
+                task.cancel()
+            if reservation is not None:
+                reservation.release()
+
+        yield sse_event("done", [item.model_dump() for item in _ranked(items)])
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,74 @@
+# app/api/routes_jobs.py
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.database import get_async_db, get_async_engine
+from app.models import User
+from app.api.routes_auth import get_current_user
+from app.schemas import BackgroundJobRead
+from app.services.job_queue import FINISHED_STATUSES, get_job
+from app.services.streaming import sse_event
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# How often /events re-reads the job
+EVENTS_POLL_SECONDS = 1.0
+
+
+@router.get("/{job_id}", response_model=BackgroundJobRead)
+async def get_background_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> BackgroundJobRead:
+    """Status of a background job, with its result once it has succeeded."""
+    job = await db.run_sync(get_job, job_id, current_user.id)
+    return BackgroundJobRead.from_job(job)
+
+
+async def _load(job_id: str, user_id: int) -> BackgroundJobRead:
+    # Short session per poll, so a long subscription doesn't hold a connection
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as db:
+        return BackgroundJobRead.from_job(await db.run_sync(get_job, job_id, user_id))
+
+
+async def _job_events(job: BackgroundJobRead, user_id: int) -> AsyncIterator[str]:
+    """
+    SSE generator for /jobs/{id}/events:
+    - a "status" event {"status", "attempts"} whenever either changes
+    - one final "result" event (the job's result) or "error" event {"detail"}
+    """
+    seen = None
+    while True:
+        if (job.status, job.attempts) != seen:
+            seen = (job.status, job.attempts)
+            yield sse_event("status", {"status": job.status, "attempts": job.attempts})
+
+        if job.status == "succeeded":
+            yield sse_event("result", job.result)
+            return
+        if job.status in FINISHED_STATUSES:
+            yield sse_event("error", {"detail": job.error})
+            return
+
+        await asyncio.sleep(EVENTS_POLL_SECONDS)
+        job = await _load(job.id, user_id)
+
+
+@router.get("/{job_id}/events")
+async def background_job_events(
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Subscribe to a background job (Server-Sent Events) instead of polling."""
+    # Not the request's session: subscriptions can last minutes, and the
+    # connection is given back between polls
+    job = await _load(job_id, current_user.id)
+    return StreamingResponse(
+        _job_events(job, current_user.id),
+        media_type="text/event-stream",
+    )
@@ -1,9 +1,10 @@
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models import User, UserProfile
 from app.schemas import UserProfileRead, UserProfileUpdate
 from app.api.routes_auth import get_current_user  # same pattern as other routes
@@ -15,12 +16,14 @@ router = APIRouter(
 
 
 @router.get("", response_model=UserProfileRead)
-def get_my_profile(
-    db: Session = Depends(get_db),
+async def get_my_profile(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> UserProfileRead:
-    profile = db.exec(
-        select(UserProfile).where(UserProfile.user_id == current_user.id)
+    profile = (
+        await db.exec(
+            select(UserProfile).where(UserProfile.user_id == current_user.id)
+        )
     ).one_or_none()
 
     if profile is None:
@@ -33,16 +36,18 @@ def get_my_profile(
 
 
 @router.put("", response_model=UserProfileRead)
-def upsert_my_profile(
+async def upsert_my_profile(
     payload: UserProfileUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> UserProfileRead:
     data = payload.dict(exclude_unset=True)
 
     # find existing profile
-    profile = db.exec(
-        select(UserProfile).where(UserProfile.user_id == current_user.id)
+    profile = (
+        await db.exec(
+            select(UserProfile).where(UserProfile.user_id == current_user.id)
+        )
     ).one_or_none()
 
     if profile is None:
@@ -59,6 +64,6 @@ def upsert_my_profile(
 
         profile.updated_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(profile)
+    await db.commit()
+    await db.refresh(profile)
     return profile
@@ -1,124 +1,86 @@
-from typing import List
-import json
+from typing import AsyncIterator, List, Optional
+import asyncio
 import logging
-import io
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, status
-from pydantic import BaseModel
-from openai import OpenAI
-from docx import Document  # for .docx parsing
-from pypdf import PdfReader  # for .pdf parsing
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, field_validator
+from sqlmodel import Session
+
+from app.database import get_db
+from app.models import User
+from app.api.routes_auth import get_current_user
+from app.schemas import BackgroundJobRead
+from app.services.job_queue import enqueue, job_handler
+from app.services.resume_extraction import extract_text_from_file
+from app.services.llm_gateway import create_chat_completion, stream_chat_completion
+from app.services.prompt_builder import fit_prompt_inputs
+from app.services.streaming import JsonFieldStreamer, sse_event
+from app.services.structured_output import (
+    StructuredOutputError,
+    generate_structured,
+    json_schema_format,
+    parse_structured,
+    repair_structured,
+    strip_code_fences,
+    validate_structured,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-# OpenAI client (uses OPENAI_API_KEY from environment)
-client = OpenAI()
 
-# Cheap but good model
-MODEL_NAME = "gpt-4.1-mini"  # you can switch back to "gpt-4o-mini" if you prefer
+# Parallel mode: one call per version, each retried on its own
+MAX_VERSION_ATTEMPTS = 2
+
+VERSION_STYLE_HINTS = {
+    "version1": (
+        "Concise and achievement-focused: tighten every bullet, lead with "
+        "action verbs and surface measurable impact."
+    ),
+    "version2": (
+        "Technical depth: foreground tools, languages and systems work, and "
+        "make each project's technical contribution explicit."
+    ),
+    "version3": (
+        "Narrative and leadership: emphasize ownership, collaboration and "
+        "career progression with a short professional summary at the top."
+    ),
+}
 
 
 class ResumeImproveResponse(BaseModel):
     versions: List[str]
+    # Only used by parallel mode: versions that could not be generated
+    failed_versions: List[str] = []
 
 
-async def extract_text_from_file(file: UploadFile) -> str:
-    """
-    Read the uploaded file and return its text content.
+IMPROVE_SYSTEM_MESSAGE = "You are a helpful assistant that outputs strictly valid JSON."
+VERSION_KEYS = ("version1", "version2", "version3")
 
-    Supports:
-    - .txt  (UTF-8 text)
-    - .docx (Word document via python-docx)
-    - .pdf  (text-based PDFs via pypdf)
-    """
-    filename = (file.filename or "").lower()
 
-    # Read all bytes once
-    file_bytes = await file.read()
+# What the model returns; sent as its JSON schema and validated by
+# app/services/structured_output.py
+class ImprovedVersions(BaseModel):
+    version1: str
+    version2: str
+    version3: str
 
-    if not file_bytes:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="The uploaded file appears to be empty.",
-        )
-
-    text: str
+    @field_validator("*")
+    @classmethod
+    def _not_blank(cls, value: str) -> str:
+        value = value.strip()
+        if not value:
+            raise ValueError("resume version is empty")
+        return value
 
-    # Handle .txt files
-    if filename.endswith(".txt") or file.content_type == "text/plain":
-        try:
-            text = file_bytes.decode("utf-8")
-        except UnicodeDecodeError:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Could not decode text file as UTF-8.",
-            )
+    def as_list(self) -> List[str]:
+        return [getattr(self, key) for key in VERSION_KEYS]
 
-    # Handle .docx files
-    elif filename.endswith(".docx") or file.content_type in (
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "application/msword",
-    ):
-        try:
-            doc = Document(io.BytesIO(file_bytes))
-            # Join all paragraph texts into a single string
-            text = "\n".join(p.text for p in doc.paragraphs)
-        except Exception:
-            logger.exception("Failed to read DOCX file")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Could not read DOCX file.",
-            )
 
-    # Handle .pdf files (text-based PDFs)
-    elif filename.endswith(".pdf") or file.content_type == "application/pdf":
-        try:
-            reader = PdfReader(io.BytesIO(file_bytes))
-            page_texts = []
-            for page in reader.pages:
-                page_text = page.extract_text() or ""
-                page_texts.append(page_text)
-            text = "\n".join(page_texts)
-        except Exception:
-            logger.exception("Failed to read PDF file")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Could not read PDF file.",
-            )
-
-        # If pypdf couldn't extract any text, likely a scanned/ image-only PDF
-        if not text.strip():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Could not extract text from PDF. It may be a scanned document.",
-            )
-
-    # Unsupported type
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Only .txt, .docx, and .pdf files are supported for now.",
-        )
-
-    # Generic empty-text check for txt/docx
-    if not text.strip():
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="The uploaded file appears to be empty.",
-        )
-
-    return text
-
-
-@router.post("/improve", response_model=ResumeImproveResponse)
-async def improve_resume(file: UploadFile = File(...)) -> ResumeImproveResponse:
-    # ✅ 1. Extract resume text from .txt, .docx, or .pdf
-    resume_text = await extract_text_from_file(file)
-
-    # ✅ 2. Build prompt for OpenAI
-    prompt = f"""
+def _build_improve_prompt(resume_text: str) -> str:
+    return f"""
 You are an expert resume writer.
 
 You will receive a full resume as raw text.
@@ -149,23 +111,136 @@ Here is the original resume:
 \"\"\"{resume_text}\"\"\"
 """
 
-    # ✅ 3. Call OpenAI using chat.completions with JSON response_format
+
+def _improve_messages(resume_text: str) -> List[dict]:
+    return [
+        {
+            "role": "system",
+            "content": IMPROVE_SYSTEM_MESSAGE,
+        },
+        {
+            "role": "user",
+            "content": _build_improve_prompt(resume_text),
+        },
+    ]
+
+
+def _build_single_version_prompt(resume_text: str, style_hint: str) -> str:
+    return f"""
+You are an expert resume writer.
+
+You will receive a full resume as raw text.
+
+Your job is to create ONE improved version of this resume that is optimized for professional job applications.
+
+Style for this version:
+{style_hint}
+
+VERY IMPORTANT RULES:
+- Do NOT remove any experience, projects, or education from the original.
+- Do NOT drop any important technical tools, languages, or technologies mentioned.
+- You may rewrite sentences for clarity and impact, but you must keep all the original content and details.
+- Never invent fake companies, fake degrees, or fake job titles.
+- Keep dates and factual information unchanged.
+
+Return ONLY the improved resume as plain text (multi-line text is OK).
+Do not include any markdown, backticks, or commentary before or after it.
+
+Here is the original resume:
+
+\"\"\"{resume_text}\"\"\"
+"""
+
+
+async def _generate_single_version(resume_text: str, key: str) -> Optional[str]:
+    """
+    Generate one resume version, retrying up to MAX_VERSION_ATTEMPTS times.
+    Returns None instead of raising so sibling versions are unaffected.
+    """
+    prompt = _build_single_version_prompt(resume_text, VERSION_STYLE_HINTS[key])
+
+    for attempt in range(1, MAX_VERSION_ATTEMPTS + 1):
+        try:
+            raw_output = await create_chat_completion(
+                "resume_improve",
+                [{"role": "user", "content": prompt}],
+                temperature=0.4,
+            )
+        except Exception:
+            logger.exception(
+                "OpenAI call failed for resume %s (attempt %d)", key, attempt
+            )
+            continue
+
+        text = strip_code_fences(raw_output)
+        if text:
+            return text
+        logger.error("Empty resume %s from model (attempt %d)", key, attempt)
+
+    return None
+
+
+async def _improve_resume_parallel(resume_text: str) -> ResumeImproveResponse:
+    """
+    Fan out one call per version and gather them concurrently, so wall-clock
+    time is roughly that of the slowest single version. Partial success is
+    reported through `failed_versions`; only a total failure is a 500.
+    """
+    results = await asyncio.gather(
+        *(_generate_single_version(resume_text, key) for key in VERSION_KEYS)
+    )
+
+    versions = [text for text in results if text]
+    failed = [key for key, text in zip(VERSION_KEYS, results) if not text]
+
+    if not versions:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to generate improved resume. Please try again.",
+        )
+
+    return ResumeImproveResponse(versions=versions, failed_versions=failed)
+
+
+@router.post("/improve", response_model=ResumeImproveResponse)
+async def improve_resume(
+    request: Request,
+    file: UploadFile = File(...),
+    parallel: bool = False,
+) -> ResumeImproveResponse:
+    """
+    Return three improved versions of the uploaded resume.
+
+    With ?parallel=true each version is generated by its own call (with
+    its own style hint and retries) and the calls run concurrently.
+    """
+    # ✅ 1. Extract resume text from .txt, .docx, or .pdf
+    #       (trimmed to this route's token budget if it is huge)
+    resume_text = await extract_text_from_file(file, request)
+    resume_text, _ = fit_prompt_inputs("resume_improve", resume_text)
+
+    if parallel:
+        return await _improve_resume_parallel(resume_text)
+    return await _improve_resume_single(resume_text)
+
+
+async def _improve_resume_single(resume_text: str) -> ResumeImproveResponse:
+    """All three versions from one JSON-mode call."""
+    # ✅ 2. Call OpenAI with schema-constrained output; fields that come
+    #       back broken are asked for again on their own
     try:
-        completion = client.chat.completions.create(
-            model=MODEL_NAME,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant that outputs strictly valid JSON.",
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
+        improved = await generate_structured(
+            "resume_improve",
+            _improve_messages(resume_text),
+            ImprovedVersions,
             temperature=0.4,
         )
+    except StructuredOutputError as e:
+        logger.error("AI response missing one or more versions: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="AI did not return three improved resume versions.",
+        ) from e
     except Exception as e:
         logger.exception("Error while calling OpenAI for resume improvement: %s", e)
         raise HTTPException(
@@ -173,47 +248,119 @@ Here is the original resume:
             detail="Failed to generate improved resume. Please try again.",
         ) from e
 
-    # ✅ 4. Get raw JSON string from the model
-    raw_output = completion.choices[0].message.content or ""
-    cleaned = raw_output.strip()
+    # ✅ 3. Return in existing format expected by the frontend
+    return ResumeImproveResponse(versions=improved.as_list())
 
-    # Defensive cleanup if the model ever wraps in ```json ... ```
-    if cleaned.startswith("```"):
-        lines = cleaned.splitlines()
-        if lines and lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].startswith("```"):
-            lines = lines[:-1]
-        cleaned = "\n".join(lines).strip()
 
-    # Also trim to outermost {...} just in case
-    if "{" in cleaned and "}" in cleaned:
-        cleaned = cleaned[cleaned.find("{") : cleaned.rfind("}") + 1]
+@job_handler("resume_improve")
+async def _run_improve_job(job: dict) -> dict:
+    """Background job for /improve/jobs (see app/services/job_queue.py)."""
+    if job["parallel"]:
+        result = await _improve_resume_parallel(job["resume_text"])
+    else:
+        result = await _improve_resume_single(job["resume_text"])
+    return result.model_dump()
+
+
+@router.post(
+    "/improve/jobs",
+    response_model=BackgroundJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def submit_improve_job(
+    request: Request,
+    file: UploadFile = File(...),
+    parallel: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> BackgroundJobRead:
+    """
+    Background variant of /improve. The file is parsed right away; the
+    versions are generated by a job worker. Poll GET /jobs/{id} (or
+    subscribe to /jobs/{id}/events) for the ResumeImproveResponse.
+    Jobs belong to a user, so unlike /improve this needs a login.
+    """
+    resume_text = await extract_text_from_file(file, request)
+    resume_text, _ = fit_prompt_inputs("resume_improve", resume_text)
+
+    job = enqueue(
+        db,
+        current_user.id,
+        "resume_improve",
+        {"resume_text": resume_text, "parallel": parallel},
+    )
+    return BackgroundJobRead.from_job(job)
 
-    logger.info("Raw AI JSON for resume improve: %s", cleaned)
 
-    # ✅ 5. Parse JSON from the cleaned output
+async def _stream_improve_events(resume_text: str) -> AsyncIterator[str]:
+    """
+    SSE generator for /improve/stream:
+    - "token" events: {"field": "version1" | "version2" | "version3", "text": "..."}
+    - one final "result" event with the ResumeImproveResponse payload
+    - an "error" event replaces "result" if generation or parsing fails
+    """
+    messages = _improve_messages(resume_text)
+    streamer = JsonFieldStreamer()
+    raw_chunks: List[str] = []
+
     try:
-        data = json.loads(cleaned)
-    except json.JSONDecodeError:
-        logger.error("Failed to parse model JSON output: %s", cleaned)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to parse AI response. Please try again.",
+        async for chunk in stream_chat_completion(
+            "resume_improve",
+            messages,
+            response_format=json_schema_format(ImprovedVersions),
+            temperature=0.4,
+        ):
+            raw_chunks.append(chunk)
+            for field, text in streamer.feed(chunk):
+                if field in VERSION_KEYS:
+                    yield sse_event("token", {"field": field, "text": text})
+    except Exception:
+        logger.exception("OpenAI streaming call failed for resume improvement")
+        yield sse_event(
+            "error",
+            {"detail": "Failed to generate improved resume. Please try again."},
         )
+        return
 
-    version1 = str(data.get("version1", "")).strip()
-    version2 = str(data.get("version2", "")).strip()
-    version3 = str(data.get("version3", "")).strip()
+    try:
+        try:
+            if streamer.complete:
+                improved = validate_structured(streamer.values, ImprovedVersions)
+            else:
+                # Not a well-formed object; fall back to the tolerant parser
+                improved = parse_structured("".join(raw_chunks), ImprovedVersions)
+        except StructuredOutputError as exc:
+            improved = await repair_structured(
+                "resume_improve",
+                messages,
+                ImprovedVersions,
+                exc,
+                temperature=0.4,
+            )
+    except Exception:
+        logger.exception("Could not parse streamed resume improve output")
+        yield sse_event(
+            "error",
+            {"detail": "AI did not return three improved resume versions."},
+        )
+        return
 
-    versions = [v for v in (version1, version2, version3) if v]
+    yield sse_event(
+        "result", ResumeImproveResponse(versions=improved.as_list()).model_dump()
+    )
 
-    if len(versions) != 3:
-        logger.error("AI response missing one or more versions: %s", data)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="AI did not return three improved resume versions.",
-        )
 
-    # ✅ 6. Return in existing format expected by the frontend
-    return ResumeImproveResponse(versions=versions)
+@router.post("/improve/stream")
+async def improve_resume_stream(
+    request: Request,
+    file: UploadFile = File(...),
+) -> StreamingResponse:
+    """
+    Streaming variant of /improve (Server-Sent Events).
+    """
+    resume_text = await extract_text_from_file(file, request)
+    resume_text, _ = fit_prompt_inputs("resume_improve", resume_text)
+    return StreamingResponse(
+        _stream_improve_events(resume_text),
+        media_type="text/event-stream",
+    )
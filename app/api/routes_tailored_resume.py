@@ -1,155 +1,255 @@
 # app/api/routes_tailored_resume.py
+"""
+/resume/tailor-from-saved: rewrite a saved resume for one job posting.
+
+Runs as a pipeline of small stages instead of one prompt that analyzed,
+rewrote and re-analyzed in a single JSON answer:
+
+1. "fit": the current match, from the /job-match cache or scored locally
+   (app/services/match_scoring.py), so no LLM call. "jd_analysis": the
+   stored posting analysis (app/services/job_descriptions.py); only a
+   posting nobody analyzed yet costs an LLM call, charged to the user's
+   job_description_analyze limit.
+2. "rewrite" streams the tailored resume as plain text, guided by both,
+   followed by a short explanation after CHANGES_MARKER. No JSON to repair.
+3. "rescore" scores the tailored text locally and moves the stage-1 score
+   by the local improvement.
+
+Each stage is cached on its own, so a failed rewrite is retried without
+redoing the analyses. Timings per stage are at /health/stages.
+"""
 
 from __future__ import annotations
 
-import json
+import asyncio
 import logging
-from typing import List
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from openai import OpenAI
+from sqlmodel import Session
 
-from app.database import get_db
-from app.models import User, Resume
+from app.database import engine, get_db
+from app.models import User
 from app.api.routes_auth import get_current_user
-from app.api.routes_job_match import JobMatchResponse  # reuse existing schema
+from app.api.routes_job_match import (  # reuse existing schema and cache
+    JobMatchResponse,
+    PROMPT_VERSION as JOB_MATCH_PROMPT_VERSION,
+)
+from app.schemas import BackgroundJobRead
+from app.services.job_descriptions import (
+    PostingAnalysis,
+    analyze_posting,
+    find_job_description,
+    format_job_analysis,
+    record_submitter,
+    resolve_job_text,
+    save_job_description,
+)
+from app.services.job_queue import enqueue, job_handler
+from app.services.llm_cache import get_cached, make_cache_key, set_cached
+from app.services.llm_gateway import stream_chat_completion
+from app.services.match_scoring import score_match
+from app.services.model_router import cache_model_key
+from app.services.prompt_builder import fit_prompt_inputs
+from app.services.resume_selection import select_resume
+from app.services.stage_timing import timed_stage
+from app.services.streaming import sse_event
+from app.services.structured_output import strip_code_fences
+from app.services.usage_limits import UsageReservation, reserve_usage
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/resume", tags=["resume"])
 
-client = OpenAI()
-MODEL_NAME = "gpt-4o-mini"
-
-
-def clean_json_output(raw: str) -> str:
-    """
-    Clean model output to extract a valid JSON object:
-    - strip backticks / ```json fences
-    - slice from first '{' to last '}'
-    - convert any Python-style triple-quoted strings into proper JSON strings
-    """
-    if not raw:
-        return raw
-
-    text = raw.strip()
-
-    # Remove ``` or ```json fences if present
-    if text.startswith("```"):
-        # Strip all surrounding backticks
-        text = text.strip("`").strip()
-        # If it starts with 'json', remove that word
-        if text.lower().startswith("json"):
-            text = text[4:].lstrip()
-
-    # Extract from first '{' to last '}'
-    start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        text = text[start : end + 1]
-
-    # Some models sometimes return Python-style triple-quoted strings, e.g.:
-    #   "tailored_resume": """ ... """
-    # This is not valid JSON, so we convert those blocks into a normal JSON
-    # string, escaping newlines and quotes using json.dumps.
-    import re as _re
-    import json as _json
-
-    def _replace_triple_quoted(field_name: str, source: str) -> str:
-        pattern = rf'"{field_name}"\s*:\s*"""(.*?)"""'
-
-        def _repl(match: "_re.Match[str]") -> str:
-            inner = match.group(1)
-            # json.dumps will escape newlines and quotes properly; we strip the
-            # outer quotes because we add them ourselves.
-            safe = _json.dumps(inner)[1:-1]
-            return f'"{field_name}": "{safe}"'
+# Bump whenever the prompts below change so stale cached results are ignored
+PROMPT_VERSION = "3"
 
-        return _re.sub(pattern, _repl, source, flags=_re.DOTALL)
+# The rewrite answers with the resume, this line, then the explanation
+CHANGES_MARKER = "=== CHANGES ==="
 
-    # Fix triple-quoted fields if the model used them
-    text = _replace_triple_quoted("tailored_resume", text)
-    text = _replace_triple_quoted("improvement_explanation", text)
+# A rewrite under this share of the original's words is a refusal or a
+# truncated answer, not a tailored resume (the prompt asks for ±10%)
+MIN_REWRITE_LENGTH_RATIO = 0.5
 
-    return text
+# How many of the resume's sections most relevant to the posting (by
+# embedding similarity, app/services/vector_index.py) the rewrite is told
+# to lead with
+FOCUS_SECTIONS = 3
 
+DEFAULT_EXPLANATION = (
+    "Reworded and reordered the resume to put the experience and skills "
+    "this job asks for first."
+)
 
 
 class TailorFromSavedRequest(BaseModel):
-    job_description: str
+    # Either the posting text, or the id of one analyzed via /job-descriptions
+    job_description: Optional[str] = None
+    job_id: Optional[int] = None
+    # Saved resume to tailor; by default the best fit for this job is picked
+    resume_id: Optional[int] = None
 
 
 class TailorFromSavedResponse(BaseModel):
     improved_match: JobMatchResponse
     tailored_resume: str
     improvement_explanation: str
+    # Saved resume that was tailored (see app/services/resume_selection.py)
+    resume_id: Optional[int] = None
+    # Fit of the resume before tailoring (stage 1)
+    initial_match: Optional[JobMatchResponse] = None
 
 
-@router.post("/tailor-from-saved", response_model=TailorFromSavedResponse)
-async def tailor_resume_from_saved(
-    payload: TailorFromSavedRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> TailorFromSavedResponse:
-    
-    # DAILY LIMIT CHECK
-    from app.services.usage_limits import check_and_record_usage
-    check_and_record_usage(db, current_user.id, "tailor_saved")
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
 
+def _initial_fit(resume_text: str, job_description: str) -> JobMatchResponse:
     """
-    Uses the logged-in user's saved resume + a job description to:
-    - analyze current fit
-    - generate a tailored resume
-    - re-analyze and return the improved match + explanation + tailored resume
+    Stage 1: fit of the untailored resume. The /job-match LLM analysis if
+    one is cached, otherwise the local score; never an LLM call.
     """
+    with timed_stage("tailor", "fit") as stage:
+        cache_key = make_cache_key(
+            "job_match",
+            cache_model_key("job_match"),
+            JOB_MATCH_PROMPT_VERSION,
+            resume_text,
+            job_description,
+        )
+        cached = get_cached("job_match", cache_key)
+        if cached is not None:
+            stage.outcome = "cached"
+            return JobMatchResponse(**cached)
 
-    # 1) Fetch saved resume
-    resume: Resume | None = (
-        db.query(Resume)
-        .filter(Resume.user_id == current_user.id)
-        .order_by(Resume.id.desc())
-        .first()
-    )
-
-    if not resume:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No saved resume found for this user.",
+        return JobMatchResponse(
+            **score_match(resume_text, job_description), provisional=True
         )
 
-    resume_text = resume.extracted_text
-    job_description = payload.job_description.strip()
 
-    if not job_description:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Job description cannot be empty.",
-        )
+def _stored_analysis(user_id: int, job_description: str) -> Optional[str]:
+    """The posting's stored analysis, if any (recorded as the user's)."""
+    with Session(engine) as db:
+        job = find_job_description(db, job_description)
+        if job is None:
+            return None
+        record_submitter(db, user_id, job)
+        return format_job_analysis(job)
 
-    # 2) Build prompt
-    prompt = f"""
-You are an expert technical resume writer specializing in job alignment.
 
-You will receive:
-- The candidate’s FULL current resume (raw text)
-- A job description
+def _reserve_analysis(user_id: int) -> UsageReservation:
+    with Session(engine) as db:
+        return reserve_usage(db, user_id, "job_description_analyze")
+
 
-Your job is to produce a **tailored version of the resume** that keeps all of the candidate’s real skills and experience, but:
-- emphasizes the parts that are most relevant to the job
-- adjusts wording to mirror the job description where honest
-- improves clarity and impact
-- removes redundancy or awkward phrasing
-- keeps the length roughly similar to the original resume
+def _save_analysis(user_id: int, analysis: PostingAnalysis) -> str:
+    with Session(engine) as db:
+        job = save_job_description(db, analysis)
+        text = format_job_analysis(job)
+        record_submitter(db, user_id, job)
+        return text
 
-You must then:
-1. Analyze the current match vs. the job.
-2. Generate a tailored resume that is closer to the job requirements.
-3. Re-analyze the tailored resume and report the improved match.
-4. Explain how the tailored resume is better aligned.
 
-The tailored resume must use **only information that already exists** in the candidate’s resume. You may:
+async def _job_analysis(
+    user_id: Optional[int],
+    job_description: str,
+    analyzed: bool,
+) -> str:
+    """
+    Stage 1: the compact posting analysis to tailor against. `analyzed` ->
+    job_description already is one (the request gave a job_id). A posting
+    nobody analyzed yet is analyzed and stored like POST /job-descriptions
+    does, using one of the user's job_description_analyze slots. Falls
+    back to the posting itself when that limit is reached or the analysis
+    fails. Database work runs in a thread, off the event loop.
+    """
+    with timed_stage("tailor", "jd_analysis") as stage:
+        if analyzed:
+            stage.outcome = "cached"
+            return job_description
+        if user_id is None:
+            stage.outcome = "fallback"
+            return job_description
+
+        stored = await asyncio.to_thread(_stored_analysis, user_id, job_description)
+        if stored is not None:
+            stage.outcome = "cached"
+            return stored
+
+        try:
+            reservation = await asyncio.to_thread(_reserve_analysis, user_id)
+        except HTTPException:
+            stage.outcome = "fallback"
+            logger.info("Job description analysis limit reached; tailoring to the posting")
+            return job_description
+
+        try:
+            analysis = await analyze_posting(job_description)
+            text = await asyncio.to_thread(_save_analysis, user_id, analysis)
+        except HTTPException:
+            reservation.release()
+            stage.outcome = "fallback"
+            logger.warning("Job description analysis failed for tailor")
+            return job_description
+        except BaseException:
+            reservation.release()
+            raise
+        reservation.commit()
+        return text
+
+
+def _focus_sections(
+    db: Session,
+    user_id: int,
+    resume_id: int,
+    job_description: str,
+) -> List[str]:
+    """The resume's FOCUS_SECTIONS sections most relevant to the posting."""
+    from app.services.vector_index import relevant_resume_sections
+
+    names: List[str] = []
+    for hit in relevant_resume_sections(db, user_id, resume_id, job_description, k=None):
+        if hit.section != "header" and hit.section not in names:
+            names.append(hit.section)
+    return names[:FOCUS_SECTIONS]
+
+
+def _bullets(items: list) -> str:
+    return "\n".join(f"- {item}" for item in items) or "- (none)"
+
+
+def _build_rewrite_prompt(
+    resume_text: str,
+    job_analysis: str,
+    fit: JobMatchResponse,
+    focus: Sequence[str] = (),
+) -> str:
+    focus_line = ""
+    if focus:
+        focus_line = (
+            "Resume sections most relevant to this job, in order: "
+            + ", ".join(name.title() for name in focus)
+            + "\n"
+        )
+    return f"""
+You are an expert technical resume writer specializing in job alignment.
+
+Rewrite the candidate's resume below so it is closer to the job, while keeping all of the candidate's real skills and experience:
+- emphasize the parts that are most relevant to the job
+- adjust wording to mirror the job description where honest
+- improve clarity and impact
+- remove redundancy or awkward phrasing
+
+A recruiter already compared the current resume with the job.
+Strengths to lead with:
+{_bullets(fit.strong_points)}
+Gaps to address, only where the resume honestly supports it:
+{_bullets(fit.missing_skills + fit.recommendations)}
+{focus_line}
+The tailored resume must use **only information that already exists** in the candidate's resume. You may:
 - rewrite sentences
 - reorder bullets
 - emphasize or de-emphasize details
@@ -164,75 +264,364 @@ VERY IMPORTANT RULES (MUST FOLLOW):
 - Do NOT remove any experience, projects, or education.
 - Do NOT delete or omit any technical skills, tools, languages, or technologies listed.
 - Do NOT shorten the resume significantly. The tailored version must have a **similar word count** to the original (±10% max).
-- You MAY rewrite, reorganize, and emphasize parts for clarity and alignment.
-- You MAY expand on existing skills only if they already appear in the resume. Do NOT invent new experience.
 - You MAY reorder bullet points to put job-relevant ones earlier.
 - You MAY add job-aligned phrasing ONLY if it is truthful and consistent with existing content.
 
-Your output must contain ONLY valid JSON in this exact format:
-{{
-  "improved_match": {{
-    "match_score": <integer 0-100>,
-    "strong_points": ["..."],
-    "missing_skills": ["..."],
-    "red_flags": ["..."],
-    "recommendations": ["..."]
-  }},
-  "tailored_resume": "...FULL RESUME TEXT...",
-  "improvement_explanation": "..."
-}}
+Output format (plain text, no JSON, no markdown fences):
+1. The FULL tailored resume.
+2. A line containing exactly: {CHANGES_MARKER}
+3. Two to four sentences explaining how the tailored resume is better aligned.
 
 Current Resume:
 \"\"\"{resume_text}\"\"\"
 
-Job Description:
-\"\"\"{job_description}\"\"\"
+Job:
+\"\"\"{job_analysis}\"\"\"
 """
 
-    # 3) Call OpenAI
-    try:
-        response = client.responses.create(
-            model=MODEL_NAME,
-            input=prompt,
-        )
-    except Exception as exc:
-        logger.exception("OpenAI API call failed for tailor-from-saved")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate tailored resume. Please try again later.",
-        ) from exc
 
-    raw_output = response.output_text
-    cleaned = clean_json_output(raw_output)
+def _split_rewrite(raw_output: str) -> Tuple[str, str]:
+    """(tailored resume, explanation) from the rewrite stage's output."""
+    resume, _, explanation = raw_output.partition(CHANGES_MARKER)
+    return strip_code_fences(resume), explanation.strip() or DEFAULT_EXPLANATION
 
-    # 4) Parse JSON
-    try:
-        data = json.loads(cleaned)
-    except json.JSONDecodeError as exc:
-        logger.exception(
-            "Failed to parse JSON from OpenAI tailor response: %s",
-            raw_output,
+
+async def _stream_rewrite(prompt: str, output: Dict[str, str]) -> AsyncIterator[str]:
+    """
+    Stage 2: stream the tailored resume text as the model writes it
+    (the explanation after CHANGES_MARKER is held back). The full raw
+    output is left in output["raw"].
+    """
+    raw = ""
+    sent = 0
+    marker_at = -1
+    async for chunk in stream_chat_completion(
+        "tailor",
+        [{"role": "user", "content": prompt}],
+        temperature=0.3,
+    ):
+        raw += chunk
+        if marker_at >= 0:
+            continue
+        marker_at = raw.find(CHANGES_MARKER)
+        # Hold back a possible partial marker at the end
+        safe = marker_at if marker_at >= 0 else len(raw) - len(CHANGES_MARKER)
+        if safe > sent:
+            yield raw[sent:safe]
+            sent = safe
+
+    if marker_at < 0 and len(raw) > sent:
+        yield raw[sent:]
+    output["raw"] = raw
+
+
+def _rescore(
+    fit: JobMatchResponse,
+    resume_text: str,
+    tailored_resume: str,
+    job_description: str,
+) -> JobMatchResponse:
+    """
+    Stage 3: local match of the tailored text. The score is the stage-1
+    score moved by the local improvement, so both are on the same scale.
+    """
+    with timed_stage("tailor", "rescore"):
+        before = score_match(resume_text, job_description)
+        after = score_match(tailored_resume, job_description)
+        delta = after["match_score"] - before["match_score"]
+        return JobMatchResponse(
+            match_score=max(0, min(100, fit.match_score + delta)),
+            strong_points=after["strong_points"] or fit.strong_points,
+            missing_skills=after["missing_skills"],
+            red_flags=fit.red_flags,
+            recommendations=after["recommendations"],
+            provisional=True,
         )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to parse AI response while tailoring resume.",
-        ) from exc
 
-    try:
-        improved_match_raw = data["improved_match"]
-        tailored_resume = data["tailored_resume"]
-        improvement_explanation = data["improvement_explanation"]
-    except KeyError as exc:
-        logger.exception("Missing keys in tailor response JSON: %s", data)
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="AI response was missing expected fields.",
-        ) from exc
-
-    improved_match = JobMatchResponse(**improved_match_raw)
-
-    return TailorFromSavedResponse(
+
+async def _tailor_events(
+    user_id: Optional[int],
+    resume_text: str,
+    job_description: str,
+    analyzed: bool = False,
+    focus: Sequence[str] = (),
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Run the pipeline as (event, data) pairs:
+    - "stage": {"stage", "ms", "outcome"} as each stage finishes
+    - "token": {"text"} pieces of the tailored resume as it is written
+    - one final "result": the TailorFromSavedResponse (no resume_id)
+    Raises HTTPException(500) if the rewrite fails.
+    """
+    started = time.perf_counter()
+    fit = _initial_fit(resume_text, job_description)
+    job_analysis = await _job_analysis(user_id, job_description, analyzed)
+    yield "stage", {
+        "stage": "analysis",
+        "ms": round((time.perf_counter() - started) * 1000),
+        "match_score": fit.match_score,
+    }
+
+    rewrite_key = make_cache_key(
+        "tailor_rewrite", cache_model_key("tailor"), PROMPT_VERSION, resume_text, job_description
+    )
+    with timed_stage("tailor", "rewrite") as stage:
+        cached = get_cached("tailor_rewrite", rewrite_key)
+        if cached is not None:
+            stage.outcome = "cached"
+            tailored_resume = cached["tailored_resume"]
+            explanation = cached["improvement_explanation"]
+            yield "token", {"text": tailored_resume}
+        else:
+            fitted_resume, fitted_analysis = fit_prompt_inputs(
+                "tailor", resume_text, job_analysis
+            )
+            prompt = _build_rewrite_prompt(fitted_resume, fitted_analysis, fit, focus)
+            output: Dict[str, str] = {}
+            try:
+                async for text in _stream_rewrite(prompt, output):
+                    yield "token", {"text": text}
+            except Exception as exc:
+                logger.exception("OpenAI call failed for tailor rewrite")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Failed to generate tailored resume. Please try again later.",
+                ) from exc
+
+            tailored_resume, explanation = _split_rewrite(output["raw"])
+            min_words = MIN_REWRITE_LENGTH_RATIO * len(fitted_resume.split())
+            if len(tailored_resume.split()) < min_words:
+                logger.error("Tailored resume too short: %s", output["raw"])
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="AI response was missing the tailored resume.",
+                )
+            set_cached(
+                rewrite_key,
+                {
+                    "tailored_resume": tailored_resume,
+                    "improvement_explanation": explanation,
+                },
+            )
+    yield "stage", {"stage": "rewrite", "ms": round(stage.ms), "outcome": stage.outcome}
+
+    improved_match = _rescore(fit, resume_text, tailored_resume, job_description)
+    yield "result", TailorFromSavedResponse(
         improved_match=improved_match,
         tailored_resume=tailored_resume,
-        improvement_explanation=improvement_explanation,
+        improvement_explanation=explanation,
+        initial_match=fit,
+    )
+
+
+async def _generate_tailored(
+    user_id: Optional[int],
+    resume_text: str,
+    job_description: str,
+    analyzed: bool = False,
+    focus: Sequence[str] = (),
+) -> TailorFromSavedResponse:
+    """Run the whole pipeline and return its result (no resume_id)."""
+    async for event, data in _tailor_events(
+        user_id, resume_text, job_description, analyzed, focus
+    ):
+        if event == "result":
+            return data
+    raise RuntimeError("Tailor pipeline ended without a result")
+
+
+async def _stream_tailor_events(
+    user_id: int,
+    resume_text: str,
+    job_description: str,
+    analyzed: bool,
+    focus: Sequence[str],
+    cache_key: str,
+    resume_id: int,
+    reservation: UsageReservation,
+) -> AsyncIterator[str]:
+    """
+    SSE generator for /tailor-from-saved/stream: the pipeline's "stage"
+    and "token" events, then "result" (or "error"). The daily slot is
+    committed with the result and released otherwise.
+    """
+    try:
+        async for event, data in _tailor_events(
+            user_id, resume_text, job_description, analyzed, focus
+        ):
+            if event != "result":
+                yield sse_event(event, data)
+                continue
+            data.resume_id = resume_id
+            reservation.commit()
+            set_cached(cache_key, data.model_dump())
+            yield sse_event("result", data.model_dump())
+    except HTTPException as exc:
+        yield sse_event("error", {"detail": exc.detail})
+    finally:
+        # Errors and disconnects before the result don't use up the slot
+        reservation.release()
+
+
+@router.post("/tailor-from-saved", response_model=TailorFromSavedResponse)
+async def tailor_resume_from_saved(
+    payload: TailorFromSavedRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> TailorFromSavedResponse:
+    """
+    Uses the logged-in user's saved resume + a job description to:
+    - analyze current fit
+    - generate a tailored resume
+    - re-score and return the improved match + explanation + tailored resume
+    """
+
+    job_description = resolve_job_text(
+        db, current_user.id, payload.job_id, payload.job_description
+    ).strip()
+
+    # 1) Pick the user's saved resume that fits this job best
+    #    (or the one they asked for)
+    resume = select_resume(db, current_user.id, job_description, payload.resume_id)
+    resume_text = resume.text
+
+    # Same resume + same job description -> reuse the earlier result
+    # (and don't charge a daily slot for it)
+    cache_key = make_cache_key(
+        "tailor", cache_model_key("tailor"), PROMPT_VERSION, resume_text, job_description
+    )
+    cached = get_cached("tailor", cache_key)
+    if cached is not None:
+        return TailorFromSavedResponse(**{**cached, "resume_id": resume.id})
+
+    # DAILY LIMIT CHECK: the slot is only kept if tailoring succeeds
+    from app.services.usage_limits import reserved_usage
+    with reserved_usage(db, current_user.id, "tailor_saved"):
+        result = await _generate_tailored(
+            current_user.id,
+            resume_text,
+            job_description,
+            analyzed=payload.job_id is not None,
+            focus=_focus_sections(db, current_user.id, resume.id, job_description),
+        )
+
+    result.resume_id = resume.id
+    set_cached(cache_key, result.model_dump())
+    return result
+
+
+@router.post("/tailor-from-saved/stream")
+def tailor_resume_from_saved_stream(
+    payload: TailorFromSavedRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Streaming variant of /tailor-from-saved (Server-Sent Events): "stage"
+    events as the pipeline progresses, "token" events with the tailored
+    resume as it is written, then "result". Cache hits are sent as a
+    single "result" event.
+    """
+    job_description = resolve_job_text(
+        db, current_user.id, payload.job_id, payload.job_description
+    ).strip()
+    resume = select_resume(db, current_user.id, job_description, payload.resume_id)
+
+    cache_key = make_cache_key(
+        "tailor", cache_model_key("tailor"), PROMPT_VERSION, resume.text, job_description
+    )
+    cached = get_cached("tailor", cache_key)
+    if cached is not None:
+        return StreamingResponse(
+            iter([sse_event("result", {**cached, "resume_id": resume.id})]),
+            media_type="text/event-stream",
+        )
+
+    # Everything that can fail runs before the slot is taken: once it is,
+    # only the generator's finally gives it back
+    focus = _focus_sections(db, current_user.id, resume.id, job_description)
+    reservation = reserve_usage(db, current_user.id, "tailor_saved")
+
+    return StreamingResponse(
+        _stream_tailor_events(
+            current_user.id,
+            resume.text,
+            job_description,
+            analyzed=payload.job_id is not None,
+            focus=focus,
+            cache_key=cache_key,
+            resume_id=resume.id,
+            reservation=reservation,
+        ),
+        media_type="text/event-stream",
+    )
+
+
+@job_handler("tailor")
+async def _run_tailor_job(job: dict) -> dict:
+    """Background job for /tailor-from-saved/jobs (see app/services/job_queue.py)."""
+    result = await _generate_tailored(
+        # Jobs queued before user_id was stored tailor to the posting itself
+        job.get("user_id"),
+        job["resume_text"],
+        job["job_description"],
+        analyzed=job.get("analyzed", False),
+        focus=job.get("focus", ()),
+    )
+    result.resume_id = job["resume_id"]
+    set_cached(job["cache_key"], result.model_dump())
+    return result.model_dump()
+
+
+@router.post(
+    "/tailor-from-saved/jobs",
+    response_model=BackgroundJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def submit_tailor_job(
+    payload: TailorFromSavedRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+) -> BackgroundJobRead:
+    """
+    Background variant of /tailor-from-saved for clients that can't hold
+    a request open that long. Returns a job right away; poll
+    GET /jobs/{id} (or subscribe to /jobs/{id}/events) for the
+    TailorFromSavedResponse.
+    """
+    job_description = resolve_job_text(
+        db, current_user.id, payload.job_id, payload.job_description
+    ).strip()
+    resume = select_resume(db, current_user.id, job_description, payload.resume_id)
+
+    cache_key = make_cache_key(
+        "tailor", cache_model_key("tailor"), PROMPT_VERSION, resume.text, job_description
+    )
+    cached = get_cached("tailor", cache_key)
+    if cached is not None:
+        job = enqueue(
+            db,
+            current_user.id,
+            "tailor",
+            {},
+            result={**cached, "resume_id": resume.id},
+        )
+        return BackgroundJobRead.from_job(job)
+
+    # The daily slot is held by the job and only kept if it succeeds
+    job = enqueue(
+        db,
+        current_user.id,
+        "tailor",
+        {
+            "user_id": current_user.id,
+            "resume_id": resume.id,
+            "resume_text": resume.text,
+            "job_description": job_description,
+            "analyzed": payload.job_id is not None,
+            "focus": _focus_sections(db, current_user.id, resume.id, job_description),
+            "cache_key": cache_key,
+        },
+        usage_action="tailor_saved",
     )
+    return BackgroundJobRead.from_job(job)
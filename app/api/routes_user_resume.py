@@ -1,13 +1,15 @@
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, status
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db, get_db
 from app.models import Resume, User
-from app.schemas import ResumeRead, ResumeRenameRequest
+from app.schemas import ResumeMetadataRead, ResumeRead, ResumeRenameRequest
 from app.services.resume_extraction import extract_text_from_file
+from app.services.resume_preprocessing import preprocess_resume
 from app.api.routes_auth import get_current_user
 
 router = APIRouter(prefix="/user/resume", tags=["user-resume"])
@@ -17,6 +19,7 @@ MAX_RESUMES_PER_USER = 3
 
 @router.post("/upload", response_model=ResumeRead)
 async def upload_resume(
+    request: Request,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -34,7 +37,15 @@ async def upload_resume(
 
     # 1) Extract text from the uploaded file
     try:
-        extracted_text = await extract_text_from_file(file)
+        extracted_text = await extract_text_from_file(file, request)
+    except HTTPException as exc:
+        # Size / page / time limits carry their own message
+        if exc.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Could not read resume file. Please upload a valid document.",
+        ) from exc
     except Exception as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -42,10 +53,10 @@ async def upload_resume(
         ) from exc
 
     # 2) How many resumes does this user already have?
-    statement = select(Resume).where(Resume.user_id == current_user.id)
-    existing_resumes = db.exec(statement).all()
+    statement = select(Resume.id).where(Resume.user_id == current_user.id)
+    existing_resume_ids = db.exec(statement).all()
 
-    if len(existing_resumes) >= MAX_RESUMES_PER_USER:
+    if len(existing_resume_ids) >= MAX_RESUMES_PER_USER:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=(
@@ -56,12 +67,14 @@ async def upload_resume(
 
     now = datetime.utcnow()
 
-    # 3) Create a new resume record
+    # 3) Create a new resume record, with normalized text / hash / token
+    #    count / sections / summary computed once here
     new_resume = Resume(
         user_id=current_user.id,
         original_filename=file.filename or "resume",
         content_type=file.content_type,
         extracted_text=extracted_text,
+        **preprocess_resume(extracted_text),
         created_at=now,
         updated_at=now,
     )
@@ -69,12 +82,16 @@ async def upload_resume(
     db.add(new_resume)
     db.commit()
     db.refresh(new_resume)
+
+    # Section embeddings for resume selection / section search
+    from app.services.vector_index import index_resume
+    index_resume(db, new_resume)
     return new_resume
 
 
 @router.get("", response_model=ResumeRead)
-def get_primary_resume(
-    db: Session = Depends(get_db),
+async def get_primary_resume(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> ResumeRead:
     """
@@ -89,7 +106,7 @@ def get_primary_resume(
         .where(Resume.user_id == current_user.id)
         .order_by(Resume.updated_at.desc())
     )
-    resume = db.exec(statement).first()
+    resume = (await db.exec(statement)).first()
 
     if not resume:
         raise HTTPException(
@@ -100,24 +117,56 @@ def get_primary_resume(
     return resume
 
 
-@router.get("/list", response_model=List[ResumeRead])
-def list_resumes(
-    db: Session = Depends(get_db),
+@router.get("/list", response_model=List[ResumeMetadataRead])
+async def list_resumes(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
-) -> List[ResumeRead]:
+) -> List[ResumeMetadataRead]:
     """
     Return up to MAX_RESUMES_PER_USER resumes for the current user,
     ordered by most-recently-updated first.
 
-    This is used by the My Resumes page to show all saved resumes.
+    This is used by the My Resumes page to show all saved resumes, so it
+    only loads metadata columns - never the full resume text.
     """
     statement = (
-        select(Resume)
+        select(
+            Resume.id,
+            Resume.original_filename,
+            Resume.content_type,
+            Resume.token_count,
+            Resume.summary,
+            Resume.created_at,
+            Resume.updated_at,
+        )
         .where(Resume.user_id == current_user.id)
         .order_by(Resume.updated_at.desc())
     )
-    resumes = db.exec(statement).all()
-    return resumes
+    rows = (await db.exec(statement)).all()
+    return [ResumeMetadataRead(**row._mapping) for row in rows]
+
+
+@router.get("/{resume_id}", response_model=ResumeRead)
+async def get_resume(
+    resume_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> ResumeRead:
+    """
+    Get one saved resume, including its full text (e.g. for download).
+    """
+    statement = select(Resume).where(
+        Resume.id == resume_id, Resume.user_id == current_user.id
+    )
+    resume = (await db.exec(statement)).first()
+
+    if not resume:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found.",
+        )
+
+    return resume
 
 
 @router.delete("/{resume_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -144,13 +193,15 @@ def delete_resume(
 
     db.delete(resume)
     db.commit()
+    from app.services.vector_index import remove_resume
+    remove_resume(db, resume_id)
     # 204 No Content – nothing to return
 
 
 @router.patch("/rename", response_model=ResumeRead)
-def rename_resume(
+async def rename_resume(
     payload: ResumeRenameRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> ResumeRead:
     """
@@ -172,7 +223,7 @@ def rename_resume(
         .where(Resume.user_id == current_user.id)
         .order_by(Resume.updated_at.desc())
     )
-    resume = db.exec(statement).first()
+    resume = (await db.exec(statement)).first()
 
     if not resume:
         raise HTTPException(
@@ -184,6 +235,6 @@ def rename_resume(
     resume.updated_at = datetime.utcnow()
 
     db.add(resume)
-    db.commit()
-    db.refresh(resume)
+    await db.commit()
+    await db.refresh(resume)
     return resume
@@ -1,33 +1,154 @@
 # app/database.py
 import os
-from sqlmodel import SQLModel, create_engine, Session
+import threading
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 # Use Supabase Postgres in production, SQLite for local dev
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = os.getenv("DATABASE_URL") or "sqlite:///./app.db"
+
+# Connection pool, per engine and per worker process
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Replace connections before Supabase / PgBouncer drops them as idle
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Postgres only; 0 = no limit. Leave at 0 behind a transaction-mode
+# pooler that rejects startup options.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
 
-if DATABASE_URL:
-    # Supabase (or any other Postgres)
-    engine = create_engine(DATABASE_URL, echo=False)
-else:
-    # Local dev fallback (SQLite)
-    engine = create_engine(
-        "sqlite:///./app.db",
-        echo=False,
-        connect_args={"check_same_thread": False},
-    )
+# Sync driver -> async driver for the same database
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
 
-def init_db() -> None:
+class _WaitCounting:
     """
-    Create all tables if they don't exist yet.
-    Called once on startup (both locally and on Render).
+    Pool mixin that counts checkouts in progress: callers blocked waiting
+    for a free connection once the pool and its overflow are used up.
     """
-    from app import models  # make sure models are imported
 
-    SQLModel.metadata.create_all(engine)
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.waiting = 0
+        self._waiting_lock = threading.Lock()
+
+    def _do_get(self):
+        # Free connections or room to open one: served without waiting
+        if self.checkedout() < self.size() + self._max_overflow:
+            return super()._do_get()
+
+        with self._waiting_lock:
+            self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            with self._waiting_lock:
+                self.waiting -= 1
+
+
+class MeteredQueuePool(_WaitCounting, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_WaitCounting, AsyncAdaptedQueuePool):
+    pass
+
+
+def _engine_options(backend: str, is_async: bool) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "echo": False,
+        "poolclass": MeteredAsyncQueuePool if is_async else MeteredQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        # Test connections on checkout so dropped ones are replaced, not 500s
+        "pool_pre_ping": True,
+    }
+
+    if backend == "sqlite":
+        if not is_async:
+            options["connect_args"] = {"check_same_thread": False}
+    elif DB_STATEMENT_TIMEOUT_MS > 0:
+        if is_async:
+            options["connect_args"] = {
+                "server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+            }
+        else:
+            options["connect_args"] = {
+                "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+            }
+    return options
+
+
+_url = make_url(DATABASE_URL)
+_backend = _url.get_backend_name()
+
+engine = create_engine(_url, **_engine_options(_backend, is_async=False))
+
+_async_engine: Optional[AsyncEngine] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    Async engine for the same database (asyncpg / aiosqlite), created on
+    first use with the same pool settings as `engine`.
+    """
+    global _async_engine
+    if _async_engine is None:
+        if _backend not in ASYNC_DRIVERS:
+            raise RuntimeError(f"No async driver configured for {_backend}")
+        url = _url.set(drivername=ASYNC_DRIVERS[_backend])
+        _async_engine = create_async_engine(
+            url, **_engine_options(_backend, is_async=True)
+        )
+    return _async_engine
 
 
 def get_db():
-    """FastAPI dependency for DB sessions."""
+    """
+    FastAPI dependency for sync DB sessions, for routes that write through
+    the service layer (usage limits, job queue, vector index, ...). Those
+    services take a sync Session and are also used outside requests (the
+    worker, migrations, benchmarks), so these routes stay sync and run in
+    the threadpool. Read-only routes use get_async_db; one that needs a
+    service helper calls it with `await db.run_sync(helper, ...)`.
+    """
     with Session(engine) as session:
         yield session
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency for async DB sessions: queries are awaited on the
+    event loop instead of tying up a threadpool thread.
+    """
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+def _pool_stats(pool: Any) -> Dict[str, int]:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # Connections open beyond `size` (up to DB_MAX_OVERFLOW)
+        "overflow": max(0, pool.overflow()),
+        "waiting": getattr(pool, "waiting", 0),
+    }
+
+
+def pool_stats() -> Dict[str, Optional[Dict[str, int]]]:
+    """Connection pool gauges for the sync and (if started) async engines."""
+    return {
+        "sync": _pool_stats(engine.pool),
+        "async": _pool_stats(_async_engine.pool) if _async_engine else None,
+    }
@@ -2,18 +2,12 @@
 """
 Optional helper to manually initialize Supabase tables.
 
-Run locally with DATABASE_URL pointing at Supabase:
+Kept for old deploy scripts; same as `python -m app.migrate`:
 
-    DATABASE_URL="<supabase url>" uvicorn app.main:app --reload
-
-You usually don't need this, because init_db() is called on startup.
+    DATABASE_URL="<supabase url>" python -m app.init_db_supabase
 """
 
-from app.database import init_db  # imports models via database.init_db
-
-
-def main():
-    init_db()
+from app.migrate import main
 
 
 if __name__ == "__main__":
@@ -3,11 +3,14 @@ from dotenv import load_dotenv
 
 load_dotenv()  # load .env for local dev
 
+import asyncio
 import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.database import init_db
+from app.migrations import check_schema
 from app.api.routes_health import router as health_router
 from app.api.routes_resume import router as resume_router
 from app.api.routes_cover_letter import router as cover_letter_router
@@ -16,10 +19,30 @@ from app.api.routes_user_resume import router as user_resume_router
 from app.api.routes_job_match import router as job_match_router
 from app.api.routes_tailored_resume import router as tailored_resume_router
 from app.api.routes_profile import router as profile_router
+from app.api.routes_job_description import router as job_description_router
+from app.api.routes_jobs import router as jobs_router
+from app.services.job_queue import JOB_INLINE_WORKER, JobWorker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # At server start-up rather than import time, so importing the app
+    # (tools, the startup profiler) doesn't touch the database
+    check_schema()
+
+    worker_task = None
+    if JOB_INLINE_WORKER:
+        worker_task = asyncio.create_task(JobWorker().run())
+    try:
+        yield
+    finally:
+        if worker_task is not None:
+            worker_task.cancel()
+            await asyncio.gather(worker_task, return_exceptions=True)
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="AI Job Assistant API")
+    app = FastAPI(title="AI Job Assistant API", lifespan=lifespan)
 
     # ---- CORS for Vercel / local dev ----
     origins_env = os.getenv("CORS_ORIGINS")
@@ -46,6 +69,8 @@ def create_app() -> FastAPI:
     app.include_router(job_match_router, tags=["job-match"])
     app.include_router(tailored_resume_router, tags=["tailored-resume"])
     app.include_router(profile_router)
+    app.include_router(job_description_router)
+    app.include_router(jobs_router)
 
     @app.get("/")
     def root():
@@ -55,4 +80,3 @@ def create_app() -> FastAPI:
 
 
 app = create_app()
-init_db()
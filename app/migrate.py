@@ -0,0 +1,27 @@
+# app/migrate.py
+"""
+Apply pending schema migrations (see app/migrations). Run once per
+deploy, before starting the app:
+
+    python -m app.migrate
+"""
+
+import logging
+
+from dotenv import load_dotenv
+
+load_dotenv()  # before app.database reads DATABASE_URL
+
+from app.migrations import latest_version, migrate  # noqa: E402
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    applied = migrate()
+    if applied:
+        print(f"Applied {len(applied)} migration(s): {', '.join(applied)}")
+    print(f"Database schema is at version {latest_version()}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+# app/migrations/__init__.py
+"""
+Versioned schema migrations.
+
+Each migration is a module in this package named vNNNN_<what_it_does>.py
+with an upgrade(conn) function; NNNN is its version. Applied versions are
+recorded in the schemaversion table. To change the schema, change the
+models and add the next vNNNN module doing the same to existing databases.
+Migrations spell out their DDL (or Core tables of their own) instead of
+using app.models tables, which keep changing after the migration is written.
+
+Run pending migrations once per deploy, before the app starts:
+
+    python -m app.migrate
+
+App startup only runs check_schema(): one query comparing the recorded
+version with the newest module here. A new, empty database is created
+straight from the models and stamped with the newest version.
+"""
+
+import importlib
+import logging
+import os
+import pkgutil
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+from sqlalchemy import func, insert, inspect, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlmodel import SQLModel
+
+from app.database import engine
+from app.models import SchemaVersion
+
+logger = logging.getLogger(__name__)
+
+# Migrate on startup instead of refusing to start when the schema is
+# behind. On by default for local SQLite only; production runs the
+# migrate command once per deploy instead of once per worker.
+AUTO_MIGRATE = os.getenv(
+    "DB_AUTO_MIGRATE", "1" if engine.dialect.name == "sqlite" else "0"
+) == "1"
+
+# Postgres advisory lock key, so concurrent `migrate` runs take turns
+MIGRATION_LOCK_ID = 727_001
+
+_MODULE_RE = re.compile(r"^v(\d{4})_\w+$")
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable[[Connection], None]
+
+
+def _module_names() -> List[str]:
+    names = [
+        info.name for info in pkgutil.iter_modules(__path__)
+        if _MODULE_RE.match(info.name)
+    ]
+    return sorted(names)
+
+
+def latest_version() -> int:
+    """Newest migration version, from module names only (nothing imported)."""
+    names = _module_names()
+    return int(_MODULE_RE.match(names[-1]).group(1)) if names else 0
+
+
+def load_migrations() -> List[Migration]:
+    migrations = []
+    for name in _module_names():
+        module = importlib.import_module(f"{__name__}.{name}")
+        migrations.append(
+            Migration(int(_MODULE_RE.match(name).group(1)), name, module.upgrade)
+        )
+
+    versions = [m.version for m in migrations]
+    if versions != list(range(1, len(versions) + 1)):
+        raise RuntimeError(f"Migration versions must be 1..N without gaps: {versions}")
+    return migrations
+
+
+def current_version(conn: Connection) -> Optional[int]:
+    """Newest applied version; 0 if none, None if the table doesn't exist."""
+    try:
+        with conn.begin():
+            return conn.execute(select(func.max(SchemaVersion.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+@contextmanager
+def _migration_lock(conn: Connection) -> Iterator[None]:
+    if conn.dialect.name != "postgresql":
+        yield
+        return
+
+    conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_ID})
+    conn.commit()
+    try:
+        yield
+    finally:
+        conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_ID})
+        conn.commit()
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        insert(SchemaVersion).values(
+            version=migration.version,
+            name=migration.name,
+            applied_at=datetime.utcnow(),
+        )
+    )
+
+
+def migrate() -> List[str]:
+    """
+    Bring the database up to the newest version, one transaction per
+    migration. Returns the names of the migrations applied.
+    """
+    migrations = load_migrations()
+    applied: List[str] = []
+
+    with engine.connect() as conn, _migration_lock(conn):
+        version = current_version(conn)
+        with conn.begin():
+            is_new = version is None and not inspect(conn).get_table_names()
+
+        if is_new:
+            # New database: the models already are the newest schema
+            with conn.begin():
+                SQLModel.metadata.create_all(conn)
+                for migration in migrations:
+                    _record(conn, migration)
+            logger.info("Created a new database at version %d", latest_version())
+            return [m.name for m in migrations]
+
+        if version is None:
+            # Created by create_all() before migrations existed
+            with conn.begin():
+                SchemaVersion.__table__.create(conn)
+            version = 0
+
+        for migration in migrations:
+            if migration.version <= version:
+                continue
+            logger.info("Applying migration %s", migration.name)
+            with conn.begin():
+                migration.upgrade(conn)
+                _record(conn, migration)
+            applied.append(migration.name)
+
+    return applied
+
+
+def check_schema() -> None:
+    """
+    Startup check: fail fast (or migrate, with DB_AUTO_MIGRATE) when the
+    database is behind this code.
+    """
+    latest = latest_version()
+    with engine.connect() as conn:
+        version = current_version(conn)
+
+    if version == latest:
+        return
+    if version is not None and version > latest:
+        # Rolling deploy: a newer release already migrated this database
+        logger.warning(
+            "Database schema is at version %d, newer than this code (%d)",
+            version,
+            latest,
+        )
+        return
+    if AUTO_MIGRATE:
+        migrate()
+        return
+
+    raise RuntimeError(
+        f"Database schema is at version {version or 0} but this code needs "
+        f"{latest}. Run `python -m app.migrate` before starting the app."
+    )
@@ -0,0 +1,185 @@
+# app/migrations/v0001_baseline.py
+"""
+Baseline: bring a database made by the old startup create_all() up to
+the schema as of versioned migrations. Creates missing tables, adds
+missing nullable columns and indexes, and drops the single-column
+indexes replaced by composite ones.
+
+The schema is spelled out here rather than taken from app.models, so this
+migration does the same thing no matter how the models change later.
+"""
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    inspect,
+    text,
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+Table(
+    "user",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("email", String, nullable=False),
+    Column("hashed_password", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_user_email", "email", unique=True),
+)
+
+Table(
+    "resume",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("original_filename", String, nullable=False),
+    Column("content_type", String),
+    Column("extracted_text", String, nullable=False),
+    Column("normalized_text", String),
+    Column("content_hash", String(64)),
+    Column("token_count", Integer),
+    Column("sections_json", String),
+    Column("summary", String),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Index("ix_resume_content_hash", "content_hash"),
+    Index(
+        "ix_resume_user_id_updated_at",
+        "user_id",
+        "updated_at",
+        postgresql_include=["id"],
+    ),
+)
+
+Table(
+    "usagelog",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, nullable=False),
+    Column("action", String, nullable=False),
+    Column("timestamp", DateTime, nullable=False),
+    Index("ix_usagelog_user_id_action_timestamp", "user_id", "action", "timestamp"),
+)
+
+Table(
+    "usagecounter",
+    metadata,
+    Column("user_id", Integer, primary_key=True, autoincrement=False),
+    Column("action", String(64), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("count", Integer, nullable=False),
+)
+
+Table(
+    "userprofile",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("experience_level", String),
+    Column("preferred_roles", String),
+    Column("preferred_industries", String),
+    Column("preferred_locations", String),
+    Column("skills", String),
+    Column("work_authorization", String),
+    Column("career_goal", String),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Index("ix_userprofile_user_id", "user_id", unique=True),
+)
+
+Table(
+    "llmcacheentry",
+    metadata,
+    Column("key", String(64), primary_key=True),
+    Column("value", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Column("last_used_at", DateTime, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+    Index("ix_llmcacheentry_last_used_at", "last_used_at"),
+    Index("ix_llmcacheentry_expires_at", "expires_at"),
+)
+
+Table(
+    "jobdescription",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("content_hash", String(64), nullable=False),
+    Column("description_text", String, nullable=False),
+    Column("title", String),
+    Column("company", String),
+    Column("seniority", String),
+    Column("summary", String),
+    Column("required_skills_json", String, nullable=False),
+    Column("nice_to_have_json", String, nullable=False),
+    Column("keywords_json", String, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_jobdescription_content_hash", "content_hash", unique=True),
+)
+
+Table(
+    "embeddingchunk",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("owner_type", String(16), nullable=False),
+    Column("owner_id", Integer, nullable=False),
+    Column("user_id", Integer),
+    Column("section", String, nullable=False),
+    Column("text", String, nullable=False),
+    Column("backend", String(32), nullable=False),
+    Column("vector", LargeBinary, nullable=False),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_embeddingchunk_owner", "owner_type", "owner_id"),
+    Index("ix_embeddingchunk_user", "user_id", "owner_type", "backend"),
+)
+
+# Indexes older databases have that were replaced with composite ones
+# (table -> index names)
+REPLACED_INDEXES = {
+    "usagelog": ["ix_usagelog_user_id", "ix_usagelog_action", "ix_usagelog_timestamp"],
+    "embeddingchunk": [
+        "ix_embeddingchunk_owner_type",
+        "ix_embeddingchunk_owner_id",
+        "ix_embeddingchunk_user_id",
+    ],
+}
+
+
+def upgrade(conn: Connection) -> None:
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+
+    metadata.create_all(conn, checkfirst=True)
+
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(
+                text(
+                    f'ALTER TABLE "{table.name}" '
+                    f'ADD COLUMN "{column.name}" {col_type}'
+                )
+            )
+
+        indexes = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for name in REPLACED_INDEXES.get(table.name, []):
+            if name in indexes:
+                conn.execute(text(f'DROP INDEX "{name}"'))
+        for index in table.indexes:
+            if index.name not in indexes:
+                index.create(conn)
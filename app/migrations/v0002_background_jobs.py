@@ -0,0 +1,47 @@
+# app/migrations/v0002_background_jobs.py
+"""Add the backgroundjob table used by the job queue."""
+
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+# The "user" table only needs to be known for the foreign key
+Table("user", metadata, Column("id", Integer, primary_key=True))
+
+backgroundjob = Table(
+    "backgroundjob",
+    metadata,
+    Column("id", String(32), primary_key=True),
+    Column("user_id", Integer, ForeignKey("user.id"), nullable=False),
+    Column("kind", String(32), nullable=False),
+    Column("status", String(16), nullable=False),
+    Column("payload_json", String, nullable=False),
+    Column("result_json", String),
+    Column("error", String),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("run_after", DateTime, nullable=False),
+    Column("locked_until", DateTime),
+    Column("usage_action", String(64)),
+    Column("usage_day", Date),
+    Column("created_at", DateTime, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Column("finished_at", DateTime),
+    Index("ix_backgroundjob_status_run_after", "status", "run_after"),
+    Index("ix_backgroundjob_user_id_status", "user_id", "status"),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    backgroundjob.create(conn)
@@ -0,0 +1,14 @@
+# app/migrations/v0003_user_tier.py
+"""Add user.tier ("free" / "pro"), used to pick models per request."""
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def upgrade(conn: Connection) -> None:
+    conn.execute(
+        text(
+            'ALTER TABLE "user" '
+            "ADD COLUMN tier VARCHAR NOT NULL DEFAULT 'free'"
+        )
+    )
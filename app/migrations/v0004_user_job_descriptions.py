@@ -0,0 +1,29 @@
+# app/migrations/v0004_user_job_descriptions.py
+"""Add userjobdescription: which users submitted which job postings."""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+# Only needed for the foreign keys
+Table("user", metadata, Column("id", Integer, primary_key=True))
+Table("jobdescription", metadata, Column("id", Integer, primary_key=True))
+
+userjobdescription = Table(
+    "userjobdescription",
+    metadata,
+    Column("user_id", Integer, ForeignKey("user.id"), primary_key=True, autoincrement=False),
+    Column(
+        "job_description_id",
+        Integer,
+        ForeignKey("jobdescription.id"),
+        primary_key=True,
+        autoincrement=False,
+    ),
+    Column("created_at", DateTime, nullable=False),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    userjobdescription.create(conn)
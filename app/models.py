@@ -1,7 +1,8 @@
 # app/models.py
 
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -10,12 +11,26 @@ class User(SQLModel, table=True):
     email: str = Field(index=True, unique=True)
     hashed_password: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    # "free" or "pro"; decides which models serve the user's AI calls
+    # (app/services/model_router.py)
+    tier: str = Field(default="free", sa_column_kwargs={"server_default": "free"})
 
     # relationship
     resume: "Resume" = Relationship(back_populates="user")
 
 
 class Resume(SQLModel, table=True):
+    __table_args__ = (
+        # Every /user/resume* and AI route: a user's resumes, newest first.
+        # Includes id so "which resumes does this user have" is index-only.
+        Index(
+            "ix_resume_user_id_updated_at",
+            "user_id",
+            "updated_at",
+            postgresql_include=["id"],
+        ),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
 
@@ -23,6 +38,14 @@ class Resume(SQLModel, table=True):
     content_type: str | None
     extracted_text: str
 
+    # Upload-time artifacts (app/services/resume_preprocessing.py).
+    # Nullable because resumes saved before preprocessing don't have them.
+    normalized_text: str | None = None
+    content_hash: str | None = Field(default=None, index=True, max_length=64)
+    token_count: int | None = None
+    sections_json: str | None = None  # {"experience": "...", "skills": "...", ...}
+    summary: str | None = None
+
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -30,14 +53,30 @@ class Resume(SQLModel, table=True):
     user: User = Relationship(back_populates="resume")
 
 class UsageLog(SQLModel, table=True):
-    id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(index=True)
-    action: str = Field(index=True)  # e.g. "resume_improve", "job_match_saved"
-    timestamp: datetime = Field(
-        default_factory=datetime.utcnow,
-        index=True,
+    __table_args__ = (
+        # "How many times did this user do this action since T" is an
+        # index-only range count
+        Index("ix_usagelog_user_id_action_timestamp", "user_id", "action", "timestamp"),
     )
 
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int
+    action: str  # e.g. "resume_improve", "job_match_saved"
+    timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+
+class UsageCounter(SQLModel, table=True):
+    """
+    How many times a user did an action on one UTC day. Daily limits are
+    checked and incremented here in one conditional UPDATE (see
+    app/services/usage_limits.py); UsageLog is only the audit trail.
+    """
+    user_id: int = Field(primary_key=True)
+    action: str = Field(primary_key=True, max_length=64)
+    day: date = Field(primary_key=True)
+    count: int = 0
+
+
 class UserProfile(SQLModel, table=True):
     """
     1:1 career profile for each user.
@@ -63,3 +102,120 @@ class UserProfile(SQLModel, table=True):
 
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class LLMCacheEntry(SQLModel, table=True):
+    """
+    Shared cache row for AI results (see app/services/llm_cache.py).
+    `key` is the SHA-256 content hash; `value` is the JSON response payload.
+    """
+    key: str = Field(primary_key=True, max_length=64)
+    value: str
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    last_used_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    expires_at: datetime = Field(index=True)
+
+
+class JobDescription(SQLModel, table=True):
+    """
+    One row per distinct job posting (by normalized-text hash), shared by
+    every user who pastes it. Holds the structured analysis that the
+    job-match, tailor and cover-letter routes reuse via `job_id`.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    content_hash: str = Field(index=True, unique=True, max_length=64)
+    description_text: str
+
+    title: Optional[str] = None
+    company: Optional[str] = None
+    seniority: Optional[str] = None  # "intern", "junior", "mid", "senior", ...
+    summary: Optional[str] = None
+    required_skills_json: str = "[]"
+    nice_to_have_json: str = "[]"
+    keywords_json: str = "[]"
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class UserJobDescription(SQLModel, table=True):
+    """
+    A user submitted this job posting. Postings are shared, so this is what
+    limits /job-descriptions/search to the caller's own postings.
+    """
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    job_description_id: int = Field(foreign_key="jobdescription.id", primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class EmbeddingChunk(SQLModel, table=True):
+    """
+    One embedded piece of text for the vector index (app/services/vector_index.py):
+    a resume section, or a job description's analysis / paragraph.
+    `vector` holds float32 values; `backend` is the embedder that made it.
+    """
+    __table_args__ = (
+        # Re-indexing / removing one resume or job description
+        Index("ix_embeddingchunk_owner", "owner_type", "owner_id"),
+        # A user's resume chunks (resume selection on every AI route)
+        Index("ix_embeddingchunk_user", "user_id", "owner_type", "backend"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    owner_type: str = Field(max_length=16)  # "resume" | "job"
+    owner_id: int
+    # Resume owner; None for job descriptions, which are shared
+    user_id: Optional[int] = None
+
+    section: str
+    text: str
+    backend: str = Field(max_length=32)
+    vector: bytes
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class SchemaVersion(SQLModel, table=True):
+    """One row per applied schema migration (see app/migrations)."""
+    version: int = Field(primary_key=True)
+    name: str = Field(max_length=128)
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class BackgroundJob(SQLModel, table=True):
+    """
+    A long-running AI generation run by the job workers instead of inside
+    the HTTP request (see app/services/job_queue.py). `id` is a random hex
+    token; the owner polls it via /jobs/{id}.
+    """
+    __table_args__ = (
+        # Workers looking for the next runnable job
+        Index("ix_backgroundjob_status_run_after", "status", "run_after"),
+        # Per-user caps and "my jobs"
+        Index("ix_backgroundjob_user_id_status", "user_id", "status"),
+    )
+
+    id: str = Field(primary_key=True, max_length=32)
+    user_id: int = Field(foreign_key="user.id")
+    kind: str = Field(max_length=32)  # "tailor", "resume_improve"
+    # queued | running | succeeded | failed (won't retry) | dead (out of attempts)
+    status: str = Field(default="queued", max_length=16)
+
+    payload_json: str
+    result_json: Optional[str] = None
+    error: Optional[str] = None
+
+    attempts: int = 0
+    max_attempts: int = 3
+    # Not picked up before this (retry backoff)
+    run_after: datetime = Field(default_factory=datetime.utcnow)
+    # A running job whose lease ran out is assumed lost and picked up again
+    locked_until: Optional[datetime] = None
+
+    # Daily-limit slot held while the job runs (app/services/usage_limits.py)
+    usage_action: Optional[str] = Field(default=None, max_length=64)
+    usage_day: Optional[date] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
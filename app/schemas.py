@@ -1,5 +1,6 @@
 # app/schemas.py
-from typing import Optional
+import json
+from typing import Any, Dict, Optional
 from datetime import datetime
 from pydantic import BaseModel
 
@@ -16,6 +17,23 @@ class ResumeRead(BaseModel):
         from_attributes = True
 
 
+class ResumeMetadataRead(BaseModel):
+    """
+    Lightweight resume info for list views: no full text, just what the
+    My Resumes page needs to show a card. Fetch /user/resume/{id} for text.
+    """
+    id: int
+    original_filename: str
+    content_type: str | None
+    token_count: int | None = None
+    summary: str | None = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class ResumeRenameRequest(BaseModel):
     """
     Payload for renaming a saved resume.
@@ -50,4 +68,34 @@ class UserProfileRead(UserProfileBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True  # so we can return SQLModel instances directly
\ No newline at end of file
+        from_attributes = True  # so we can return SQLModel instances directly
+
+
+class BackgroundJobRead(BaseModel):
+    """
+    A background job as its owner sees it (see app/services/job_queue.py).
+    `result` is the route's normal response body once status is
+    "succeeded"; `error` is set when it is "failed" or "dead" (and, while
+    a retry is pending, holds the last attempt's error).
+    """
+    id: str
+    kind: str
+    status: str
+    attempts: int
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def from_job(cls, job) -> "BackgroundJobRead":
+        return cls(
+            id=job.id,
+            kind=job.kind,
+            status=job.status,
+            attempts=job.attempts,
+            result=json.loads(job.result_json) if job.result_json else None,
+            error=job.error,
+            created_at=job.created_at,
+            finished_at=job.finished_at,
+        )
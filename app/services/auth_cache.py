@@ -0,0 +1,114 @@
+# app/services/auth_cache.py
+"""
+Short-lived cache of authenticated users ("principals").
+
+get_current_user used to run a SELECT for every authenticated request
+just to turn the token into a User. Entries here are keyed by the token
+subject: the user id for tokens that carry one ("uid" claim) and the
+email for older tokens. Hits need no database session at all.
+
+Entries expire after AUTH_CACHE_TTL_SECONDS and are dropped as soon as
+this process updates or deletes the user (SQLAlchemy mapper events).
+Other workers only see such changes once their entry expires, so keep
+the TTL short.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple, Union
+
+from sqlalchemy import event
+
+from app.models import User
+
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+SubjectKey = Union[int, str]
+
+
+class Principal(NamedTuple):
+    id: int
+    email: str
+    created_at: datetime
+    tier: str
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(user.id, user.email, user.created_at, user.tier)
+
+    def to_user(self) -> User:
+        """
+        A fresh, detached User for the request (no password hash, not
+        bound to any session), so handlers can't alter the cached entry.
+        """
+        return User(
+            id=self.id,
+            email=self.email,
+            hashed_password="",
+            created_at=self.created_at,
+            tier=self.tier,
+        )
+
+
+class PrincipalCache:
+    """Thread-safe LRU dict with per-entry expiry."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = AUTH_CACHE_TTL_SECONDS,
+        max_entries: int = AUTH_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._data: "OrderedDict[SubjectKey, Tuple[float, Principal]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: SubjectKey) -> Optional[Principal]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, principal = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return principal
+
+    def set(self, key: SubjectKey, principal: Principal) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, principal)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """Drop every entry for `user_id` (by id and by email)."""
+        with self._lock:
+            stale = [
+                key
+                for key, (_, principal) in self._data.items()
+                if principal.id == user_id
+            ]
+            for key in stale:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+principal_cache = PrincipalCache()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target: User) -> None:
+    if target.id is not None:
+        principal_cache.invalidate_user(target.id)
@@ -0,0 +1,100 @@
+# app/services/document_parsing.py
+"""
+CPU-bound document parsing that runs inside the parser process pool
+(see run_parser in app/services/resume_extraction.py).
+
+Everything here must stay picklable and cheap to import: worker processes
+import this module on start-up, and so does the API process (for the
+exception types). python-docx and pypdf are imported by the parser that
+needs them, on first use.
+"""
+
+import signal
+from typing import Any, Callable, Iterator
+
+try:
+    import resource  # POSIX only
+except ImportError:  # pragma: no cover - Windows dev machines
+    resource = None
+
+
+class DocumentLimitError(ValueError):
+    """The document is over one of the configured size / page limits."""
+
+
+class ParseBudgetExceeded(RuntimeError):
+    """Parsing used more CPU time than its budget allowed."""
+
+
+def _on_cpu_limit(signum, frame):
+    raise ParseBudgetExceeded("Document parsing exceeded its CPU time budget.")
+
+
+def init_worker() -> None:
+    """Process pool initializer: turn SIGXCPU into ParseBudgetExceeded."""
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _on_cpu_limit)
+
+
+def run_with_cpu_budget(
+    cpu_seconds: int,
+    func: Callable[..., Any],
+    *args: Any,
+) -> Any:
+    """
+    Run func(*args) with a soft RLIMIT_CPU of `cpu_seconds` on top of what
+    this worker has already used, then lift the limit again.
+    """
+    if resource is None:
+        return func(*args)
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (used + cpu_seconds, hard))
+    try:
+        return func(*args)
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+def parse_txt(path: str) -> str:
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
+
+
+def parse_docx(path: str) -> str:
+    from docx import Document
+
+    doc = Document(path)
+    # Join all paragraph texts into a single string
+    return "\n".join(p.text for p in doc.paragraphs)
+
+
+def iter_pdf_pages(path: str, max_pages: int) -> Iterator[str]:
+    """
+    Yield the text of each page in turn.
+
+    The file object is handed to pypdf directly (a path would make pypdf
+    read the whole file into memory first), so objects are loaded from
+    disk as each page is visited.
+    """
+    from pypdf import PdfReader
+
+    with open(path, "rb") as fh:
+        reader = PdfReader(fh)
+
+        # Counting pages only walks the page tree, so this check is cheap
+        # compared to extracting text from every page.
+        page_count = len(reader.pages)
+        if page_count > max_pages:
+            raise DocumentLimitError(
+                f"PDF has {page_count} pages; the limit is {max_pages}."
+            )
+
+        for page in reader.pages:
+            yield page.extract_text() or ""
+
+
+def parse_pdf(path: str, max_pages: int) -> str:
+    return "\n".join(iter_pdf_pages(path, max_pages))
@@ -0,0 +1,90 @@
+# app/services/embeddings.py
+"""
+Text embedding backends for the vector index.
+
+Backends are picked by name from EMBEDDING_BACKENDS (env EMBEDDING_BACKEND).
+Add one by implementing the Embedder protocol and registering it there.
+Stored vectors remember which backend made them, so switching backends
+re-embeds on the next index refresh instead of mixing vector spaces.
+
+The default "hashing" backend is local and dependency-light: sparse
+features (content words, word bigrams and canonical skill names) are
+hashed into a fixed number of signed dimensions and L2-normalized, so a
+dot product is a cosine similarity. It captures vocabulary overlap, not
+deep semantics, but needs no model download or network call.
+"""
+
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Callable, Dict, List, Protocol
+
+import numpy as np
+
+from app.services.match_scoring import extract_skills
+from app.services.prompt_builder import content_words
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "hashing")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "512"))
+
+# Extra weight for recognized skills ("k8s" and "Kubernetes" hash the same)
+SKILL_FEATURE_WEIGHT = 2.0
+
+
+class Embedder(Protocol):
+    name: str
+    dim: int
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Return a (len(texts), dim) float32 array of unit-length rows."""
+        ...
+
+
+class HashingEmbedder:
+    name = "hashing"
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def _features(self, text: str) -> Dict[str, float]:
+        words = content_words(text)
+        features = {
+            word: 1.0 + math.log(n) for word, n in Counter(words).items()
+        }
+        for first, second in zip(words, words[1:]):
+            bigram = f"{first} {second}"
+            features[bigram] = features.get(bigram, 0.0) + 0.5
+
+        for skill in extract_skills(text):
+            features[f"skill:{skill}"] = SKILL_FEATURE_WEIGHT
+        return features
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text).items():
+                # crc32 is stable across processes (unlike hash())
+                h = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if h & 0x80000000 else -1.0
+                out[row, h % self.dim] += sign * weight
+
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+EMBEDDING_BACKENDS: Dict[str, Callable[[], Embedder]] = {
+    "hashing": HashingEmbedder,
+}
+
+_embedder: Embedder | None = None
+
+
+def get_embedder() -> Embedder:
+    global _embedder
+    if _embedder is None:
+        if EMBEDDING_BACKEND not in EMBEDDING_BACKENDS:
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {EMBEDDING_BACKEND}")
+        _embedder = EMBEDDING_BACKENDS[EMBEDDING_BACKEND]()
+    return _embedder
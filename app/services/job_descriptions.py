@@ -0,0 +1,236 @@
+# app/services/job_descriptions.py
+"""
+Structured job description analysis, computed once per distinct posting.
+
+A user usually runs job-match, then tailor, then cover letter against the
+same posting. Instead of each route re-reading the full text, the posting
+is analyzed once (required skills, nice-to-haves, seniority, keywords,
+short summary) and stored in the JobDescription table under the hash of
+its normalized text, so identical postings pasted by different users
+share one analysis. Routes given a `job_id` put the compact analysis in
+their prompt instead of the raw posting.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from app.models import JobDescription, UserJobDescription
+from app.services.llm_cache import normalize_text
+from app.services.prompt_builder import compress_job_description
+from app.services.structured_output import generate_structured
+
+logger = logging.getLogger(__name__)
+
+# Token budget for the posting text sent to the analysis call
+ANALYSIS_INPUT_TOKENS = 3000
+
+
+# What the model returns; sent as its JSON schema and validated by
+# app/services/structured_output.py
+class JobAnalysis(BaseModel):
+    title: str
+    company: str
+    seniority: str
+    summary: str
+    required_skills: List[str]
+    nice_to_have_skills: List[str]
+    keywords: List[str]
+
+
+def job_description_hash(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def _string_list(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+async def _analyze(text: str) -> Dict[str, Any]:
+    prompt = f"""
+You are an expert technical recruiter. Analyze the job posting below.
+
+Return ONLY valid JSON in this exact format:
+{{
+  "title": "job title",
+  "company": "company name or empty string",
+  "seniority": "one of: intern, junior, mid, senior, staff, manager, director, unknown",
+  "summary": "2-3 sentences on the role, team and main focus",
+  "required_skills": ["..."],
+  "nice_to_have_skills": ["..."],
+  "keywords": ["important terms a resume should mention"]
+}}
+
+Job Description:
+\"\"\"{text}\"\"\"
+"""
+    try:
+        analysis = await generate_structured(
+            "jd_analysis",
+            [{"role": "user", "content": prompt}],
+            JobAnalysis,
+            temperature=0,
+        )
+    except Exception as exc:
+        logger.exception("Failed to analyze job description")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to analyze job description. Please try again later.",
+        ) from exc
+
+    return analysis.model_dump()
+
+
+def find_job_description(db: Session, text: str) -> Optional[JobDescription]:
+    """Stored analysis for this posting (by normalized-text hash), if any."""
+    return db.exec(
+        select(JobDescription).where(
+            JobDescription.content_hash == job_description_hash(text)
+        )
+    ).first()
+
+
+class PostingAnalysis(NamedTuple):
+    content_hash: str
+    description_text: str  # the posting as stored (boilerplate removed)
+    data: Dict[str, Any]
+
+
+async def analyze_posting(text: str) -> PostingAnalysis:
+    """
+    The LLM analysis of a posting, not stored yet (no database access,
+    see save_job_description). Callers should try find_job_description()
+    first.
+    """
+    if not text.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Job description cannot be empty.",
+        )
+
+    description_text = compress_job_description(text.strip(), ANALYSIS_INPUT_TOKENS)
+    data = await _analyze(description_text)
+    return PostingAnalysis(job_description_hash(text), description_text, data)
+
+
+def save_job_description(db: Session, analysis: PostingAnalysis) -> JobDescription:
+    """Store an analyze_posting() result and index it for search."""
+    data = analysis.data
+    job = JobDescription(
+        content_hash=analysis.content_hash,
+        description_text=analysis.description_text,
+        title=str(data.get("title") or "").strip() or None,
+        company=str(data.get("company") or "").strip() or None,
+        seniority=str(data.get("seniority") or "").strip().lower() or None,
+        summary=str(data.get("summary") or "").strip() or None,
+        required_skills_json=json.dumps(_string_list(data.get("required_skills"))),
+        nice_to_have_json=json.dumps(_string_list(data.get("nice_to_have_skills"))),
+        keywords_json=json.dumps(_string_list(data.get("keywords"))),
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Someone analyzed the same posting concurrently; use their row
+        db.rollback()
+        return db.exec(
+            select(JobDescription).where(
+                JobDescription.content_hash == analysis.content_hash
+            )
+        ).one()
+
+    db.refresh(job)
+
+    from app.services.vector_index import index_job_description
+    index_job_description(db, job)
+    return job
+
+
+async def create_job_description(db: Session, text: str) -> JobDescription:
+    """
+    Analyze a posting nobody has submitted before and store the result.
+    Callers should try find_job_description() first.
+    """
+    return save_job_description(db, await analyze_posting(text))
+
+
+def record_submitter(db: Session, user_id: int, job: JobDescription) -> None:
+    """Remember that `user_id` submitted `job`, so it shows in their searches."""
+    if db.get(UserJobDescription, (user_id, job.id)) is not None:
+        return
+    db.add(UserJobDescription(user_id=user_id, job_description_id=job.id))
+    try:
+        db.commit()
+    except IntegrityError:
+        # The same user submitted it twice at once
+        db.rollback()
+
+
+def format_job_analysis(job: JobDescription) -> str:
+    """Compact text version of the analysis, used in place of the posting."""
+    lines = []
+    if job.title:
+        lines.append(f"Title: {job.title}")
+    if job.company:
+        lines.append(f"Company: {job.company}")
+    if job.seniority:
+        lines.append(f"Seniority: {job.seniority}")
+    if job.summary:
+        lines.append(f"Summary: {job.summary}")
+
+    for label, raw in (
+        ("Required skills", job.required_skills_json),
+        ("Nice-to-have skills", job.nice_to_have_json),
+        ("Keywords", job.keywords_json),
+    ):
+        items = json.loads(raw or "[]")
+        if items:
+            lines.append(f"{label}: {', '.join(items)}")
+
+    return "\n".join(lines)
+
+
+def get_user_job_description(db: Session, user_id: int, job_id: int) -> JobDescription:
+    """
+    Job description `job_id`, if `user_id` submitted it. 404 otherwise,
+    including when it exists but was only submitted by other users.
+    """
+    job = None
+    if db.get(UserJobDescription, (user_id, job_id)) is not None:
+        job = db.get(JobDescription, job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job description not found.",
+        )
+    return job
+
+
+def resolve_job_text(
+    db: Session,
+    user_id: int,
+    job_id: Optional[int],
+    job_description: Optional[str],
+) -> str:
+    """
+    Text to use as the job description in a prompt: the stored analysis
+    when `job_id` is given (one `user_id` submitted), otherwise the pasted
+    posting.
+    """
+    if job_id is not None:
+        return format_job_analysis(get_user_job_description(db, user_id, job_id))
+
+    if not job_description or not job_description.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Job description cannot be empty.",
+        )
+    return job_description
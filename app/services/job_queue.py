@@ -0,0 +1,467 @@
+# app/services/job_queue.py
+"""
+Background jobs for AI generations that outlive an HTTP request.
+
+/resume/tailor-from-saved can take longer than the load balancer's idle
+timeout, and the HTTP worker stays pinned while it waits. The /jobs
+variants of such routes only validate the request, enqueue() a
+BackgroundJob row and return its id; a JobWorker runs the generation
+and stores the result, and the client polls GET /jobs/{id} (or listens
+on /jobs/{id}/events).
+
+The queue is the backgroundjob table, so it needs nothing beyond the
+database:
+
+- Workers claim a row with a conditional UPDATE (queued -> running), so
+  two workers never run the same job. A running job holds a lease; if
+  its worker dies the job is picked up again once the lease runs out.
+- Failures are retried with exponential backoff up to max_attempts, then
+  dead-lettered (status "dead", last error kept). HTTPExceptions below
+  500 mean the request itself is bad: those fail at once ("failed").
+- Each user may have JOB_MAX_PENDING_PER_USER jobs queued or running
+  (more -> 429 on submit) and JOB_MAX_RUNNING_PER_USER running at once.
+- A job can hold a daily-limit slot: reserved on submit, committed when
+  the job succeeds, given back when it finally fails.
+
+Run workers with `python -m app.worker`. The API process runs one
+itself only with JOB_INLINE_WORKER (on by default for local SQLite).
+Handlers are registered per job kind with @job_handler.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, update
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from app.database import engine
+from app.models import BackgroundJob, User
+from app.services.model_router import set_user_tier
+from app.services.usage_limits import UsageReservation, reserve_usage
+
+logger = logging.getLogger(__name__)
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+# Wall-clock limit for one attempt
+JOB_TIMEOUT_SECONDS = float(os.getenv("JOB_TIMEOUT_SECONDS", "300"))
+# First retry after this long, doubling on every further attempt
+JOB_RETRY_BASE_SECONDS = float(os.getenv("JOB_RETRY_BASE_SECONDS", "5"))
+JOB_MAX_PENDING_PER_USER = int(os.getenv("JOB_MAX_PENDING_PER_USER", "5"))
+JOB_MAX_RUNNING_PER_USER = int(os.getenv("JOB_MAX_RUNNING_PER_USER", "2"))
+# Jobs one worker process runs at once
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", "8"))
+# How often an idle worker looks for new jobs
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+
+# Run a worker inside the API process too. Handy for local SQLite; in
+# production run `python -m app.worker` so HTTP workers don't scale with
+# in-flight generations.
+JOB_INLINE_WORKER = os.getenv(
+    "JOB_INLINE_WORKER", "1" if engine.dialect.name == "sqlite" else "0"
+) == "1"
+
+# A lost worker's job is retried this long after its attempt would have
+# timed out anyway
+LEASE_GRACE_SECONDS = 30
+
+# Candidate rows looked at per claim attempt
+CLAIM_BATCH_SIZE = 10
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("succeeded", "failed", "dead")
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+# kind -> coroutine taking the payload and returning the JSON result
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Register the function that runs jobs of `kind`."""
+    def register(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+# ---------------------------------------------------------------------------
+# Submitting
+# ---------------------------------------------------------------------------
+
+def enqueue(
+    db: Session,
+    user_id: int,
+    kind: str,
+    payload: Dict[str, Any],
+    usage_action: Optional[str] = None,
+    result: Optional[Dict[str, Any]] = None,
+) -> BackgroundJob:
+    """
+    Queue a `kind` job for the user and return it.
+
+    - usage_action: take one of today's slots for it now (429 when none
+      are left); it is only kept if the job succeeds.
+    - result: the answer is already known (e.g. cached). The job is
+      stored as succeeded, so clients still get one uniform flow.
+
+    Raises HTTPException(429) when the user has too many unfinished jobs.
+    """
+    now = datetime.utcnow()
+    job = BackgroundJob(
+        id=uuid.uuid4().hex,
+        user_id=user_id,
+        kind=kind,
+        payload_json=json.dumps(payload),
+        max_attempts=JOB_MAX_ATTEMPTS,
+        created_at=now,
+        updated_at=now,
+    )
+
+    if result is not None:
+        job.status = "succeeded"
+        job.result_json = json.dumps(result)
+        job.finished_at = now
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+    reservation = None
+    if usage_action:
+        reservation = reserve_usage(db, user_id, usage_action)
+        job.usage_action = reservation.action
+        job.usage_day = reservation.day
+
+    try:
+        # Insert, then count the user's unfinished jobs in the same
+        # transaction. The user row lock (Postgres; SQLite has one writer
+        # at a time anyway) serializes the user's submits, so the count
+        # includes every job that got in before this one.
+        db.exec(select(User.id).where(User.id == user_id).with_for_update())
+        db.add(job)
+        db.flush()
+        active = db.exec(
+            select(func.count())
+            .select_from(BackgroundJob)
+            .where(BackgroundJob.user_id == user_id)
+            .where(BackgroundJob.status.in_(ACTIVE_STATUSES))
+        ).one()
+        if active > JOB_MAX_PENDING_PER_USER:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=(
+                    f"You already have {active - 1} jobs in progress. "
+                    "Wait for one to finish and try again."
+                ),
+            )
+        db.commit()
+        db.refresh(job)
+    except BaseException:
+        if reservation is not None:
+            reservation.release()
+        raise
+    return job
+
+
+def get_job(db: Session, job_id: str, user_id: int) -> BackgroundJob:
+    """The user's job, or 404 (also for other users' jobs)."""
+    job = db.get(BackgroundJob, job_id)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found.",
+        )
+    return job
+
+
+def _user_tier(user_id: int) -> Optional[str]:
+    with Session(engine) as db:
+        return db.exec(select(User.tier).where(User.id == user_id)).first()
+
+
+def requeue_dead_jobs() -> int:
+    """
+    Give dead-lettered jobs a fresh set of attempts. Returns how many.
+
+    Their daily-limit slot was given back when they died, so the rerun
+    holds none: it is neither charged nor refunded a second time.
+    """
+    now = datetime.utcnow()
+    with Session(engine) as db:
+        result = db.exec(
+            update(BackgroundJob)
+            .where(BackgroundJob.status == "dead")
+            .values(
+                status="queued",
+                attempts=0,
+                run_after=now,
+                locked_until=None,
+                finished_at=None,
+                usage_action=None,
+                usage_day=None,
+                updated_at=now,
+            )
+        )
+        db.commit()
+    return result.rowcount
+
+
+# ---------------------------------------------------------------------------
+# Claiming and recording outcomes (run in worker threads)
+# ---------------------------------------------------------------------------
+
+def _runnable(now: datetime):
+    return (
+        (BackgroundJob.status == "queued") & (BackgroundJob.run_after <= now)
+    ) | (
+        # Lease ran out: the worker running it is gone
+        (BackgroundJob.status == "running") & (BackgroundJob.locked_until <= now)
+    )
+
+
+def _busy_users(now: datetime):
+    """Users with JOB_MAX_RUNNING_PER_USER jobs running (lease not run out)."""
+    return (
+        select(BackgroundJob.user_id)
+        .where(BackgroundJob.status == "running")
+        .where(BackgroundJob.locked_until > now)
+        .group_by(BackgroundJob.user_id)
+        .having(func.count() >= JOB_MAX_RUNNING_PER_USER)
+    )
+
+
+def claim_next_job() -> Optional[BackgroundJob]:
+    """
+    Mark the oldest runnable job as running (one more attempt, fresh
+    lease) and return it, or None if there is nothing to do. Jobs of
+    users already at JOB_MAX_RUNNING_PER_USER are left for later.
+    """
+    now = datetime.utcnow()
+    lease_until = now + timedelta(seconds=JOB_TIMEOUT_SECONDS + LEASE_GRACE_SECONDS)
+
+    candidates = (
+        select(BackgroundJob.id, BackgroundJob.user_id)
+        .where(_runnable(now))
+        .where(BackgroundJob.user_id.not_in(_busy_users(now)))
+        .order_by(BackgroundJob.run_after)
+        .limit(CLAIM_BATCH_SIZE)
+    )
+    running = aliased(BackgroundJob)
+
+    with Session(engine) as db:
+        if db.get_bind().dialect.name == "postgresql":
+            # Concurrent workers skip rows another one is claiming
+            candidates = candidates.with_for_update(skip_locked=True)
+
+        for job_id, user_id in db.exec(candidates).all():
+            # The candidate query only saw the running jobs of its moment,
+            # so the cap is checked again by the claim itself. The user row
+            # lock serializes the user's claims (as in enqueue), so the
+            # count includes every claim that got in before this one.
+            db.exec(select(User.id).where(User.id == user_id).with_for_update())
+            user_running = (
+                select(func.count())
+                .select_from(running)
+                .where(running.user_id == user_id)
+                .where(running.status == "running")
+                .where(running.locked_until > now)
+                .scalar_subquery()
+            )
+            # Only matches while the job is still runnable, so a job that
+            # another worker claimed in the meantime is skipped
+            claimed = db.exec(
+                update(BackgroundJob)
+                .where(BackgroundJob.id == job_id)
+                .where(_runnable(now))
+                .where(user_running < JOB_MAX_RUNNING_PER_USER)
+                .values(
+                    status="running",
+                    attempts=BackgroundJob.attempts + 1,
+                    locked_until=lease_until,
+                    updated_at=now,
+                )
+            )
+            if claimed.rowcount == 1:
+                db.commit()
+                return db.get(BackgroundJob, job_id)
+        db.commit()
+    return None
+
+
+def _reservation(job: BackgroundJob) -> Optional[UsageReservation]:
+    if not job.usage_action or job.usage_day is None:
+        return None
+    return UsageReservation(job.user_id, job.usage_action, job.usage_day, 1)
+
+
+def _finish_attempt(job: BackgroundJob, **values: Any) -> bool:
+    """
+    Store the outcome of the attempt `job` was claimed for. False if the
+    job has moved on since (its lease ran out and it was claimed again),
+    in which case the newer attempt owns it.
+    """
+    with Session(engine) as db:
+        result = db.exec(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job.id)
+            .where(BackgroundJob.status == "running")
+            .where(BackgroundJob.attempts == job.attempts)
+            .values(updated_at=datetime.utcnow(), **values)
+        )
+        db.commit()
+    return result.rowcount == 1
+
+
+def record_success(job: BackgroundJob, result: Dict[str, Any]) -> None:
+    finished = _finish_attempt(
+        job,
+        status="succeeded",
+        result_json=json.dumps(result),
+        error=None,
+        locked_until=None,
+        finished_at=datetime.utcnow(),
+    )
+    reservation = _reservation(job)
+    if finished and reservation is not None:
+        reservation.commit()
+
+
+def _error_message(exc: BaseException) -> str:
+    if isinstance(exc, HTTPException):
+        return str(exc.detail)
+    if isinstance(exc, asyncio.TimeoutError):
+        return "The generation took too long."
+    return "The generation failed."
+
+
+def record_failure(job: BackgroundJob, exc: BaseException) -> None:
+    """Schedule a retry, or fail / dead-letter the job for good."""
+    permanent = isinstance(exc, HTTPException) and exc.status_code < 500
+    now = datetime.utcnow()
+
+    if not permanent and job.attempts < job.max_attempts:
+        delay = JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+        _finish_attempt(
+            job,
+            status="queued",
+            error=_error_message(exc),
+            run_after=now + timedelta(seconds=delay),
+            locked_until=None,
+        )
+        return
+
+    finished = _finish_attempt(
+        job,
+        status="failed" if permanent else "dead",
+        error=_error_message(exc),
+        locked_until=None,
+        finished_at=now,
+    )
+    reservation = _reservation(job)
+    if finished and reservation is not None:
+        reservation.release()
+
+
+def release_claim(job: BackgroundJob) -> None:
+    """Put a job back in the queue without counting the attempt (shutdown)."""
+    _finish_attempt(
+        job,
+        status="queued",
+        attempts=job.attempts - 1,
+        run_after=datetime.utcnow(),
+        locked_until=None,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+class _LeaseLost(Exception):
+    """The job was claimed too many times without its worker reporting back."""
+
+
+class JobWorker:
+    """Runs up to `concurrency` jobs at once until stop() is called."""
+
+    def __init__(self, concurrency: int = JOB_WORKER_CONCURRENCY) -> None:
+        self.concurrency = concurrency
+        self._tasks: Set[asyncio.Task] = set()
+        self._stopping = False
+
+    def stop(self) -> None:
+        self._stopping = True
+
+    async def run(self) -> None:
+        logger.info("Job worker started (concurrency %d)", self.concurrency)
+        try:
+            while not self._stopping:
+                while len(self._tasks) < self.concurrency:
+                    try:
+                        job = await asyncio.to_thread(claim_next_job)
+                    except Exception:
+                        logger.exception("Failed to claim a background job")
+                        job = None
+                    if job is None:
+                        break
+                    task = asyncio.create_task(self._execute(job))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+                # Wake up when a slot frees up or it is time to poll again
+                if self._tasks:
+                    await asyncio.wait(
+                        self._tasks,
+                        timeout=JOB_POLL_INTERVAL_SECONDS,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                else:
+                    await asyncio.sleep(JOB_POLL_INTERVAL_SECONDS)
+        finally:
+            # Running jobs go back to the queue for the next worker
+            for task in list(self._tasks):
+                task.cancel()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            logger.info("Job worker stopped")
+
+    async def _execute(self, job: BackgroundJob) -> None:
+        try:
+            if job.attempts > job.max_attempts:
+                raise _LeaseLost()
+            handler = JOB_HANDLERS.get(job.kind)
+            if handler is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown job kind: {job.kind}",
+                )
+            # Same models as the user would get from the request itself
+            set_user_tier(await asyncio.to_thread(_user_tier, job.user_id))
+            result = await asyncio.wait_for(
+                handler(json.loads(job.payload_json)),
+                timeout=JOB_TIMEOUT_SECONDS,
+            )
+        except asyncio.CancelledError:
+            await asyncio.shield(asyncio.to_thread(release_claim, job))
+            raise
+        except Exception as exc:
+            if isinstance(exc, _LeaseLost) or (
+                isinstance(exc, HTTPException) and exc.status_code < 500
+            ):
+                logger.warning("Job %s (%s) failed: %r", job.id, job.kind, exc)
+            else:
+                logger.exception(
+                    "Job %s (%s) attempt %d failed", job.id, job.kind, job.attempts
+                )
+            await asyncio.to_thread(record_failure, job, exc)
+            return
+
+        await asyncio.to_thread(record_success, job, result)
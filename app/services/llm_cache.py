@@ -0,0 +1,246 @@
+# app/services/llm_cache.py
+"""
+Content-addressed cache for AI results.
+
+The key is a SHA-256 over (route, model, prompt version, normalized resume
+text, normalized job description), so re-running the same saved resume
+against the same job posting returns the stored result instead of paying
+for another model round trip.
+
+Backends:
+- "memory" (default): per-process LRU dict with TTL.
+- "sql": shared LLMCacheEntry table through app.database, so every worker
+  (and every restart) sees the same entries.
+
+Pick one with LLM_CACHE_BACKEND; LLM_CACHE_TTL_SECONDS and
+LLM_CACHE_MAX_ENTRIES tune expiry and LRU size.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlmodel import Session, select, func
+
+from app.database import engine
+from app.models import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+
+# SQL backend: how often a worker runs eviction, the most LRU rows one pass
+# deletes, and how stale last_used_at may get before a hit refreshes it
+CACHE_EVICT_INTERVAL_SECONDS = int(os.getenv("LLM_CACHE_EVICT_INTERVAL_SECONDS", "60"))
+CACHE_EVICT_BATCH = 500
+CACHE_TOUCH_INTERVAL_SECONDS = 300
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse runs of whitespace so cosmetic edits still hit the cache."""
+    return _WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+def make_cache_key(
+    route: str,
+    model: str,
+    prompt_version: str,
+    resume_text: str,
+    job_description: str,
+) -> str:
+    parts = [
+        route,
+        model,
+        prompt_version,
+        normalize_text(resume_text),
+        normalize_text(job_description),
+    ]
+    # NUL can't appear in normalized text, so it's a safe field separator
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+class InMemoryCacheBackend:
+    """Thread-safe LRU dict with per-entry expiry."""
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SQLCacheBackend:
+    """
+    Cache rows stored in the LLMCacheEntry table (shared across workers).
+
+    Hits are read-only unless the row's last_used_at is older than
+    CACHE_TOUCH_INTERVAL_SECONDS, and eviction runs at most every
+    CACHE_EVICT_INTERVAL_SECONDS per worker as two bulk DELETEs, so
+    neither reads nor writes pay for a scan of the whole table.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._next_eviction = 0.0
+        self._eviction_lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            row = session.exec(
+                select(LLMCacheEntry.value, LLMCacheEntry.expires_at, LLMCacheEntry.last_used_at)
+                .where(LLMCacheEntry.key == key)
+            ).first()
+            if row is None:
+                return None
+            value, expires_at, last_used_at = row
+            if expires_at <= now:
+                # Left for the next eviction pass to delete
+                return None
+            touch_before = now - timedelta(seconds=CACHE_TOUCH_INTERVAL_SECONDS)
+            if last_used_at < touch_before:
+                session.exec(
+                    update(LLMCacheEntry)
+                    .where(LLMCacheEntry.key == key)
+                    .where(LLMCacheEntry.last_used_at < touch_before)
+                    .values(last_used_at=now)
+                )
+                session.commit()
+            return value
+
+    def set(self, key: str, value: str, ttl_seconds: int) -> None:
+        now = datetime.utcnow()
+        with Session(engine) as session:
+            entry = session.get(LLMCacheEntry, key)
+            if entry is None:
+                entry = LLMCacheEntry(key=key, value=value)
+            entry.value = value
+            entry.created_at = now
+            entry.last_used_at = now
+            entry.expires_at = now + timedelta(seconds=ttl_seconds)
+            session.add(entry)
+            session.commit()
+
+            if self._eviction_due():
+                self._evict(session, now)
+
+    def _eviction_due(self) -> bool:
+        with self._eviction_lock:
+            if time.monotonic() < self._next_eviction:
+                return False
+            self._next_eviction = time.monotonic() + CACHE_EVICT_INTERVAL_SECONDS
+            return True
+
+    def _evict(self, session: Session, now: datetime) -> None:
+        """
+        Drop expired rows, then up to CACHE_EVICT_BATCH of the least
+        recently used ones over the cap (the rest go on later passes).
+        """
+        session.exec(delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= now))
+        session.commit()
+
+        count = session.exec(select(func.count()).select_from(LLMCacheEntry)).one()
+        overflow = min(count - self.max_entries, CACHE_EVICT_BATCH)
+        if overflow > 0:
+            stale = (
+                select(LLMCacheEntry.key)
+                .order_by(LLMCacheEntry.last_used_at)
+                .limit(overflow)
+            )
+            session.exec(
+                delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(stale.scalar_subquery()))
+            )
+            session.commit()
+
+    def clear(self) -> None:
+        with Session(engine) as session:
+            session.exec(delete(LLMCacheEntry))
+            session.commit()
+
+
+def _make_backend(name: str):
+    if name == "sql":
+        return SQLCacheBackend()
+    if name != "memory":
+        logger.warning("Unknown LLM_CACHE_BACKEND %r, falling back to memory", name)
+    return InMemoryCacheBackend()
+
+
+_backend = _make_backend(CACHE_BACKEND)
+
+# Hit / miss counters per route, e.g. {"job_match": {"hits": 3, "misses": 1}}
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def _count(route: str, outcome: str) -> None:
+    with _stats_lock:
+        route_stats = _stats.setdefault(route, {"hits": 0, "misses": 0})
+        route_stats[outcome] += 1
+
+
+def get_cached(route: str, key: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached JSON payload for `key`, or None on a miss.
+    Backend failures are logged and treated as misses, so the cache can
+    never take an AI route down.
+    """
+    try:
+        raw = _backend.get(key)
+    except Exception:
+        logger.exception("LLM cache lookup failed for route %s", route)
+        raw = None
+
+    if raw is None:
+        _count(route, "misses")
+        return None
+
+    _count(route, "hits")
+    return json.loads(raw)
+
+
+def set_cached(key: str, data: Dict[str, Any]) -> None:
+    try:
+        _backend.set(key, json.dumps(data), CACHE_TTL_SECONDS)
+    except Exception:
+        logger.exception("LLM cache write failed")
+
+
+def cache_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        routes = {route: dict(counts) for route, counts in _stats.items()}
+    return {"backend": CACHE_BACKEND, "routes": routes}
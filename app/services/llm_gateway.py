@@ -0,0 +1,250 @@
+# app/services/llm_gateway.py
+"""
+Single async entry point for every OpenAI call made by the API.
+
+All AI routes share one AsyncOpenAI client (and therefore one HTTP
+connection pool), so a slow generation no longer blocks the event loop
+and /health keeps answering while completions are in flight.
+
+- Per-route timeouts live in LLM_TIMEOUTS.
+- A semaphore caps how many model calls one worker runs at once;
+  extra requests wait for a free slot instead of piling onto OpenAI.
+- Which model answers is decided per call by app/services/model_router.py,
+  which also fails over to a second model and hedges slow calls.
+- The openai SDK is only imported when the client is first needed: it is
+  the single most expensive import of the app (~0.6 s) and most cold
+  starts are answering something else first.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from app.services.model_router import (
+    hedge_delay,
+    is_failover_error,
+    observed_call,
+    record_abandoned_call,
+    record_failover,
+    select_models,
+    try_hedge,
+)
+from app.services.tokens import count_tokens
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Seconds to wait for a full completion, per route
+LLM_TIMEOUTS: Dict[str, float] = {
+    "resume_improve": 60.0,
+    "cover_letter": 45.0,
+    "job_match": 30.0,
+    "tailor": 90.0,
+    "jd_analysis": 30.0,
+}
+DEFAULT_TIMEOUT = 60.0
+
+# How many model calls a single worker may have in flight at once
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+# How many times the OpenAI SDK retries connection errors / 5xx / 429
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+_client: Optional["AsyncOpenAI"] = None
+_client_without_retries: Optional["AsyncOpenAI"] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_client(sdk_retries: bool = True) -> "AsyncOpenAI":
+    """
+    Return the shared AsyncOpenAI client, creating it on first use.
+    Uses OPENAI_API_KEY (and OPENAI_BASE_URL, if set) from the environment.
+    With sdk_retries=False: the same client (and connection pool) without
+    SDK retries, for calls that fail over to another model instead.
+    """
+    global _client, _client_without_retries
+    if _client is None:
+        from openai import AsyncOpenAI
+
+        _client = AsyncOpenAI(max_retries=LLM_MAX_RETRIES, timeout=DEFAULT_TIMEOUT)
+        _client_without_retries = _client.with_options(max_retries=0)
+    return _client if sdk_retries else _client_without_retries
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+    return _semaphore
+
+
+def _timeout_for(route: str) -> float:
+    return LLM_TIMEOUTS.get(route, DEFAULT_TIMEOUT)
+
+
+def _input_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(count_tokens(message.get("content") or "") for message in messages)
+
+
+async def _call_with_failover(
+    route: str,
+    models: List[str],
+    call: Callable[[str, bool], Awaitable[T]],
+) -> T:
+    """
+    Run call(model, sdk_retries) on the first model. The second model (if
+    any) is started when the first fails with a failover-worthy error, or
+    as a hedge when the first is slower than hedge_delay(); the first
+    answer wins and the other call is cancelled. The first model gets no
+    SDK retries when there is a second one to fail over to.
+    """
+    if len(models) < 2:
+        return await call(models[0], True)
+
+    primary, backup = models[0], models[1]
+    tasks: Dict["asyncio.Task[T]", str] = {
+        asyncio.create_task(call(primary, False)): primary
+    }
+    started = time.perf_counter()
+    backup_started = False
+    wait_for_hedge = hedge_delay(route, primary)
+    error: Optional[BaseException] = None
+
+    def start_backup() -> None:
+        nonlocal backup_started
+        tasks[asyncio.create_task(call(backup, True))] = backup
+        backup_started = True
+
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(
+                tasks,
+                timeout=None if backup_started else wait_for_hedge,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                # Only hedge when there are free slots and hedge budget left
+                wait_for_hedge = None
+                if not _get_semaphore().locked() and try_hedge(route):
+                    logger.info("Hedging %s: %s is slow, also trying %s", route, primary, backup)
+                    start_backup()
+                continue
+
+            for task in done:
+                model = tasks.pop(task)
+                try:
+                    result = task.result()
+                except Exception as exc:
+                    if not is_failover_error(exc):
+                        raise
+                    error = exc
+                    if not backup_started:
+                        logger.warning(
+                            "%s call to %s failed (%r); failing over to %s",
+                            route, model, exc, backup,
+                        )
+                        record_failover(route)
+                        start_backup()
+                    continue
+
+                if primary in tasks.values():
+                    # The hedge won; the primary was at least this slow
+                    record_abandoned_call(
+                        route, primary, (time.perf_counter() - started) * 1000
+                    )
+                return result
+        raise error
+    finally:
+        for task in tasks:
+            if task.done() and not task.cancelled():
+                task.exception()  # finished alongside the winner; ignore it
+            task.cancel()
+
+
+async def create_chat_completion(
+    route: str,
+    messages: List[Dict[str, str]],
+    **kwargs: Any,
+) -> str:
+    """
+    Run a Chat Completions call for `route` and return the message content.
+    The model is picked by the router, with failover and hedging (see
+    app/services/model_router.py). Extra keyword arguments (temperature,
+    response_format, ...) are passed straight through to the SDK.
+    """
+
+    async def call(model: str, sdk_retries: bool) -> str:
+        async with _get_semaphore():
+            with observed_call(route, model):
+                completion = await get_client(sdk_retries).chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    timeout=_timeout_for(route),
+                    **kwargs,
+                )
+        return completion.choices[0].message.content or ""
+
+    models = select_models(route, _input_tokens(messages))
+    return await _call_with_failover(route, models, call)
+
+
+async def stream_chat_completion(
+    route: str,
+    messages: List[Dict[str, str]],
+    **kwargs: Any,
+) -> AsyncIterator[str]:
+    """
+    Stream a Chat Completions call for `route`, yielding content deltas as
+    the model produces them. The concurrency slot is held until the stream
+    is exhausted (or the consumer stops iterating).
+
+    A stream that fails before its first delta fails over to the router's
+    second model; once text has been sent it can't, and isn't hedged.
+    """
+    models = select_models(route, _input_tokens(messages))[:2]
+
+    for index, model in enumerate(models):
+        is_last = index == len(models) - 1
+        started = False
+        try:
+            async with _get_semaphore():
+                with observed_call(route, model):
+                    stream = await get_client(is_last).chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        stream=True,
+                        timeout=_timeout_for(route),
+                        **kwargs,
+                    )
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            started = True
+                            yield delta
+            return
+        except Exception as exc:
+            if started or is_last or not is_failover_error(exc):
+                raise
+            logger.warning(
+                "%s stream from %s failed (%r); failing over to %s",
+                route, model, exc, models[index + 1],
+            )
+            record_failover(route)
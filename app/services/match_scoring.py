@@ -0,0 +1,336 @@
+# app/services/match_scoring.py
+"""
+Local, deterministic resume / job description match scoring.
+
+No network and no model: a provisional match score in the same shape as
+the LLM job-match result, computed in 1-2 ms for a full-length resume
+(well under 0.1 ms once both texts' features are cached). It combines:
+
+- skill coverage: skills from SKILL_ALIASES found in the job description,
+  and how many of them appear in the resume or the user's profile skills
+- text similarity: cosine similarity of TF-IDF vectors over content words
+  (see prompt_builder.keyword_counts): sublinear term frequency times a
+  BM25-style IDF, log(1 / df)
+
+There is no corpus to count document frequencies in at scoring time (a
+score depends on just the two texts, and must not change as users add
+documents), so df comes from a fixed reference table instead:
+REFERENCE_DOCUMENT_FREQUENCY lists the generic vocabulary that most
+resumes and postings share ("experience", "years", "strong", ...) with
+the rough share of documents containing it; every other word counts as
+rare (DEFAULT_DOCUMENT_FREQUENCY). "experience" then weighs about a
+thirtieth of what "kubernetes" does.
+
+/job-match/analyze-from-saved uses it to answer instantly when the caller
+asks for no LLM refinement, and to skip the LLM call for pairs that are
+obviously mismatched (see JOB_MATCH_MIN_LOCAL_SCORE there).
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, NamedTuple, Optional, Set
+
+from app.services.prompt_builder import keyword_counts
+
+# Canonical skill name -> other spellings found in resumes / postings.
+# Matching is case-insensitive and on whole words.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    # Languages
+    "Python": [],
+    "Java": [],
+    "JavaScript": ["js", "ecmascript"],
+    "TypeScript": ["ts"],
+    "Go": ["golang"],
+    "Rust": [],
+    "C": [],
+    "C++": ["cpp"],
+    "C#": ["csharp"],
+    "Ruby": [],
+    "PHP": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Scala": [],
+    "R": [],
+    "MATLAB": [],
+    "SQL": [],
+    "Bash": ["shell scripting"],
+    # Web / backend
+    "React": ["react.js", "reactjs"],
+    "Angular": ["angularjs"],
+    "Vue": ["vue.js", "vuejs"],
+    "Next.js": ["nextjs"],
+    "Node.js": ["node", "nodejs"],
+    "Express": ["express.js"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": [],
+    "Spring": ["spring boot"],
+    "Ruby on Rails": ["rails"],
+    ".NET": ["dotnet", "asp.net"],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "Tailwind": ["tailwindcss"],
+    "GraphQL": [],
+    "REST APIs": ["rest", "restful", "rest api"],
+    "gRPC": [],
+    "Microservices": ["microservice"],
+    # Data stores
+    "PostgreSQL": ["postgres"],
+    "MySQL": [],
+    "SQLite": [],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search", "opensearch"],
+    "Cassandra": [],
+    "DynamoDB": [],
+    "Snowflake": [],
+    "BigQuery": [],
+    # Cloud / infra
+    "AWS": ["amazon web services"],
+    "GCP": ["google cloud"],
+    "Azure": [],
+    "Docker": ["containers"],
+    "Kubernetes": ["k8s"],
+    "Terraform": [],
+    "Ansible": [],
+    "Linux": [],
+    "CI/CD": ["ci", "continuous integration", "github actions", "jenkins", "gitlab ci"],
+    "Git": ["github", "gitlab"],
+    "Kafka": [],
+    "RabbitMQ": [],
+    "Spark": ["pyspark", "apache spark"],
+    "Airflow": [],
+    # Data / ML
+    "Machine Learning": ["ml"],
+    "Deep Learning": [],
+    "NLP": ["natural language processing"],
+    "Computer Vision": [],
+    "LLMs": ["llm", "large language models"],
+    "PyTorch": [],
+    "TensorFlow": [],
+    "scikit-learn": ["sklearn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Data Analysis": ["data analytics"],
+    "Statistics": ["statistical analysis"],
+    "Tableau": [],
+    "Power BI": ["powerbi"],
+    "Excel": [],
+    "ETL": [],
+    # Mobile
+    "iOS": [],
+    "Android": [],
+    "React Native": [],
+    "Flutter": [],
+    # Practices / roles
+    "Agile": ["scrum", "kanban"],
+    "Testing": ["unit testing", "pytest", "jest", "tdd", "test automation"],
+    "System Design": ["distributed systems"],
+    "Security": ["cybersecurity", "application security"],
+    "Product Management": ["product manager"],
+    "Project Management": ["project manager", "pmp"],
+    "UX Design": ["ux", "ui/ux", "user experience"],
+    "Figma": [],
+    "Salesforce": [],
+    "SEO": [],
+    "Marketing": ["digital marketing"],
+    "Sales": [],
+    "Customer Service": ["customer support"],
+    "Communication": ["communication skills"],
+    "Leadership": ["team lead", "mentoring"],
+}
+
+# Weight of skill coverage vs. text similarity in the final score
+SKILL_WEIGHT = 0.65
+SIMILARITY_WEIGHT = 0.35
+
+# Cosine similarity at which the similarity part counts as a full match;
+# unrelated texts sit near 0, strong matches at 0.4 and above
+FULL_SIMILARITY = 0.4
+
+# Rough share of resumes / postings containing each generic word (the
+# IDF reference); words not listed get DEFAULT_DOCUMENT_FREQUENCY
+REFERENCE_DOCUMENT_FREQUENCY: Dict[str, float] = {
+    **dict.fromkeys(
+        "experience years skills strong working worked responsible "
+        "responsibilities requirements including using".split(),
+        0.9,
+    ),
+    **dict.fromkeys(
+        "ability knowledge excellent good new business company environment "
+        "development developed management managed support solutions across "
+        "within built building degree required preferred plus opportunity "
+        "communication collaborate collaborated teams stakeholders "
+        "cross-functional projects project".split(),
+        0.6,
+    ),
+}
+DEFAULT_DOCUMENT_FREQUENCY = 0.05
+
+# How many matched / missing skills to list in the result
+MAX_LISTED_SKILLS = 8
+
+# Texts whose extracted features are kept in memory (see text_features)
+FEATURE_CACHE_SIZE = 512
+
+
+_CANONICAL: Dict[str, str] = {
+    alias.lower(): name
+    for name, aliases in SKILL_ALIASES.items()
+    for alias in [name, *aliases]
+}
+
+# First word of multi-word aliases -> their lengths in words, longest first
+_PHRASE_SIZES: Dict[str, List[int]] = {}
+for _alias in _CANONICAL:
+    if " " in _alias:
+        _PHRASE_SIZES.setdefault(_alias.split()[0], []).append(len(_alias.split()))
+for _sizes in _PHRASE_SIZES.values():
+    _sizes.sort(reverse=True)
+
+# Words keep the characters skill names use (c++, c#, .net, ci/cd, node.js);
+# "-" and "&" are kept too so "C-level" and "R&D" stay single words
+_WORD_RE = re.compile(r"[\w+#./&-]+")
+
+# Short spellings that are also ordinary words ("go", "rest", "node"):
+# only counted when not written in all lowercase
+_AMBIGUOUS = {"c", "r", "go", "ts", "js", "ml", "ci", "ux", "node", "rest"}
+
+
+def _words(text: str) -> List[str]:
+    words: List[str] = []
+    for word in _WORD_RE.findall(text):
+        word = word.rstrip("./-")
+        if word.lower() in _CANONICAL or "/" not in word:
+            words.append(word)
+        else:
+            # "Python/Django" -> both skills
+            words.extend(part for part in word.split("/") if part)
+    return words
+
+
+def _skill_positions(text: str) -> Dict[str, int]:
+    """
+    Canonical skill name -> word index of its first mention in `text`.
+    Dictionary lookups over word n-grams, so cost grows with the text
+    length only, not with the number of known skills.
+    """
+    words = _words(text)
+    lowered = [word.lower() for word in words]
+    positions: Dict[str, int] = {}
+
+    i = 0
+    while i < len(words):
+        word = lowered[i]
+        for size in _PHRASE_SIZES.get(word, ()):
+            name = _CANONICAL.get(" ".join(lowered[i : i + size]))
+            if name is not None:
+                positions.setdefault(name, i)
+                i += size
+                break
+        else:
+            name = _CANONICAL.get(word)
+            if name is not None and not (word in _AMBIGUOUS and words[i] == word):
+                positions.setdefault(name, i)
+            i += 1
+    return positions
+
+
+def extract_skills(text: str) -> Set[str]:
+    """Canonical names of the known skills mentioned in `text`."""
+    return set(_skill_positions(text))
+
+
+def _profile_skills(skills: Optional[str]) -> Set[str]:
+    """Skills from the comma-separated UserProfile.skills field."""
+    if not skills:
+        return set()
+    found = extract_skills(skills)
+    for item in skills.split(","):
+        name = _CANONICAL.get(item.strip().lower())
+        if name:
+            found.add(name)
+    return found
+
+
+class TextFeatures(NamedTuple):
+    # Canonical skill name -> word index of its first mention
+    skills: Dict[str, int]
+    # Content word -> TF-IDF weight ((1 + log tf) * idf)
+    weights: Dict[str, float]
+    norm: float
+
+
+def _idf(word: str) -> float:
+    return -math.log(REFERENCE_DOCUMENT_FREQUENCY.get(word, DEFAULT_DOCUMENT_FREQUENCY))
+
+
+@lru_cache(maxsize=FEATURE_CACHE_SIZE)
+def text_features(text: str) -> TextFeatures:
+    """
+    Everything score_match needs from one text. Cached, so a resume scored
+    against many job descriptions (or the reverse) is only scanned once.
+    """
+    weights = {
+        word: (1.0 + math.log(n)) * _idf(word)
+        for word, n in keyword_counts(text).items()
+    }
+    norm = math.sqrt(sum(w * w for w in weights.values()))
+    return TextFeatures(_skill_positions(text), weights, norm)
+
+
+def _cosine(a: TextFeatures, b: TextFeatures) -> float:
+    if not a.norm or not b.norm:
+        return 0.0
+    small, large = (a, b) if len(a.weights) <= len(b.weights) else (b, a)
+    dot = sum(w * large.weights.get(word, 0.0) for word, w in small.weights.items())
+    return dot / (a.norm * b.norm)
+
+
+def text_similarity(a: str, b: str) -> float:
+    """Cosine similarity of the TF-IDF content-word vectors of `a` and `b`."""
+    return _cosine(text_features(a), text_features(b))
+
+
+def score_match(
+    resume_text: str,
+    job_description: str,
+    profile_skills: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Provisional match between a resume and a job description.
+    Returns the fields of routes_job_match.JobMatchResponse.
+    """
+    resume = text_features(resume_text)
+    job = text_features(job_description)
+
+    job_positions = job.skills
+    job_skills = set(job_positions)
+    candidate_skills = set(resume.skills) | _profile_skills(profile_skills)
+
+    # Listed in the order the posting first mentions them
+    matched = sorted(job_skills & candidate_skills, key=job_positions.__getitem__)
+    missing = sorted(job_skills - candidate_skills, key=job_positions.__getitem__)
+
+    similarity = min(1.0, _cosine(resume, job) / FULL_SIMILARITY)
+    if job_skills:
+        coverage = len(matched) / len(job_skills)
+        score = SKILL_WEIGHT * coverage + SIMILARITY_WEIGHT * similarity
+    else:
+        # Nothing we recognize in the posting: similarity is all we have
+        score = similarity
+
+    return {
+        "match_score": int(round(100 * score)),
+        "strong_points": [
+            f"Has {name}, which the job asks for."
+            for name in matched[:MAX_LISTED_SKILLS]
+        ],
+        "missing_skills": missing[:MAX_LISTED_SKILLS],
+        "red_flags": [],
+        "recommendations": [
+            f"If you have {name} experience, mention it explicitly."
+            for name in missing[:3]
+        ],
+    }
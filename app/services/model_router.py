@@ -0,0 +1,323 @@
+# app/services/model_router.py
+"""
+Per-request model choice for the LLM gateway, and the latency / error
+statistics it is based on.
+
+Every gateway route ("job_match", "tailor", ...) has a RoutePolicy with
+an ordered list of candidate models and a p95 latency SLO. For each call
+select_models() orders the candidates by:
+
+- user tier: "pro" users start from the route's pro_model, if it has one
+- input size: free-tier prompts up to light_max_input_tokens start from
+  the route's light_model (cheaper and faster on small inputs)
+- observed latency: a model whose rolling p95 on this route is over the
+  SLO, or whose error rate is over LLM_MAX_ERROR_RATE, moves behind the
+  healthy ones until its samples age out of the window
+
+The gateway calls the first model and uses the second one to fail over
+(timeouts, connection errors, 429 and 5xx) and to hedge: when the first
+model hasn't answered after hedge_delay() it starts the same request on
+the second one and keeps whichever answers first. Hedges are capped at
+LLM_HEDGE_MAX_RATIO of a route's requests so a slow model can't double
+the bill.
+
+Statistics are per worker process and reported by /health/models.
+"""
+
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    # Candidates, preferred first; the second one is the failover / hedge
+    models: Tuple[str, ...]
+    # p95 latency target for a complete answer on this route
+    slo_p95_ms: float
+    # Model paid users start from (None: same as everyone else)
+    pro_model: Optional[str] = None
+    # Model for small free-tier prompts, and what counts as small
+    light_model: Optional[str] = None
+    light_max_input_tokens: int = 0
+
+
+ROUTE_POLICIES: Dict[str, RoutePolicy] = {
+    "resume_improve": RoutePolicy(
+        models=("gpt-4.1-mini", "gpt-4o-mini"),
+        slo_p95_ms=45_000,
+        pro_model="gpt-4.1",
+    ),
+    "cover_letter": RoutePolicy(
+        models=("gpt-4o-mini", "gpt-4.1-mini"),
+        slo_p95_ms=20_000,
+        pro_model="gpt-4.1",
+    ),
+    "job_match": RoutePolicy(
+        models=("gpt-4o-mini", "gpt-4.1-mini"),
+        slo_p95_ms=10_000,
+        light_model="gpt-4.1-nano",
+        light_max_input_tokens=1_500,
+    ),
+    "tailor": RoutePolicy(
+        models=("gpt-4o-mini", "gpt-4.1-mini"),
+        slo_p95_ms=30_000,
+        pro_model="gpt-4.1",
+    ),
+    "jd_analysis": RoutePolicy(
+        models=("gpt-4o-mini", "gpt-4.1-mini"),
+        slo_p95_ms=10_000,
+        light_model="gpt-4.1-nano",
+        light_max_input_tokens=1_500,
+    ),
+}
+DEFAULT_POLICY = RoutePolicy(models=("gpt-4o-mini", "gpt-4.1-mini"), slo_p95_ms=30_000)
+
+DEFAULT_TIER = "free"
+
+# Rolling window the latency / error statistics cover, and its size cap
+STATS_WINDOW_SECONDS = float(os.getenv("LLM_STATS_WINDOW_SECONDS", "300"))
+STATS_MAX_SAMPLES = 500
+
+# A model needs this many recent calls on a route before it can be judged
+MIN_SAMPLES = int(os.getenv("LLM_MIN_SAMPLES", "20"))
+
+# Error rate (failover-worthy errors only) above which a model is demoted
+MAX_ERROR_RATE = float(os.getenv("LLM_MAX_ERROR_RATE", "0.2"))
+
+# Hedging: on/off, the largest share of a route's requests that may be
+# hedged, and when to hedge without enough samples (fraction of the SLO)
+HEDGING_ENABLED = os.getenv("LLM_HEDGING", "1") == "1"
+HEDGE_MAX_RATIO = float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.1"))
+HEDGE_SLO_FRACTION = 0.5
+
+_user_tier: ContextVar[str] = ContextVar("llm_user_tier", default=DEFAULT_TIER)
+
+
+def set_user_tier(tier: Optional[str]) -> None:
+    """Tier of the user the current request (or job) runs for."""
+    _user_tier.set(tier or DEFAULT_TIER)
+
+
+def policy_for(route: str) -> RoutePolicy:
+    return ROUTE_POLICIES.get(route, DEFAULT_POLICY)
+
+
+def _preferred_models(route: str, tier: str, input_tokens: Optional[int]) -> List[str]:
+    """Candidates in preferred order; input_tokens None leaves out the light model."""
+    policy = policy_for(route)
+    preferred = list(policy.models)
+    if tier == "pro":
+        if policy.pro_model:
+            preferred.insert(0, policy.pro_model)
+    elif (
+        policy.light_model
+        and input_tokens is not None
+        and input_tokens <= policy.light_max_input_tokens
+    ):
+        preferred.insert(0, policy.light_model)
+    return list(dict.fromkeys(preferred))
+
+
+def cache_model_key(route: str) -> str:
+    """
+    The models the current user's calls on `route` are routed to, for
+    cache keys: the tier, its preferred models and, for the free tier,
+    the light model and its input limit. Answers are only shared between
+    users whose calls go to the same models (a free-tier light-model
+    answer is never served to a pro user, nor the other way round), and
+    changing a policy invalidates them.
+    """
+    policy = policy_for(route)
+    tier = _user_tier.get()
+    key = f"{tier}:{','.join(_preferred_models(route, tier, None))}"
+    if tier != "pro" and policy.light_model:
+        # Same inputs, same prompt: the same side of the limit every time
+        key += f";{policy.light_model}<={policy.light_max_input_tokens}"
+    return key
+
+
+class _Window:
+    """Recent (time, latency ms, ok) samples, pruned to the stats window."""
+
+    def __init__(self) -> None:
+        self.samples: Deque[Tuple[float, float, bool]] = deque(maxlen=STATS_MAX_SAMPLES)
+
+    def prune(self, now: float) -> None:
+        while self.samples and self.samples[0][0] < now - STATS_WINDOW_SECONDS:
+            self.samples.popleft()
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = sorted(ms for _, ms, ok in self.samples if ok)
+        errors = sum(1 for _, _, ok in self.samples if not ok)
+        return {
+            "samples": len(self.samples),
+            "p50_ms": _percentile(latencies, 0.50),
+            "p95_ms": _percentile(latencies, 0.95),
+            "error_rate": round(errors / len(self.samples), 3) if self.samples else 0.0,
+        }
+
+
+class _RouteCounters:
+    def __init__(self) -> None:
+        self.requests: Deque[float] = deque(maxlen=10 * STATS_MAX_SAMPLES)
+        self.hedges: Deque[float] = deque(maxlen=10 * STATS_MAX_SAMPLES)
+        self.failovers: Deque[float] = deque(maxlen=10 * STATS_MAX_SAMPLES)
+
+    def prune(self, now: float) -> None:
+        for times in (self.requests, self.hedges, self.failovers):
+            while times and times[0] < now - STATS_WINDOW_SECONDS:
+                times.popleft()
+
+
+_windows: Dict[Tuple[str, str], _Window] = {}
+_routes: Dict[str, _RouteCounters] = {}
+_lock = threading.Lock()
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return round(sorted_values[index], 1)
+
+
+def _summary(route: str, model: str, now: float) -> Dict[str, Any]:
+    window = _windows.get((route, model))
+    if window is None:
+        return _Window().summary()
+    window.prune(now)
+    return window.summary()
+
+
+def _healthy(route: str, model: str, summary: Dict[str, Any]) -> bool:
+    if summary["samples"] < MIN_SAMPLES:
+        return True
+    if summary["error_rate"] > MAX_ERROR_RATE:
+        return False
+    p95 = summary["p95_ms"]
+    return p95 is None or p95 <= policy_for(route).slo_p95_ms
+
+
+def select_models(route: str, input_tokens: int) -> List[str]:
+    """
+    Models to try for one call, in order: the first is called, the second
+    is the failover / hedge target.
+    """
+    preferred = _preferred_models(route, _user_tier.get(), input_tokens)
+
+    now = time.monotonic()
+    with _lock:
+        counters = _routes.setdefault(route, _RouteCounters())
+        counters.requests.append(now)
+        healthy = [m for m in preferred if _healthy(route, m, _summary(route, m, now))]
+
+    # Healthy models first, each group keeping the preferred order
+    return healthy + [m for m in preferred if m not in healthy]
+
+
+def hedge_delay(route: str, model: str) -> Optional[float]:
+    """
+    Seconds to wait for `model` before hedging: its p95 on this route,
+    but never more than HEDGE_SLO_FRACTION of the SLO, so a hedge still
+    has time to finish within it. None when hedging is off.
+    """
+    if not HEDGING_ENABLED:
+        return None
+    budget_ms = policy_for(route).slo_p95_ms * HEDGE_SLO_FRACTION
+    with _lock:
+        summary = _summary(route, model, time.monotonic())
+    if summary["samples"] >= MIN_SAMPLES and summary["p95_ms"] is not None:
+        budget_ms = min(budget_ms, summary["p95_ms"])
+    return budget_ms / 1000
+
+
+def try_hedge(route: str) -> bool:
+    """Count a hedge for `route` if it is still within its hedge budget."""
+    now = time.monotonic()
+    with _lock:
+        counters = _routes.setdefault(route, _RouteCounters())
+        counters.prune(now)
+        if len(counters.hedges) + 1 > HEDGE_MAX_RATIO * len(counters.requests):
+            return False
+        counters.hedges.append(now)
+        return True
+
+
+def record_failover(route: str) -> None:
+    with _lock:
+        _routes.setdefault(route, _RouteCounters()).failovers.append(time.monotonic())
+
+
+def is_failover_error(exc: BaseException) -> bool:
+    """Errors another model may not have: timeouts, connection, 429, 5xx."""
+    from openai import APIConnectionError, APIStatusError
+
+    if isinstance(exc, (APIConnectionError, TimeoutError)):
+        return True
+    return isinstance(exc, APIStatusError) and (
+        exc.status_code == 429 or exc.status_code >= 500
+    )
+
+
+def _record(route: str, model: str, ms: float, ok: bool) -> None:
+    now = time.monotonic()
+    with _lock:
+        window = _windows.setdefault((route, model), _Window())
+        window.prune(now)
+        window.samples.append((now, ms, ok))
+
+
+def record_abandoned_call(route: str, model: str, ms: float) -> None:
+    """
+    A call cancelled because its hedge answered first. Its latency is at
+    least `ms`; without this sample a model that is slow often enough to
+    be hedged would look fast, since only its quick answers get recorded.
+    """
+    _record(route, model, ms, True)
+
+
+@contextmanager
+def observed_call(route: str, model: str) -> Iterator[None]:
+    """
+    Record the latency of one model call. Failover-worthy errors count
+    against the model; other errors (bad requests) aren't its fault and
+    cancelled calls (lost hedges, disconnects) aren't samples at all.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        if is_failover_error(exc):
+            _record(route, model, (time.perf_counter() - started) * 1000, False)
+        raise
+    _record(route, model, (time.perf_counter() - started) * 1000, True)
+
+
+def model_stats() -> Dict[str, Dict[str, Any]]:
+    now = time.monotonic()
+    report: Dict[str, Dict[str, Any]] = {}
+    with _lock:
+        for route in sorted(set(_routes) | {r for r, _ in _windows}):
+            counters = _routes.get(route) or _RouteCounters()
+            counters.prune(now)
+            models = {}
+            for (window_route, model) in _windows:
+                if window_route != route:
+                    continue
+                summary = _summary(route, model, now)
+                models[model] = {**summary, "healthy": _healthy(route, model, summary)}
+            report[route] = {
+                "slo_p95_ms": policy_for(route).slo_p95_ms,
+                "requests": len(counters.requests),
+                "hedges": len(counters.hedges),
+                "failovers": len(counters.failovers),
+                "models": models,
+            }
+    return report
@@ -0,0 +1,44 @@
+# app/services/password_crypto.py
+"""
+Password hashing that runs inside the hashing process pool
+(see app/services/password_hashing.py).
+
+Everything here must stay picklable and cheap to import: worker processes
+import this module on start-up, so it only depends on passlib.
+
+Cost is tuned with PASSWORD_HASH_ROUNDS. Stored hashes with fewer rounds
+(or a deprecated scheme) still verify, and verify_and_update() returns a
+replacement hash for them so logins upgrade them transparently.
+"""
+
+import os
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# pbkdf2_sha256 iterations; 29000 is passlib's default, so hashes made
+# before this setting existed are not considered outdated
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "29000"))
+
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+    # Hashes below this are flagged for an upgrade on the next login
+    pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+)
+
+
+def hash_password(plain_password: str) -> str:
+    return pwd_context.hash(plain_password)
+
+
+def verify_and_update(
+    plain_password: str,
+    hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    """
+    (password matches, new hash or None). The new hash is only returned
+    when the password matches and the stored hash uses outdated settings.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
@@ -0,0 +1,102 @@
+# app/services/password_hashing.py
+"""
+Password hashing off the request path, used by /auth/signup and
+/auth/login.
+
+pbkdf2 is deliberately slow. Run in FastAPI's shared threadpool, a burst
+of logins took every thread (and, through their open sessions, every DB
+connection) away from the sync routes. Here hashes run in a dedicated
+process pool of PASSWORD_HASH_WORKERS, and at most PASSWORD_HASH_MAX_PENDING
+of them may be queued or running: past that the request fails fast with
+503 + Retry-After instead of piling up.
+
+password_crypto (and with it passlib) is only imported on the first
+signup/login, not at API start-up.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# Sent with the 503 so well-behaved clients back off instead of hammering
+RETRY_AFTER_SECONDS = 2
+
+_executor: Optional[ProcessPoolExecutor] = None
+# Released from the pool's callback thread, hence not an asyncio primitive
+_slots = threading.BoundedSemaphore(PASSWORD_HASH_MAX_PENDING)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _replace_broken_executor(broken: ProcessPoolExecutor) -> None:
+    """Shut a broken pool down and start a fresh one on next use."""
+    global _executor
+    if _executor is broken:
+        _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-in requests right now. Please try again shortly.",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)},
+    )
+
+
+async def _run(func: Callable[..., Any], *args: Any) -> Any:
+    """Run a password_crypto function in the pool, or 503 if it is full."""
+    if not _slots.acquire(blocking=False):
+        raise _busy()
+
+    executor = _get_executor()
+    try:
+        future = executor.submit(func, *args)
+    except BaseException:
+        _slots.release()
+        raise
+    # Held until the work itself is done (or cancelled before it started),
+    # so clients that hang up can't make the queue grow past the limit
+    future.add_done_callback(lambda _: _slots.release())
+
+    try:
+        return await asyncio.wrap_future(future)
+    except BrokenProcessPool as exc:
+        # A worker died (e.g. killed by the OS)
+        _replace_broken_executor(executor)
+        raise _busy() from exc
+
+
+async def hash_password(plain_password: str) -> str:
+    from app.services import password_crypto
+
+    return await _run(password_crypto.hash_password, plain_password)
+
+
+async def verify_and_update(
+    plain_password: str,
+    hashed_password: str,
+) -> Tuple[bool, Optional[str]]:
+    """See password_crypto.verify_and_update."""
+    from app.services import password_crypto
+
+    return await _run(
+        password_crypto.verify_and_update, plain_password, hashed_password
+    )
@@ -0,0 +1,307 @@
+# app/services/prompt_builder.py
+"""
+Keeps resume / job description text inside a per-route token budget
+before it is pasted into a prompt.
+
+- Job descriptions lose boilerplate first (EEO sentences and bullets,
+  benefits and perks blocks, duplicated paragraphs). If still over
+  budget, lines outside requirement-like paragraphs are dropped first.
+- Resumes are only trimmed when over budget: headings and the first few
+  lines (name, contact) are always kept, then the lines least relevant to
+  the job description are dropped until the text fits.
+- Original ordering is preserved in both cases.
+
+Token counts before/after are kept per route (see prompt_stats()).
+"""
+
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.services.resume_preprocessing import heading_name
+from app.services.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Per-route token budgets: (resume, job description)
+PROMPT_TOKEN_BUDGETS: Dict[str, Tuple[int, int]] = {
+    "job_match": (4000, 1500),
+    "cover_letter": (4000, 1500),
+    "tailor": (5000, 1500),
+    "resume_improve": (5000, 0),
+}
+DEFAULT_TOKEN_BUDGET: Tuple[int, int] = (4000, 1500)
+
+# Sentences / bullets containing any of these are hiring boilerplate
+_BOILERPLATE_RE = re.compile(
+    r"equal (employment )?opportunity|without regard to|protected veteran|"
+    r"race, colou?r|sexual orientation|gender identity|reasonable accommodation|"
+    r"e-verify|affirmative action|background check|drug[- ]free",
+    re.IGNORECASE,
+)
+
+# Headings that start a benefits / perks block we can drop entirely
+_BENEFITS_HEADING_RE = re.compile(
+    r"^(benefits|perks|perks (and|&) benefits|what we offer|why (you'll love )?working here|"
+    r"our benefits|compensation (and|&) benefits)\s*:?$",
+    re.IGNORECASE,
+)
+
+# Paragraphs with these words describe what the candidate needs: keep first
+_REQUIREMENT_RE = re.compile(
+    r"requir|qualif|responsib|must|experience (with|in)|skills|proficien|"
+    r"knowledge of|familiar|you will|you'll|what you|degree|years",
+    re.IGNORECASE,
+)
+
+# Sentence boundary inside one line of a posting, and a list item marker
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+_BULLET_RE = re.compile(r"^\s*(?:[-*\u2022]|\d+[.)])\s+")
+
+_WORD_RE = re.compile(r"[a-z][a-z0-9+#.]{1,}")
+
+_STOPWORDS = frozenset(
+    "and the for with you our are will your this that have from who can "
+    "all but not has was were they their them its into about more such "
+    "work team role job we us an as at be by in is it of on or to".split()
+)
+
+# Leading resume lines (name, contact details) that are never trimmed
+_HEADER_LINES = 6
+
+# Section weights when choosing which resume lines to drop first
+_SECTION_WEIGHTS: Dict[str, float] = {
+    "header": 1.0,
+    "summary": 1.5,
+    "skills": 2.0,
+    "experience": 1.5,
+    "education": 1.0,
+    "projects": 1.0,
+}
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def content_words(text: str) -> List[str]:
+    """Lowercased content words in order (tech tokens like c++ / node.js kept)."""
+    return [
+        word
+        for word in (w.rstrip(".") for w in _WORD_RE.findall(text.lower()))
+        if word not in _STOPWORDS
+    ]
+
+
+def keyword_counts(text: str) -> Counter:
+    """Counts of content_words(text)."""
+    return Counter(content_words(text))
+
+
+def keywords(text: str) -> Set[str]:
+    """Lowercased content words (tech tokens like c++ / node.js kept)."""
+    return set(keyword_counts(text))
+
+
+def _paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def _strip_boilerplate(paragraph: str) -> str:
+    """
+    Drop the boilerplate lines (bullets) and sentences of a paragraph,
+    keeping everything around them: a "Must pass a background check"
+    bullet goes, the rest of the requirements list stays.
+    """
+    lines: List[str] = []
+    for line in paragraph.split("\n"):
+        if not _BOILERPLATE_RE.search(line):
+            lines.append(line)
+            continue
+        bullet = _BULLET_RE.match(line)
+        marker = bullet.group(0) if bullet else ""
+        sentences = [
+            sentence
+            for sentence in _SENTENCE_END_RE.split(line[len(marker):].strip())
+            if not _BOILERPLATE_RE.search(sentence)
+        ]
+        if sentences:
+            lines.append(marker + " ".join(sentences))
+    return "\n".join(lines).strip()
+
+
+def compress_job_description(text: str, budget: int) -> str:
+    """Drop boilerplate and duplicates, then fit the rest into `budget`."""
+    kept: List[str] = []
+    seen: Set[str] = set()
+    skip_next = False
+
+    for paragraph in _paragraphs(text):
+        if skip_next:
+            skip_next = False
+            continue
+
+        first_line = paragraph.split("\n", 1)[0].strip()
+        if _BENEFITS_HEADING_RE.match(first_line):
+            # Heading on its own line: the benefits list is the next paragraph
+            skip_next = "\n" not in paragraph
+            continue
+
+        paragraph = _strip_boilerplate(paragraph)
+        if not paragraph:
+            continue
+
+        fingerprint = " ".join(paragraph.lower().split())
+        if fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        kept.append(paragraph)
+
+    return _fit_paragraphs(kept, budget)
+
+
+def _fit_paragraphs(paragraphs: List[str], budget: int) -> str:
+    """
+    Fit paragraphs into `budget` line by line: lines of requirement-like
+    paragraphs are kept first, then the rest in order. Output keeps the
+    original order.
+    """
+    text = "\n\n".join(paragraphs)
+    if count_tokens(text) <= budget:
+        return text
+
+    # (paragraph index, line, cost, priority)
+    units: List[Tuple[int, str, int, bool]] = []
+    for p_index, paragraph in enumerate(paragraphs):
+        priority = bool(_REQUIREMENT_RE.search(paragraph))
+        for line in paragraph.split("\n"):
+            units.append((p_index, line, count_tokens(line), priority))
+
+    order = [i for i, unit in enumerate(units) if unit[3]]
+    order += [i for i, unit in enumerate(units) if not unit[3]]
+
+    chosen: Set[int] = set()
+    used = 0
+    for i in order:
+        cost = units[i][2]
+        if used + cost <= budget:
+            chosen.add(i)
+            used += cost
+
+    if not chosen:
+        # Not even one line fits (e.g. a posting pasted as one giant line)
+        return _truncate_words(text, budget)
+
+    out: List[str] = []
+    last_paragraph: Optional[int] = None
+    for i in sorted(chosen):
+        p_index, line, _, _ = units[i]
+        if last_paragraph is not None and p_index != last_paragraph:
+            out.append("")
+        out.append(line)
+        last_paragraph = p_index
+    return "\n".join(out)
+
+
+def _truncate_words(text: str, budget: int) -> str:
+    words = text.split()
+    kept: List[str] = []
+    used = 0
+    for word in words:
+        cost = count_tokens(word)
+        if used + cost > budget:
+            break
+        kept.append(word)
+        used += cost
+    return " ".join(kept)
+
+
+def fit_resume(text: str, budget: int, job_description: str = "") -> str:
+    """
+    Trim a resume to `budget` tokens by dropping its least relevant lines.
+    Resumes already within budget are returned unchanged.
+    """
+    if count_tokens(text) <= budget:
+        return text
+
+    job_words = keywords(job_description)
+    lines = text.split("\n")
+    scored: List[Tuple[float, int]] = []
+    costs: List[int] = []
+    must_keep: Set[int] = set()
+    section = "header"
+
+    for i, line in enumerate(lines):
+        costs.append(count_tokens(line))
+        heading = heading_name(line.strip())
+        if heading is not None:
+            section = heading
+            must_keep.add(i)
+            continue
+        if not line.strip() or (section == "header" and i < _HEADER_LINES):
+            must_keep.add(i)
+            continue
+
+        line_words = keywords(line)
+        overlap = len(line_words & job_words) / (len(line_words) or 1)
+        weight = _SECTION_WEIGHTS.get(section, 0.5)
+        # Earlier lines win ties: they are usually the most recent roles
+        scored.append((weight * (1.0 + overlap) - i * 1e-6, i))
+
+    chosen = set(must_keep)
+    used = sum(costs[i] for i in must_keep)
+    if used > budget:
+        # Headings alone don't fit (very long lines): fall back to a hard cut
+        return _truncate_words(text, budget)
+
+    for _, i in sorted(scored, reverse=True):
+        if used + costs[i] <= budget:
+            chosen.add(i)
+            used += costs[i]
+
+    trimmed = "\n".join(lines[i] for i in sorted(chosen))
+    # Collapse blank runs left behind by dropped lines
+    return re.sub(r"\n{3,}", "\n\n", trimmed).strip()
+
+
+def _record(route: str, before: int, after: int) -> None:
+    with _stats_lock:
+        route_stats = _stats.setdefault(
+            route, {"prompts": 0, "tokens_before": 0, "tokens_after": 0}
+        )
+        route_stats["prompts"] += 1
+        route_stats["tokens_before"] += before
+        route_stats["tokens_after"] += after
+
+
+def fit_prompt_inputs(
+    route: str,
+    resume_text: str,
+    job_description: Optional[str] = None,
+) -> Tuple[str, str]:
+    """
+    Return (resume_text, job_description) trimmed to the route's budget.
+    Pass job_description=None for routes that only use the resume.
+    """
+    resume_budget, jd_budget = PROMPT_TOKEN_BUDGETS.get(route, DEFAULT_TOKEN_BUDGET)
+
+    before = count_tokens(resume_text)
+    fitted_jd = ""
+    if job_description is not None:
+        before += count_tokens(job_description)
+        fitted_jd = compress_job_description(job_description, jd_budget)
+
+    fitted_resume = fit_resume(resume_text, resume_budget, fitted_jd)
+    after = count_tokens(fitted_resume) + count_tokens(fitted_jd)
+
+    _record(route, before, after)
+    if after < before:
+        logger.info("Prompt inputs for %s trimmed from %d to %d tokens", route, before, after)
+
+    return fitted_resume, fitted_jd
+
+
+def prompt_stats() -> Dict[str, Dict[str, int]]:
+    with _stats_lock:
+        return {route: dict(counts) for route, counts in _stats.items()}
@@ -1,64 +1,262 @@
 # app/services/resume_extraction.py
+"""
+The one resume text extraction engine, used by /user/resume/upload and
+/resume/improve.
 
-from fastapi import HTTPException, status, UploadFile
-from docx import Document
-from pypdf import PdfReader
+- Uploads are spooled to a temp file in CHUNK_BYTES pieces (never held in
+  memory as a whole) and rejected once they pass MAX_UPLOAD_BYTES.
+- The format is picked from DOCUMENT_FORMATS by file extension first, then
+  by content type. Add a format by adding a DocumentFormat entry.
+- Parsers get the temp file path and run in the parser process pool, so
+  the event loop stays free and bytes are never pickled across processes.
+"""
 
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, NamedTuple, Optional, Tuple
 
-async def extract_text_from_file(file: UploadFile) -> str:
-    filename = file.filename.lower()
+from fastapi import HTTPException, Request, status, UploadFile
 
-    content = await file.read()
-    if not content:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Uploaded file is empty."
+from app.services.document_parsing import (
+    DocumentLimitError,
+    ParseBudgetExceeded,
+    init_worker,
+    parse_docx,
+    parse_pdf,
+    parse_txt,
+    run_with_cpu_budget,
+)
+
+# Upload / parsing limits
+MAX_UPLOAD_BYTES = int(os.getenv("RESUME_MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("RESUME_MAX_PDF_PAGES", "20"))
+PARSE_CPU_SECONDS = int(os.getenv("RESUME_PARSE_CPU_SECONDS", "10"))
+PARSE_WALL_SECONDS = float(os.getenv("RESUME_PARSE_WALL_SECONDS", "20"))
+PARSER_WORKERS = int(os.getenv("RESUME_PARSER_WORKERS", "2"))
+
+# Size of each read from the upload while spooling it to disk
+CHUNK_BYTES = 64 * 1024
+
+# How often to check whether the client hung up while a parse is running
+DISCONNECT_POLL_SECONDS = 0.25
+
+
+class DocumentFormat(NamedTuple):
+    extensions: Tuple[str, ...]
+    content_types: Tuple[str, ...]
+    # Called in a pool worker as parser(path, *parser_args)
+    parser: Callable[..., str]
+    parser_args: Tuple[Any, ...]
+    error_detail: str
+
+
+DOCUMENT_FORMATS = {
+    "txt": DocumentFormat(
+        extensions=(".txt",),
+        content_types=("text/plain",),
+        parser=parse_txt,
+        parser_args=(),
+        error_detail="Could not decode text file as UTF-8.",
+    ),
+    "docx": DocumentFormat(
+        extensions=(".docx",),
+        content_types=(
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            "application/msword",
+        ),
+        parser=parse_docx,
+        parser_args=(),
+        error_detail="Could not read DOCX file.",
+    ),
+    "pdf": DocumentFormat(
+        extensions=(".pdf",),
+        content_types=("application/pdf",),
+        parser=parse_pdf,
+        parser_args=(MAX_PDF_PAGES,),
+        error_detail="Could not read PDF file.",
+    ),
+}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=PARSER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
         )
+    return _executor
 
-    # TXT
-    if filename.endswith(".txt"):
-        try:
-            return content.decode("utf-8")
-        except Exception:
+
+def _replace_broken_executor(broken: ProcessPoolExecutor) -> None:
+    """Shut a broken pool down and start a fresh one on next use."""
+    global _executor
+    if _executor is broken:
+        _executor = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def detect_format(file: UploadFile) -> Optional[str]:
+    """Return the DOCUMENT_FORMATS key for this upload, or None."""
+    filename = (file.filename or "").lower()
+    for name, fmt in DOCUMENT_FORMATS.items():
+        if filename.endswith(fmt.extensions):
+            return name
+    for name, fmt in DOCUMENT_FORMATS.items():
+        if file.content_type in fmt.content_types:
+            return name
+    return None
+
+
+async def spool_upload(file: UploadFile) -> Tuple[str, int]:
+    """
+    Copy the upload to a temp file CHUNK_BYTES at a time and return
+    (path, size). Raises 413 as soon as the upload passes MAX_UPLOAD_BYTES.
+    The caller owns the temp file and must delete it.
+    """
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=".upload")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > MAX_UPLOAD_BYTES:
+                    raise HTTPException(
+                        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                        detail=f"File is too large. The limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.",
+                    )
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, size
+
+
+async def run_parser(
+    func: Callable[..., str],
+    *args: Any,
+    request: Optional[Request] = None,
+) -> str:
+    """
+    Run a document_parsing function in the parser process pool so the event
+    loop stays free.
+
+    - The worker enforces a CPU time budget (PARSE_CPU_SECONDS).
+    - We also give up after PARSE_WALL_SECONDS of wall-clock time.
+    - If `request` is given and the client disconnects, we stop waiting.
+
+    Limit / budget problems become HTTPException(400/413); any other parser
+    error is re-raised for the caller to map to its own message.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    future = loop.run_in_executor(
+        executor,
+        run_with_cpu_budget,
+        PARSE_CPU_SECONDS,
+        func,
+        *args,
+    )
+    started = time.monotonic()
+
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            break
+
+        if request is not None and await request.is_disconnected():
+            future.cancel()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Could not decode .txt file as UTF-8."
+                detail="Upload was cancelled by the client.",
             )
 
-    # DOCX
-    if filename.endswith(".docx"):
-        try:
-            from io import BytesIO
-            doc = Document(BytesIO(content))
-            full_text = "\n".join([p.text for p in doc.paragraphs])
-            return full_text
-        except Exception:
+        if time.monotonic() - started > PARSE_WALL_SECONDS:
+            future.cancel()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Could not extract text from .docx file."
+                detail="This document took too long to process. Please upload a simpler file.",
             )
 
-    # PDF
-    if filename.endswith(".pdf"):
-        try:
-            from io import BytesIO
-            reader = PdfReader(BytesIO(content))
-            pages = [page.extract_text() or "" for page in reader.pages]
-            text = "\n".join(pages).strip()
-
-            if not text:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Could not extract text from PDF. It may be scanned."
-                )
-            return text
-        except Exception:
+    try:
+        return future.result()
+    except BrokenProcessPool as exc:
+        # A worker died (e.g. killed by the OS)
+        _replace_broken_executor(executor)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This document could not be processed. Please upload a simpler file.",
+        ) from exc
+    except DocumentLimitError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(exc),
+        ) from exc
+    except ParseBudgetExceeded as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This document took too long to process. Please upload a simpler file.",
+        ) from exc
+
+
+async def extract_text_from_file(
+    file: UploadFile,
+    request: Optional[Request] = None,
+) -> str:
+    """
+    Return the text content of an uploaded .txt, .docx or .pdf resume.
+    Every failure is an HTTPException with a user-facing message.
+    """
+    format_name = detect_format(file)
+    if format_name is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only .txt, .docx, and .pdf files are supported for now.",
+        )
+    fmt = DOCUMENT_FORMATS[format_name]
+
+    path, size = await spool_upload(file)
+    try:
+        if size == 0:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Could not extract text from PDF."
+                detail="The uploaded file appears to be empty.",
             )
 
-    raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail="Invalid file type. Only .txt, .docx, and .pdf are allowed."
-    )
+        try:
+            text = await run_parser(
+                fmt.parser, path, *fmt.parser_args, request=request
+            )
+        except HTTPException:
+            raise
+        except Exception as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=fmt.error_detail,
+            ) from exc
+    finally:
+        os.unlink(path)
+
+    if not text.strip():
+        if format_name == "pdf":
+            # pypdf found no text layer: likely a scanned / image-only PDF
+            detail = "Could not extract text from PDF. It may be a scanned document."
+        else:
+            detail = "The uploaded file appears to be empty."
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail,
+        )
+
+    return text
@@ -0,0 +1,168 @@
+# app/services/resume_preprocessing.py
+"""
+Upload-time preprocessing for saved resumes.
+
+When a resume is saved we compute everything the AI routes and list pages
+need once, and store it on the Resume row:
+
+- normalized_text: cleaned-up text that goes into prompts
+- content_hash:    SHA-256 of normalized_text
+- token_count:     local token estimate (app/services/tokens.py)
+- sections_json:   {"experience": "...", "education": "...", ...}
+- summary:         short extractive summary for list views
+
+AI routes read these columns instead of the raw extracted_text blob; rows
+saved before this existed fall back to extracted_text (see prompt_text()).
+"""
+
+import hashlib
+import json
+import re
+from typing import Any, Dict, List
+
+from sqlalchemy import func
+
+from app.models import Resume
+from app.services.tokens import count_tokens
+
+SUMMARY_MAX_CHARS = 500
+
+# Heading text (lowercased, punctuation stripped) -> canonical section name
+SECTION_ALIASES: Dict[str, str] = {
+    "summary": "summary",
+    "professional summary": "summary",
+    "profile": "summary",
+    "professional profile": "summary",
+    "objective": "summary",
+    "career objective": "summary",
+    "about me": "summary",
+    "experience": "experience",
+    "work experience": "experience",
+    "professional experience": "experience",
+    "relevant experience": "experience",
+    "employment": "experience",
+    "employment history": "experience",
+    "work history": "experience",
+    "education": "education",
+    "academic background": "education",
+    "education and training": "education",
+    "skills": "skills",
+    "technical skills": "skills",
+    "key skills": "skills",
+    "core competencies": "skills",
+    "technologies": "skills",
+    "skills and tools": "skills",
+    "projects": "projects",
+    "personal projects": "projects",
+    "academic projects": "projects",
+    "selected projects": "projects",
+    "certifications": "certifications",
+    "certificates": "certifications",
+    "licenses and certifications": "certifications",
+    "awards": "awards",
+    "honors and awards": "awards",
+}
+
+# Lines longer than this are never treated as headings
+_MAX_HEADING_CHARS = 40
+
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_INLINE_SPACE_RE = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+_HEADING_PUNCT_RE = re.compile(r"[^a-z& ]+")
+
+
+def normalize_resume_text(text: str) -> str:
+    """
+    Clean extracted text without losing its line structure:
+    unify line endings, drop control characters, collapse runs of spaces
+    and keep at most one blank line between blocks.
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _CONTROL_CHARS_RE.sub("", text)
+    lines = [_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+def heading_name(line: str) -> str | None:
+    """Canonical section name if `line` is a known resume heading."""
+    if not line or len(line) > _MAX_HEADING_CHARS:
+        return None
+    key = _HEADING_PUNCT_RE.sub("", line.lower()).replace("&", "and")
+    key = " ".join(key.split())
+    return SECTION_ALIASES.get(key)
+
+
+def detect_sections(text: str) -> Dict[str, str]:
+    """
+    Split normalized resume text into known sections by their headings.
+    Text before the first heading (name, contact line) goes to "header".
+    """
+    sections: Dict[str, List[str]] = {}
+    current = "header"
+
+    for line in text.split("\n"):
+        name = heading_name(line)
+        if name is not None:
+            current = name
+            sections.setdefault(current, [])
+            continue
+        sections.setdefault(current, []).append(line)
+
+    return {
+        name: "\n".join(lines).strip()
+        for name, lines in sections.items()
+        if "\n".join(lines).strip()
+    }
+
+
+def _non_empty_lines(text: str, limit: int) -> List[str]:
+    return [line for line in text.split("\n") if line.strip()][:limit]
+
+
+def build_summary(text: str, sections: Dict[str, str]) -> str:
+    """Short extractive summary: summary, first experience lines, skills."""
+    parts: List[str] = []
+
+    if "summary" in sections:
+        parts.append(" ".join(_non_empty_lines(sections["summary"], 3)))
+    if "experience" in sections:
+        parts.append("Experience: " + " | ".join(_non_empty_lines(sections["experience"], 3)))
+    if "skills" in sections:
+        parts.append("Skills: " + " ".join(sections["skills"].split()))
+    if "education" in sections:
+        parts.append("Education: " + " | ".join(_non_empty_lines(sections["education"], 1)))
+
+    if not parts:
+        parts.append(" ".join(_non_empty_lines(text, 5)))
+
+    summary = "\n".join(parts)
+    if len(summary) > SUMMARY_MAX_CHARS:
+        summary = summary[: SUMMARY_MAX_CHARS - 3].rstrip() + "..."
+    return summary
+
+
+def preprocess_resume(extracted_text: str) -> Dict[str, Any]:
+    """
+    Compute the stored artifacts for a resume. The returned keys match
+    Resume columns, so the result can be passed straight to Resume(...).
+    """
+    normalized = normalize_resume_text(extracted_text)
+    sections = detect_sections(normalized)
+
+    return {
+        "normalized_text": normalized,
+        "content_hash": hashlib.sha256(normalized.encode("utf-8")).hexdigest(),
+        "token_count": count_tokens(normalized),
+        "sections_json": json.dumps(sections),
+        "summary": build_summary(normalized, sections),
+    }
+
+
+def prompt_text():
+    """
+    Column expression for the text AI routes put into prompts:
+    normalized_text, or extracted_text for rows saved before preprocessing.
+    Selecting just this avoids loading whole Resume rows.
+    """
+    return func.coalesce(Resume.normalized_text, Resume.extracted_text)
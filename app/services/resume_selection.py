@@ -0,0 +1,118 @@
+# app/services/resume_selection.py
+"""
+Picks which of a user's saved resumes an AI route should use for a job.
+
+Users can keep up to MAX_RESUMES_PER_USER resumes. Rather than sending
+an arbitrary one to the LLM (and having the user re-run with the others
+to compare), every saved resume is scored against the job description
+locally and the best one is used:
+
+- match_scoring.score_match: skill coverage + term similarity (0-100)
+- vector_index.rank_resumes: embedding similarity of the best sections
+
+All resume texts come from one query. Ties go to the most recently
+updated resume, the same one /user/resume treats as primary.
+"""
+
+from typing import List, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from sqlmodel import Session, select
+
+from app.models import EmbeddingChunk, Resume
+from app.services.match_scoring import score_match
+from app.services.resume_preprocessing import prompt_text
+
+# Weight of the local match score vs. embedding similarity
+MATCH_SCORE_WEIGHT = 0.6
+EMBEDDING_WEIGHT = 0.4
+
+
+class SavedResume(NamedTuple):
+    id: int
+    text: str
+
+
+class ResumeCandidates(NamedTuple):
+    resumes: List[SavedResume]  # most recently updated first
+    chunks: List[EmbeddingChunk]
+
+
+def load_candidates(db: Session, user_id: int) -> ResumeCandidates:
+    """
+    Every saved resume's prompt text (one query) plus its embedded chunks.
+    404 when the user has no saved resume.
+    """
+    rows = db.exec(
+        select(Resume.id, prompt_text())
+        .where(Resume.user_id == user_id)
+        .order_by(Resume.updated_at.desc())
+    ).all()
+
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No saved resume found for this user.",
+        )
+
+    resumes = [SavedResume(resume_id, text) for resume_id, text in rows]
+    chunks = []
+    if len(resumes) > 1:
+        from app.services.vector_index import resume_chunk_rows
+        chunks = resume_chunk_rows(db, user_id)
+    return ResumeCandidates(resumes, chunks)
+
+
+def best_resume(
+    db: Session,
+    user_id: int,
+    candidates: ResumeCandidates,
+    job_description: str,
+    profile_skills: Optional[str] = None,
+) -> SavedResume:
+    """The candidate that fits `job_description` best."""
+    if len(candidates.resumes) == 1:
+        return candidates.resumes[0]
+
+    from app.services.vector_index import rank_resumes
+    similarity = dict(
+        rank_resumes(db, user_id, job_description, rows=candidates.chunks)
+    )
+
+    def score(resume: SavedResume) -> float:
+        local = score_match(resume.text, job_description, profile_skills)["match_score"]
+        return (
+            MATCH_SCORE_WEIGHT * local / 100
+            + EMBEDDING_WEIGHT * similarity.get(resume.id, 0.0)
+        )
+
+    # max() keeps the first of equal scores: the most recently updated
+    return max(candidates.resumes, key=score)
+
+
+def select_resume(
+    db: Session,
+    user_id: int,
+    job_description: str,
+    resume_id: Optional[int] = None,
+    profile_skills: Optional[str] = None,
+) -> SavedResume:
+    """
+    The resume an AI route should use: `resume_id` if the caller picked
+    one (404 unless it is theirs), otherwise the best fit for the job.
+    """
+    if resume_id is not None:
+        text = db.exec(
+            select(prompt_text()).where(
+                Resume.id == resume_id, Resume.user_id == user_id
+            )
+        ).first()
+        if text is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Resume not found.",
+            )
+        return SavedResume(resume_id, text)
+
+    candidates = load_candidates(db, user_id)
+    return best_resume(db, user_id, candidates, job_description, profile_skills)
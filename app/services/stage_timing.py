@@ -0,0 +1,72 @@
+# app/services/stage_timing.py
+"""
+Timings for the stages of multi-step AI pipelines (e.g. tailor-from-saved).
+
+Wrap each stage in timed_stage(pipeline, stage). It records how long the
+stage took and how it ended, so /health/stages shows where a pipeline
+spends its time and which stage fails:
+
+- "ok": ran normally
+- "cached": answered from a cache / stored result
+- "fallback": failed, and the pipeline carried on with a cheaper answer
+- "error": raised
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self.outcome = "ok"
+        self.ms = 0.0
+
+
+_stats: Dict[str, Dict[str, Dict[str, float]]] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(pipeline: str, stage: str, ms: float, outcome: str) -> None:
+    with _stats_lock:
+        stage_stats = _stats.setdefault(pipeline, {}).setdefault(
+            stage,
+            {"runs": 0, "cached": 0, "fallback": 0, "error": 0, "total_ms": 0.0, "max_ms": 0.0},
+        )
+        stage_stats["runs"] += 1
+        if outcome in stage_stats:
+            stage_stats[outcome] += 1
+        stage_stats["total_ms"] += ms
+        stage_stats["max_ms"] = max(stage_stats["max_ms"], ms)
+
+
+@contextmanager
+def timed_stage(pipeline: str, stage: str) -> Iterator[StageTimer]:
+    """Time the block; set `.outcome` on the yielded timer to classify it."""
+    timer = StageTimer()
+    started = time.perf_counter()
+    try:
+        yield timer
+    except BaseException:
+        timer.outcome = "error"
+        raise
+    finally:
+        timer.ms = (time.perf_counter() - started) * 1000
+        _record(pipeline, stage, timer.ms, timer.outcome)
+
+
+def stage_stats() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    with _stats_lock:
+        return {
+            pipeline: {
+                stage: {
+                    **counts,
+                    "total_ms": round(counts["total_ms"], 1),
+                    "max_ms": round(counts["max_ms"], 1),
+                    "avg_ms": round(counts["total_ms"] / counts["runs"], 1),
+                }
+                for stage, counts in stages.items()
+            }
+            for pipeline, stages in _stats.items()
+        }
@@ -0,0 +1,160 @@
+# app/services/streaming.py
+"""
+Helpers for streaming AI output to the browser.
+
+The prompts ask the model for a JSON object whose values are long plain-text
+strings ({"cover_letter": "..."}, {"version1": "...", ...}). Instead of
+waiting for the whole object and then cleaning/parsing it, JsonFieldStreamer
+consumes the raw tokens as they arrive and yields the decoded text of each
+top-level string field incrementally, so the client can render the letter
+or resume while it is still being written.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Events message with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class JsonFieldStreamer:
+    """
+    Incremental parser for a single JSON object arriving in chunks.
+
+    - Anything before the first '{' (```json fences, chatter) is ignored,
+      and so is anything after the object closes.
+    - Top-level string values are decoded (escapes included) and returned
+      from feed() as (field, text) deltas as soon as they are seen.
+    - Non-string values (numbers, nested objects/arrays) are skipped over
+      correctly but not emitted.
+
+    After the stream ends, `values` holds every top-level string field seen,
+    `complete` tells whether the closing '}' was reached and `open_field`
+    names the field that was cut off mid-string, if any.
+    """
+
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+        self.complete = False
+
+        self._started = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = ""          # pending escape sequence, e.g. "\\u00e"
+        self._expect_key = True    # at depth 1: next string is a key
+        self._string_is_key = False
+        self._string_is_value = False
+        self._key_chars: List[str] = []
+        self._current_key = ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        deltas: List[Tuple[str, str]] = []
+        emitted: List[str] = []
+
+        def flush() -> None:
+            if emitted:
+                text = "".join(emitted)
+                self.values[self._current_key] = (
+                    self.values.get(self._current_key, "") + text
+                )
+                deltas.append((self._current_key, text))
+                emitted.clear()
+
+        for ch in chunk:
+            if self.complete:
+                break
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                decoded = self._consume_string_char(ch)
+                if decoded is None:
+                    # closing quote
+                    if self._string_is_value:
+                        flush()
+                    self._in_string = False
+                    if self._string_is_key:
+                        self._current_key = "".join(self._key_chars)
+                        self._key_chars = []
+                    self._string_is_key = False
+                    self._string_is_value = False
+                elif decoded:
+                    if self._string_is_key:
+                        self._key_chars.append(decoded)
+                    elif self._string_is_value:
+                        emitted.append(decoded)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._string_is_key = True
+                elif self._depth == 1:
+                    self._string_is_value = True
+                    self.values.setdefault(self._current_key, "")
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+            elif self._depth == 1 and ch == ":":
+                self._expect_key = False
+            elif self._depth == 1 and ch == ",":
+                self._expect_key = True
+
+        if self._in_string and self._string_is_value:
+            flush()
+        return deltas
+
+    @property
+    def open_field(self) -> Optional[str]:
+        """Field whose string value is still unfinished (cut off), if any."""
+        if self._in_string and self._string_is_value:
+            return self._current_key
+        return None
+
+    def _consume_string_char(self, ch: str):
+        """
+        Return the decoded text for `ch` inside a string, "" while an escape
+        sequence is still incomplete, or None for the closing quote.
+        """
+        if self._escape:
+            self._escape += ch
+            if self._escape[1] != "u":
+                return self._decode_escape()
+            if len(self._escape) < 6:
+                return ""
+            try:
+                code = int(self._escape[2:6], 16)
+            except ValueError:
+                # Not hex (e.g. "\uZZZZ"): kept as written by _decode_escape
+                return self._decode_escape()
+            # High surrogate: wait for the "\uDC00" half that follows
+            if 0xD800 <= code <= 0xDBFF and len(self._escape) < 12:
+                if self._escape[6:] in ("", "\\", "\\u") or (
+                    self._escape.startswith("\\u", 6)
+                ):
+                    return ""
+            return self._decode_escape()
+
+        if ch == "\\":
+            self._escape = ch
+            return ""
+        if ch == '"':
+            return None
+        return ch
+
+    def _decode_escape(self) -> str:
+        raw, self._escape = self._escape, ""
+        try:
+            return json.loads(f'"{raw}"')
+        except ValueError:
+            # Malformed escape: keep the raw characters rather than drop text
+            return raw
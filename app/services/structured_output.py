@@ -0,0 +1,236 @@
+# app/services/structured_output.py
+"""
+One layer between the model and the Pydantic models routes return.
+
+- json_schema_format(Model) asks the model for output constrained to
+  Model's JSON schema (strict structured outputs), so well-formed output
+  is the normal case.
+- parse_structured(raw, Model) validates in one pydantic-core pass when
+  the output is clean. Otherwise a tolerant decoder with precompiled
+  patterns handles what models still get wrong: code fences and chatter
+  around the object, trailing commas, raw newlines in strings, and
+  output cut off mid-string (complete fields are kept).
+- When some fields are still missing or invalid, repair_structured()
+  asks the model again for just those fields and merges them in, instead
+  of regenerating the whole answer.
+
+generate_structured() does all three for a non-streaming call.
+"""
+
+import json
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError, create_model
+
+from app.services.llm_gateway import create_chat_completion
+from app.services.streaming import JsonFieldStreamer
+
+logger = logging.getLogger(__name__)
+
+M = TypeVar("M", bound=BaseModel)
+
+# strict=False accepts raw control characters (newlines) inside strings
+_DECODER = json.JSONDecoder(strict=False)
+
+# A comma right before a closing bracket, e.g. ["a", "b",] or {"a": 1,}
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+
+# Schema keywords structured outputs doesn't accept
+_UNSUPPORTED_SCHEMA_KEYS = ("title", "default")
+
+REPAIR_PROMPT = (
+    "Your previous answer was missing or had invalid values for: {fields}.\n"
+    "Following the same instructions, return ONLY a JSON object with "
+    "exactly these fields."
+)
+
+
+class StructuredOutputError(ValueError):
+    """
+    Model output that doesn't validate. `partial` holds the fields that
+    did; `failed_fields` lists the ones to ask for again.
+    """
+
+    def __init__(self, message: str, partial: Dict[str, Any], failed_fields: List[str]):
+        super().__init__(message)
+        self.partial = partial
+        self.failed_fields = failed_fields
+
+
+def _strict_schema(node: Any) -> Any:
+    if isinstance(node, list):
+        return [_strict_schema(item) for item in node]
+    if not isinstance(node, dict):
+        return node
+
+    schema: Dict[str, Any] = {}
+    for key, value in node.items():
+        if key in ("properties", "$defs"):
+            # Keys here are field / model names, not schema keywords
+            schema[key] = {name: _strict_schema(sub) for name, sub in value.items()}
+        elif key not in _UNSUPPORTED_SCHEMA_KEYS:
+            schema[key] = _strict_schema(value)
+    if schema.get("type") == "object" and "properties" in schema:
+        # Strict mode: every property required, nothing else allowed
+        schema["required"] = list(schema["properties"])
+        schema["additionalProperties"] = False
+    return schema
+
+
+@lru_cache(maxsize=None)
+def json_schema_format(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Chat Completions `response_format` constraining output to `model`."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": model.__name__,
+            "schema": _strict_schema(model.model_json_schema()),
+            "strict": True,
+        },
+    }
+
+
+@lru_cache(maxsize=None)
+def _field_subset(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Model with only `fields` of `model`, used for repair calls."""
+    return create_model(
+        f"{model.__name__}Repair",
+        **{name: (model.model_fields[name].annotation, ...) for name in fields},
+    )
+
+
+def strip_code_fences(text: str) -> str:
+    """`text` stripped, without ``` fence lines if the model added them anyway."""
+    text = text.strip()
+    if text.startswith("```"):
+        lines = [line for line in text.splitlines() if not line.startswith("```")]
+        text = "\n".join(lines).strip()
+    return text
+
+
+def _decode_object(raw: str) -> Optional[Dict[str, Any]]:
+    """
+    The first JSON object in `raw`, ignoring anything around it. Returns
+    None if there is no complete object, even after removing trailing
+    commas.
+    """
+    start = raw.find("{")
+    if start == -1:
+        return None
+
+    for text in (raw, _TRAILING_COMMA_RE.sub(r"\1", raw[start:])):
+        try:
+            value, _ = _DECODER.raw_decode(text, text.find("{"))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+def _salvage_fields(raw: str) -> Dict[str, Any]:
+    """Top-level string fields that were complete before the output broke off."""
+    streamer = JsonFieldStreamer()
+    streamer.feed(raw)
+    return {
+        key: value
+        for key, value in streamer.values.items()
+        if key != streamer.open_field
+    }
+
+
+def validate_structured(data: Any, model: Type[M]) -> M:
+    """
+    Validate already-decoded output (e.g. fields collected while
+    streaming). Raises StructuredOutputError naming the fields that failed.
+    """
+    try:
+        return model.model_validate(data)
+    except ValidationError as exc:
+        failed = sorted({str(err["loc"][0]) for err in exc.errors() if err["loc"]})
+        if not isinstance(data, dict) or not failed:
+            data, failed = {}, list(model.model_fields)
+        partial = {
+            key: value
+            for key, value in data.items()
+            if key in model.model_fields and key not in failed
+        }
+        raise StructuredOutputError(
+            f"{model.__name__} output invalid for: {', '.join(failed)}",
+            partial,
+            failed,
+        ) from exc
+
+
+def parse_structured(raw: str, model: Type[M]) -> M:
+    """
+    Parse and validate raw model output into `model`. Raises
+    StructuredOutputError (with whatever fields were usable) on failure.
+    """
+    try:
+        return model.model_validate_json(raw)
+    except ValidationError as exc:
+        if all(err["type"] != "json_invalid" for err in exc.errors()):
+            # Well-formed JSON, just missing or wrong fields
+            return validate_structured(json.loads(raw), model)
+
+    data = _decode_object(raw)
+    if data is None:
+        data = _salvage_fields(raw)
+    return validate_structured(data, model)
+
+
+async def repair_structured(
+    route: str,
+    messages: List[Dict[str, str]],
+    output_model: Type[M],
+    error: StructuredOutputError,
+    **kwargs: Any,
+) -> M:
+    """
+    Ask the model again for only the fields in `error` and merge them with
+    the ones that were already valid. Raises StructuredOutputError if the
+    result still doesn't validate; SDK errors are propagated.
+    """
+    fields = tuple(error.failed_fields)
+    logger.warning("Repairing %s output for %s: %s", route, output_model.__name__, fields)
+
+    repair_model = _field_subset(output_model, fields)
+    raw_output = await create_chat_completion(
+        route,
+        [
+            *messages,
+            {"role": "user", "content": REPAIR_PROMPT.format(fields=", ".join(fields))},
+        ],
+        response_format=json_schema_format(repair_model),
+        **kwargs,
+    )
+    repaired = parse_structured(raw_output, repair_model)
+    return validate_structured({**error.partial, **repaired.model_dump()}, output_model)
+
+
+async def generate_structured(
+    route: str,
+    messages: List[Dict[str, str]],
+    output_model: Type[M],
+    **kwargs: Any,
+) -> M:
+    """
+    Schema-constrained Chat Completions call validated into `output_model`,
+    with one repair call for fields that come back broken. Extra keyword
+    arguments (temperature, ...) are passed to both calls.
+    """
+    raw_output = await create_chat_completion(
+        route,
+        messages,
+        response_format=json_schema_format(output_model),
+        **kwargs,
+    )
+    try:
+        return parse_structured(raw_output, output_model)
+    except StructuredOutputError as exc:
+        logger.info("Unusable %s output: %s", route, raw_output)
+        return await repair_structured(route, messages, output_model, exc, **kwargs)
@@ -0,0 +1,31 @@
+# app/services/tokens.py
+"""
+Local, dependency-free token counting.
+
+We don't need the exact tokenizer of whichever model a route uses, just a
+stable estimate that is close enough for budgeting and metrics. The
+estimate follows how BPE tokenizers behave on English text: each short
+word or punctuation mark is about one token, and long words/identifiers
+split into roughly one token per four characters.
+"""
+
+import math
+import re
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+# Words up to this length are usually a single token
+_SHORT_WORD_CHARS = 6
+
+# Average characters per token for longer words
+_CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text: str) -> int:
+    count = 0
+    for piece in _PIECE_RE.findall(text or ""):
+        if len(piece) <= _SHORT_WORD_CHARS:
+            count += 1
+        else:
+            count += math.ceil(len(piece) / _CHARS_PER_TOKEN)
+    return count
@@ -1,11 +1,34 @@
 # app/services/usage_limits.py
-from datetime import datetime
-from typing import Dict, Optional
+"""
+Daily per-user limits for the AI actions.
+
+The check is one conditional UPDATE on the UsageCounter row for
+(user, action, UTC day): it only increments when the new count stays
+within the limit, so concurrent requests can never overshoot it and no
+log rows are read. UsageLog stays as an append-only audit trail, written
+by a background thread so it adds no latency to the request.
+
+Routes wrap their AI call in reserved_usage(): the slot is reserved
+before the call, committed (audited) when it succeeds and given back
+when it fails, so a timeout or unparseable answer doesn't cost the user
+a slot and push them to retry into a 429.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import func, update
 from sqlmodel import Session, select
 
-from app.models import UsageLog
+from app.models import UsageCounter, UsageLog
+
+logger = logging.getLogger(__name__)
 
 # Central place for daily limits per action
 DAILY_LIMITS: Dict[str, int] = {
@@ -13,30 +36,54 @@ DAILY_LIMITS: Dict[str, int] = {
     "cover_letter_saved": 5,
     "job_match_saved": 10,
     "tailor_saved": 5,
+    "job_description_analyze": 20,
 }
 
+# Audit rows written per transaction by the background writer
+AUDIT_BATCH_SIZE = 500
+
 
-def _start_of_utc_day(now: datetime) -> datetime:
+def _start_of_utc_day(now: date) -> datetime:
     """Return the UTC start of the current day."""
     return datetime(year=now.year, month=now.month, day=now.day)
 
 
-def check_and_record_usage(
-    db: Session,
-    user_id: int,
-    action: str,
-    limit: Optional[int] = None,
-) -> None:
+def _ensure_counter(db: Session, user_id: int, action: str, day: date) -> None:
     """
-    Check if the user has exceeded today's limit for the given action.
-    If not, record one usage.
+    Create today's counter row if it doesn't exist yet. The first row of a
+    day is seeded from UsageLog so usage recorded before counters existed
+    still counts.
+    """
+    key = (
+        (UsageCounter.user_id == user_id)
+        & (UsageCounter.action == action)
+        & (UsageCounter.day == day)
+    )
+    if db.exec(select(UsageCounter.count).where(key)).first() is not None:
+        return
 
-    - If `limit` is provided, use that.
-    - Otherwise, look up the limit from DAILY_LIMITS[action].
+    logged = db.exec(
+        select(func.count())
+        .select_from(UsageLog)
+        .where(UsageLog.user_id == user_id)
+        .where(UsageLog.action == action)
+        .where(UsageLog.timestamp >= _start_of_utc_day(day))
+    ).one()
 
-    Raises HTTPException(429) when over limit.
-    """
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    # A concurrent request may create it first; that row is just as good
+    db.exec(
+        insert(UsageCounter)
+        .values(user_id=user_id, action=action, day=day, count=logged)
+        .on_conflict_do_nothing()
+    )
 
+
+def _limit_for(action: str, limit: Optional[int]) -> int:
     # If caller didn't pass limit explicitly, pull from DAILY_LIMITS
     if limit is None:
         if action not in DAILY_LIMITS:
@@ -46,26 +93,229 @@ def check_and_record_usage(
                 detail=f"Unknown usage action: {action}",
             )
         limit = DAILY_LIMITS[action]
+    return limit
 
-    now = datetime.utcnow()
-    start_of_day = _start_of_utc_day(now)
 
-    stmt = (
-        select(UsageLog)
-        .where(UsageLog.user_id == user_id)
-        .where(UsageLog.action == action)
-        .where(UsageLog.timestamp >= start_of_day)
+class UsageReservation:
+    """
+    Daily-limit slots taken by reserve_usage() for AI calls that haven't
+    finished yet. Each slot ends up either committed (written to the audit
+    log) or released (given back to today's counter).
+    """
+
+    def __init__(self, user_id: int, action: str, day: date, count: int):
+        self.user_id = user_id
+        self.action = action
+        self.day = day
+        self.pending = count
+
+    def commit(self, count: Optional[int] = None) -> None:
+        """Keep `count` slots (default: all pending) and audit them."""
+        count = self.pending if count is None else min(count, self.pending)
+        if count > 0:
+            self.pending -= count
+            _queue_audit(self.user_id, self.action, count)
+
+    def release(self, count: Optional[int] = None) -> None:
+        """Give `count` slots (default: all pending) back to the user."""
+        count = self.pending if count is None else min(count, self.pending)
+        if count <= 0:
+            return
+        self.pending -= count
+
+        # Own session: may run after the request's session has closed
+        # (e.g. at the end of a streaming response)
+        from app.database import engine
+
+        try:
+            with Session(engine) as session:
+                session.exec(
+                    update(UsageCounter)
+                    .where(UsageCounter.user_id == self.user_id)
+                    .where(UsageCounter.action == self.action)
+                    .where(UsageCounter.day == self.day)
+                    .where(UsageCounter.count >= count)
+                    .values(count=UsageCounter.count - count)
+                )
+                session.commit()
+        except Exception:
+            logger.exception(
+                "Failed to release %d %s slot(s) for user %s",
+                count,
+                self.action,
+                self.user_id,
+            )
+
+
+def _try_take(
+    db: Session,
+    user_id: int,
+    action: str,
+    day: date,
+    count: int,
+    limit: int,
+) -> bool:
+    """Check and increment in one statement: only matches while there is room."""
+    result = db.exec(
+        update(UsageCounter)
+        .where(UsageCounter.user_id == user_id)
+        .where(UsageCounter.action == action)
+        .where(UsageCounter.day == day)
+        .where(UsageCounter.count + count <= limit)
+        .values(count=UsageCounter.count + count)
     )
-    rows = db.exec(stmt).all()
-    count_today = len(rows)
+    db.commit()
+    return result.rowcount == 1
+
+
+def reserve_usage(
+    db: Session,
+    user_id: int,
+    action: str,
+    limit: Optional[int] = None,
+    count: int = 1,
+) -> UsageReservation:
+    """
+    Take `count` of today's slots for `action`, or raise HTTPException(429).
+    The caller must commit() or release() the returned reservation.
+    """
+    limit = _limit_for(action, limit)
+    today = datetime.utcnow().date()
+    _ensure_counter(db, user_id, action, today)
 
-    if count_today >= limit:
+    if not _try_take(db, user_id, action, today, count, limit):
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Daily limit reached for this action. Please try again tomorrow.",
         )
 
-    # Record this usage
-    log = UsageLog(user_id=user_id, action=action)
-    db.add(log)
-    db.commit()
+    return UsageReservation(user_id, action, today, count)
+
+
+def reserve_available_usage(
+    db: Session,
+    user_id: int,
+    action: str,
+    count: int,
+    limit: Optional[int] = None,
+) -> UsageReservation:
+    """
+    Take up to `count` of today's slots for `action`: as many as are left,
+    possibly none (never raises 429). For batch endpoints that can answer
+    the rest without an AI call. The reservation's `pending` is the number
+    taken; the caller must commit() or release() it.
+    """
+    limit = _limit_for(action, limit)
+    today = datetime.utcnow().date()
+    _ensure_counter(db, user_id, action, today)
+
+    while True:
+        used = db.exec(
+            select(UsageCounter.count)
+            .where(UsageCounter.user_id == user_id)
+            .where(UsageCounter.action == action)
+            .where(UsageCounter.day == today)
+        ).one()
+        take = min(count, limit - used)
+        if take <= 0:
+            db.commit()
+            return UsageReservation(user_id, action, today, 0)
+        # Fails only if concurrent requests took slots since the read: retry
+        if _try_take(db, user_id, action, today, take, limit):
+            return UsageReservation(user_id, action, today, take)
+
+
+@contextmanager
+def reserved_usage(
+    db: Session,
+    user_id: int,
+    action: str,
+    limit: Optional[int] = None,
+    count: int = 1,
+) -> Iterator[UsageReservation]:
+    """
+    Reserve slots around an AI call: whatever is still pending is released
+    if the block raises (including cancellation) and committed otherwise.
+    """
+    reservation = reserve_usage(db, user_id, action, limit, count)
+    try:
+        yield reservation
+    except BaseException:
+        reservation.release()
+        raise
+    reservation.commit()
+
+
+def check_and_record_usage(
+    db: Session,
+    user_id: int,
+    action: str,
+    limit: Optional[int] = None,
+    count: int = 1,
+) -> None:
+    """
+    Check if the user has exceeded today's limit for the given action.
+    If not, record `count` usages (one commit, for batch endpoints).
+
+    - If `limit` is provided, use that.
+    - Otherwise, look up the limit from DAILY_LIMITS[action].
+
+    Raises HTTPException(429) when over limit. Prefer reserved_usage()
+    around AI calls, so failures don't use up the slot.
+    """
+    reserve_usage(db, user_id, action, limit, count).commit()
+
+
+# ---------------------------------------------------------------------------
+# Audit trail (UsageLog), written off the request path
+# ---------------------------------------------------------------------------
+
+_audit_queue: "queue.Queue[UsageLog]" = queue.Queue()
+_audit_thread: Optional[threading.Thread] = None
+_audit_thread_lock = threading.Lock()
+
+
+def _queue_audit(user_id: int, action: str, count: int) -> None:
+    global _audit_thread
+    now = datetime.utcnow()
+    for _ in range(count):
+        _audit_queue.put(UsageLog(user_id=user_id, action=action, timestamp=now))
+
+    with _audit_thread_lock:
+        if _audit_thread is None:
+            _audit_thread = threading.Thread(
+                target=_audit_writer, name="usage-audit", daemon=True
+            )
+            _audit_thread.start()
+
+
+def _audit_writer() -> None:
+    from app.database import engine
+
+    while True:
+        batch: List[UsageLog] = [_audit_queue.get()]
+        while len(batch) < AUDIT_BATCH_SIZE:
+            try:
+                batch.append(_audit_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        try:
+            with Session(engine) as session:
+                session.add_all(batch)
+                session.commit()
+        except Exception:
+            # The counters already enforced the limit; only the audit row is lost
+            logger.exception("Failed to write %d usage audit rows", len(batch))
+        finally:
+            for _ in batch:
+                _audit_queue.task_done()
+
+
+def flush_usage_audit() -> None:
+    """Block until every queued audit row has been written."""
+    if _audit_thread is not None:
+        _audit_queue.join()
+
+
+atexit.register(flush_usage_audit)
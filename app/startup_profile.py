@@ -0,0 +1,129 @@
+# app/startup_profile.py
+"""
+Cold-start profiler for the API:
+
+    python -m app.startup_profile
+
+Reports
+- the heaviest imports of `import app.main` (python -X importtime), and
+- time to first ready response: spawning uvicorn until GET /health/
+  answers 200, median of STARTUP_PROFILE_RUNS fresh processes.
+
+tests/test_startup.py runs the same measurement and fails when the
+median ready time is over STARTUP_BUDGET_MS, so a change that slows cold
+starts down fails the test suite. Everything runs in fresh subprocesses
+against DATABASE_URL from the environment.
+"""
+
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from typing import List, Tuple
+
+from dotenv import load_dotenv
+
+# Median time to first ready response allowed before the check fails
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "2000"))
+STARTUP_PROFILE_RUNS = int(os.getenv("STARTUP_PROFILE_RUNS", "3"))
+
+# Give up on a server that isn't ready after this long
+READY_TIMEOUT_SECONDS = 60.0
+
+# How many of the heaviest imports to list
+TOP_IMPORTS = 15
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def import_breakdown() -> Tuple[float, List[Tuple[str, float]]]:
+    """
+    (total ms, [(module, cumulative ms)]) for `import app.main`, listing
+    top-level packages and the app's own modules, heaviest first.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = []
+    total_ms = 0.0
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if not match:
+            continue
+        name = match.group(4)
+        cumulative_ms = int(match.group(2)) / 1000
+        if name == "app.main":
+            total_ms = cumulative_ms
+        elif "." not in name or name.startswith("app."):
+            modules.append((name, cumulative_ms))
+
+    modules.sort(key=lambda item: -item[1])
+    return total_ms, modules[:TOP_IMPORTS]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_ready() -> float:
+    """Milliseconds from spawning uvicorn to the first 200 from /health/."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health/"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--log-level", "warning",
+        ],
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < READY_TIMEOUT_SECONDS:
+            if server.poll() is not None:
+                raise RuntimeError(f"Server exited with status {server.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(0.005)
+        raise RuntimeError(f"Server not ready after {READY_TIMEOUT_SECONDS:.0f} s")
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def ready_time_ms(runs: int = STARTUP_PROFILE_RUNS) -> Tuple[float, List[float]]:
+    """(median, every run) of time_to_ready() over `runs` fresh servers."""
+    times = [time_to_ready() for _ in range(runs)]
+    return statistics.median(times), times
+
+
+def main() -> None:
+    total_ms, modules = import_breakdown()
+    print(f"import app.main: {total_ms:.0f} ms")
+    for name, cumulative_ms in modules:
+        print(f"  {cumulative_ms:8.1f} ms  {name}")
+
+    ready_ms, runs = ready_time_ms()
+    print(
+        f"time to first ready response: {ready_ms:.0f} ms "
+        f"(median of {len(runs)}: {', '.join(f'{ms:.0f}' for ms in runs)}; "
+        f"budget {STARTUP_BUDGET_MS:.0f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    main()
@@ -0,0 +1,49 @@
+# app/worker.py
+"""
+Background job worker (see app/services/job_queue.py). Run as many of
+these as the AI workload needs, independently of the API processes:
+
+    python -m app.worker
+
+Each process runs up to JOB_WORKER_CONCURRENCY jobs at once. On SIGTERM
+or Ctrl-C it stops and puts its running jobs back in the queue.
+
+    python -m app.worker --requeue-dead
+
+gives dead-lettered jobs a fresh set of attempts and exits.
+"""
+
+import asyncio
+import logging
+import signal
+import sys
+
+from dotenv import load_dotenv
+
+load_dotenv()  # before app.database reads DATABASE_URL
+
+import app.main  # noqa: E402,F401 - registers the job handlers of every route
+from app.migrations import check_schema  # noqa: E402
+from app.services.job_queue import JobWorker, requeue_dead_jobs  # noqa: E402
+
+
+async def _run() -> None:
+    worker = JobWorker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if "--requeue-dead" in sys.argv[1:]:
+        print(f"Requeued {requeue_dead_jobs()} dead job(s).")
+        return
+
+    check_schema()
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_auth.py
+"""
+Per-request authentication overhead: get_current_user() with a fresh
+async session per call, the way FastAPI runs it for every request.
+
+- email lookup: a token without the "uid" claim and nothing cached,
+  i.e. the SELECT by email every request used to run
+- id lookup: a token with "uid", cache miss (primary key lookup)
+- cached: a token with "uid" answered from the principal cache
+
+Uses a throwaway SQLite database.
+
+    python -m benchmarks.bench_auth [--calls 5000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+async def run(calls: int) -> None:
+    from sqlmodel import Session
+
+    from app.api.routes_auth import create_access_token, get_current_user
+    from app.database import engine, get_async_db
+    from app.migrations import migrate
+    from app.models import User
+    from app.services.auth_cache import principal_cache
+
+    migrate()
+    with Session(engine) as db:
+        user = User(email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
+    email_token = create_access_token({"sub": user.email})
+    id_token = create_access_token({"sub": user.email, "uid": user.id})
+
+    async def per_call(token: str, cached: bool) -> float:
+        async def once() -> None:
+            if not cached:
+                principal_cache.clear()
+            async for db in get_async_db():
+                await get_current_user(token, db)
+
+        for _ in range(200):  # warm-up: imports, connection pool
+            await once()
+        started = time.perf_counter()
+        for _ in range(calls):
+            await once()
+        return (time.perf_counter() - started) / calls * 1e6
+
+    print(f"{calls} calls each")
+    print(f"email lookup  {await per_call(email_token, cached=False):8.1f} us/request")
+    print(f"id lookup     {await per_call(id_token, cached=False):8.1f} us/request")
+    print(f"cached        {await per_call(id_token, cached=True):8.1f} us/request")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    )
+    asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/bench_document_parsing.py
+"""
+Resume extraction benchmark: extraction latency and event-loop lag.
+
+Extracts a corpus of generated PDFs (1-19 pages) and DOCX files
+(50-500 paragraphs) concurrently through extract_text_from_file(), while
+a probe task measures how late the event loop wakes it up. Parsing runs
+in the parser process pool, so the loop lag should stay in the
+milliseconds no matter how long extraction takes.
+
+    python -m benchmarks.bench_document_parsing [--rounds 5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from benchmarks.documents import DOCX_TYPE, make_docx, make_pdf, upload
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def _probe(stop: asyncio.Event, lags: List[float], interval: float = 0.01) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - started - interval)
+
+
+async def run(rounds: int) -> None:
+    from app.services.resume_extraction import PARSER_WORKERS, extract_text_from_file
+
+    corpus = [(f"r{n}.pdf", make_pdf(n), "application/pdf") for n in (1, 5, 10, 19)]
+    corpus += [(f"r{n}.docx", make_docx(n), DOCX_TYPE) for n in (50, 500)]
+    corpus *= rounds
+
+    async def extract(name: str, data: bytes, content_type: str) -> float:
+        started = time.perf_counter()
+        await extract_text_from_file(upload(name, data, content_type))
+        return time.perf_counter() - started
+
+    # Warm-up: start the pool's worker processes
+    await asyncio.gather(*(extract(*doc) for doc in corpus[:PARSER_WORKERS]))
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    probe = asyncio.create_task(_probe(stop, lags))
+    times = await asyncio.gather(*(extract(*doc) for doc in corpus))
+    stop.set()
+    await probe
+
+    print(f"{len(times)} documents, {PARSER_WORKERS} parser workers")
+    print(
+        f"extraction  p50 {statistics.median(times) * 1000:.0f} ms  "
+        f"p99 {_percentile(times, 0.99) * 1000:.0f} ms"
+    )
+    print(
+        f"loop lag    p50 {statistics.median(lags) * 1000:.1f} ms  "
+        f"p99 {_percentile(lags, 0.99) * 1000:.1f} ms  max {max(lags) * 1000:.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run(args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# benchmarks/bench_llm_gateway.py
+"""
+Load test for the async LLM gateway on one worker (one event loop).
+
+Runs N concurrent create_chat_completion() calls against a local fake
+OpenAI server that takes DELAY seconds per answer, and reports wall time,
+throughput and the worst event-loop stall seen meanwhile. With a
+blocking client the wall time would be N * DELAY and the loop would be
+stalled for DELAY at a time.
+
+    python -m benchmarks.bench_llm_gateway [--calls 64] [--delay 1.0]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.fake_openai import fake_openai
+
+
+async def _loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(calls: int) -> None:
+    from app.services.llm_gateway import MAX_CONCURRENT_LLM_CALLS, create_chat_completion
+
+    # Warm-up: the first call imports the SDK and opens connections
+    await create_chat_completion("job_match", [{"role": "user", "content": "warm-up"}])
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(_loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        create_chat_completion("job_match", [{"role": "user", "content": f"call {i}"}])
+        for i in range(calls)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+
+    print(f"{calls} calls, concurrency cap {MAX_CONCURRENT_LLM_CALLS}")
+    print(f"wall time       {elapsed:.2f} s")
+    print(f"throughput      {calls / elapsed:.1f} calls/s")
+    print(f"max loop stall  {await lag * 1000:.1f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+
+    with fake_openai(delay=args.delay) as base_url:
+        os.environ["OPENAI_BASE_URL"] = base_url
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+        os.environ["LLM_HEDGING"] = "0"
+        asyncio.run(run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# benchmarks/bench_match_scoring.py
+"""
+Throughput of the local job-match scorer (app/services/match_scoring.py).
+
+- cold: every pair is a new resume and a new posting, so nothing comes
+  from the feature cache (worst case, e.g. a batch of fresh postings)
+- warm: RESUMES x JOBS pairs, each text scored many times, as in batch
+  job match against a user's saved resumes
+
+    python -m benchmarks.bench_match_scoring [--pairs 5000]
+"""
+
+import argparse
+import random
+import time
+
+from app.services.match_scoring import SKILL_ALIASES, score_match, text_features
+
+_FILLER = (
+    "designed built maintained services customers reliability team delivered "
+    "improved latency features stakeholders reporting"
+).split()
+
+
+def _document(rnd: random.Random, lines: int) -> str:
+    skills = list(SKILL_ALIASES)
+    return "\n".join(
+        " ".join(rnd.choice(_FILLER) for _ in range(10))
+        + " using "
+        + ", ".join(rnd.sample(skills, 3))
+        for _ in range(lines)
+    )
+
+
+def _report(label: str, pairs: int, elapsed: float) -> None:
+    print(
+        f"{label:5s} {pairs} pairs in {elapsed:.2f} s: "
+        f"{pairs / elapsed:,.0f} pairs/s, {elapsed / pairs * 1000:.3f} ms/pair"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pairs", type=int, default=5000)
+    args = parser.parse_args()
+    rnd = random.Random(1)
+
+    pairs = [(_document(rnd, 60), _document(rnd, 25)) for _ in range(args.pairs)]
+    text_features.cache_clear()
+    started = time.perf_counter()
+    for resume, job in pairs:
+        score_match(resume, job, "Python, Docker")
+    _report("cold", len(pairs), time.perf_counter() - started)
+
+    resumes = [_document(rnd, 60) for _ in range(100)]
+    jobs = [_document(rnd, 25) for _ in range(50)]
+    text_features.cache_clear()
+    started = time.perf_counter()
+    for resume in resumes:
+        for job in jobs:
+            score_match(resume, job)
+    _report("warm", len(resumes) * len(jobs), time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/bench_password_hashing.py
+"""
+Login throughput under a burst, and what it does to sync routes.
+
+Fires BURST concurrent password verifications two ways:
+
+- threadpool: in FastAPI's shared threadpool, as /auth/login used to
+- pool: through app/services/password_hashing.py (process pool with a
+  bounded queue; 503 past PASSWORD_HASH_MAX_PENDING)
+
+Meanwhile a probe keeps running a no-op through the shared threadpool,
+the way every sync route is run, and reports how long it waited.
+
+    python -m benchmarks.bench_password_hashing [--burst 200]
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable, List, Tuple
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def _probe(stop: asyncio.Event, waits: List[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await run_in_threadpool(lambda: None)
+        waits.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+
+async def _burst(
+    label: str,
+    burst: int,
+    verify: Callable[[], Awaitable[Tuple[bool, object]]],
+) -> None:
+    async def one() -> str:
+        try:
+            ok, _ = await verify()
+        except HTTPException as exc:
+            return str(exc.status_code)
+        return "ok" if ok else "wrong"
+
+    stop = asyncio.Event()
+    waits: List[float] = []
+    probe = asyncio.create_task(_probe(stop, waits))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one() for _ in range(burst)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await probe
+
+    counts = {result: results.count(result) for result in sorted(set(results))}
+    print(
+        f"{label:10s} {elapsed:6.2f} s, {counts.get('ok', 0) / elapsed:6.1f} logins/s, "
+        f"results {counts}; sync route wait p50 "
+        f"{_percentile(waits, 0.5) * 1000:.1f} ms, max {max(waits) * 1000:.0f} ms"
+    )
+
+
+async def run(burst: int) -> None:
+    from app.services import password_crypto
+    from app.services.password_hashing import (
+        PASSWORD_HASH_MAX_PENDING,
+        PASSWORD_HASH_WORKERS,
+        hash_password,
+        verify_and_update,
+    )
+
+    # Warm-up: starts the pool's workers
+    hashed = await hash_password("benchmark")
+    await asyncio.gather(*(verify_and_update("benchmark", hashed) for _ in range(4)))
+
+    print(
+        f"burst of {burst}; pool: {PASSWORD_HASH_WORKERS} workers, "
+        f"at most {PASSWORD_HASH_MAX_PENDING} pending"
+    )
+    await _burst(
+        "threadpool",
+        burst,
+        lambda: run_in_threadpool(password_crypto.verify_and_update, "benchmark", hashed),
+    )
+    await _burst("pool", burst, lambda: verify_and_update("benchmark", hashed))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--burst", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run(args.burst))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_structured_output.py
+"""
+Parse time and outcome of parse_structured() on the malformed output corpus
+in benchmarks/model_outputs.py: parsed as is, repairable (one small call
+for the failed fields) or a full retry.
+
+    python -m benchmarks.bench_structured_output [--repeat 300]
+"""
+
+import argparse
+import logging
+import time
+
+from benchmarks.model_outputs import corpus
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    from app.api.routes_cover_letter import CoverLetterDraft
+    from app.api.routes_job_match import JobMatchAnalysis
+    from app.api.routes_resume import ImprovedVersions
+    from app.services.structured_output import StructuredOutputError, parse_structured
+
+    models = {"match": JobMatchAnalysis, "cover": CoverLetterDraft, "improve": ImprovedVersions}
+    logging.disable(logging.CRITICAL)
+
+    totals = {"ok": 0, "repair": 0, "full retry": 0}
+    total_us = 0.0
+    for name, kind, raw in corpus():
+        model = models[name]
+        try:
+            parse_structured(raw, model)
+            outcome = "ok"
+        except StructuredOutputError as exc:
+            outcome = (
+                "full retry"
+                if len(exc.failed_fields) == len(model.model_fields)
+                else f"repair {', '.join(exc.failed_fields)}"
+            )
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            try:
+                parse_structured(raw, model)
+            except StructuredOutputError:
+                pass
+        us = (time.perf_counter() - started) / args.repeat * 1e6
+        total_us += us
+        totals["repair" if outcome.startswith("repair") else outcome] += 1
+        print(f"{name:8s} {kind:20s} {us:8.1f} us  {outcome}")
+
+    print(f"{sum(totals.values())} outputs: {totals}; {total_us:.0f} us in all")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_usage_limits.py
+"""
+Daily-limit check latency with a large UsageLog table
+(app/services/usage_limits.py).
+
+Seeds --rows audit rows for today (a tenth of them for the benchmarked
+user), then times:
+
+- scan: the old check, loading the user's rows for today and counting them
+- counter: reserve_usage() + commit(), the conditional UPDATE on the
+  per-(user, action, day) counter
+
+Uses a throwaway SQLite database.
+
+    python -m benchmarks.bench_usage_limits [--rows 400000] [--checks 500]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_ACTION = "benchmark"
+LIMIT = 10 ** 9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=400_000)
+    parser.add_argument("--checks", type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    )
+    from sqlmodel import Session, select
+
+    from app.database import engine
+    from app.migrations import migrate
+    from app.models import UsageLog
+    from app.services.usage_limits import flush_usage_audit, reserve_usage
+
+    migrate()
+    now = datetime.utcnow()
+    start_of_day = datetime(now.year, now.month, now.day)
+    with Session(engine) as db:
+        db.add_all(
+            UsageLog(
+                user_id=1 if i % 10 == 0 else 2 + i % 1000,
+                action=BENCH_ACTION,
+                timestamp=now,
+            )
+            for i in range(args.rows)
+        )
+        db.commit()
+
+    with Session(engine) as db:
+        scans = max(1, args.checks // 25)
+        started = time.perf_counter()
+        for _ in range(scans):
+            rows = db.exec(
+                select(UsageLog)
+                .where(UsageLog.user_id == 1)
+                .where(UsageLog.action == BENCH_ACTION)
+                .where(UsageLog.timestamp >= start_of_day)
+            ).all()
+            assert len(rows) < LIMIT
+        scan_ms = (time.perf_counter() - started) / scans * 1000
+
+    # New session: the scanned rows would make every commit expire them
+    with Session(engine) as db:
+        # First check of the day seeds the counter from the log
+        reserve_usage(db, 1, BENCH_ACTION, limit=LIMIT).commit()
+        started = time.perf_counter()
+        for _ in range(args.checks):
+            reserve_usage(db, 1, BENCH_ACTION, limit=LIMIT).commit()
+        counter_ms = (time.perf_counter() - started) / args.checks * 1000
+    flush_usage_audit()
+
+    print(f"{args.rows} log rows, {args.rows // 10} of them for the checked user")
+    print(f"scan     {scan_ms:8.2f} ms/check")
+    print(f"counter  {counter_ms:8.2f} ms/check")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# benchmarks/bench_vector_index.py
+"""
+Vector index benchmark (app/services/vector_index.py).
+
+- search: recall@10 and latency of the HNSW graph against exact
+  brute-force search, at a few index sizes and HNSW_EF_SEARCH values
+- prompt: resume tokens the job-match LLM analysis gets with and without
+  section retrieval, for generated resumes of increasing length
+
+The prompt part uses a throwaway SQLite database.
+
+    python -m benchmarks.bench_vector_index [--sizes 1000 20000] [--queries 200]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from app.services.match_scoring import SKILL_ALIASES
+
+_VERBS = "design build own ship maintain scale improve operate lead mentor".split()
+_NOUNS = (
+    "services pipelines apis dashboards platform models infrastructure "
+    "features teams customers"
+).split()
+_HOBBIES = (
+    "watercolour painting, marathon training, choir, chess club, sourdough "
+    "baking, volunteering at the animal shelter"
+).split(", ")
+
+
+def _line(rnd: random.Random, skills: List[str]) -> str:
+    return " ".join(
+        f"{rnd.choice(_VERBS)} {rnd.choice(_NOUNS)} with {rnd.choice(skills)}"
+        for _ in range(4)
+    )
+
+
+def _text_maker(rnd: random.Random) -> Callable[[], str]:
+    skills = list(SKILL_ALIASES)
+    return lambda: " ".join(_line(rnd, skills) for _ in range(2))
+
+
+def search(sizes: List[int], queries: int) -> None:
+    from app.services import vector_index
+    from app.services.embeddings import get_embedder
+
+    if vector_index.hnswlib is None:
+        print("search: hnswlib is not installed, only brute force is available")
+        return
+
+    rnd = random.Random(3)
+    text = _text_maker(rnd)
+    embedder = get_embedder()
+    query_vectors = embedder.embed([text() for _ in range(queries)])
+
+    def run(index) -> tuple:
+        started = time.perf_counter()
+        results = [[label for label, _ in index.search(q, 10)] for q in query_vectors]
+        return results, (time.perf_counter() - started) / queries * 1000
+
+    default_ef = vector_index.HNSW_EF_SEARCH
+    for size in sizes:
+        vectors = embedder.embed([text() for _ in range(size)])
+        brute = vector_index.BruteForceIndex(embedder.dim)
+        brute.add(vectors, list(range(size)))
+        started = time.perf_counter()
+        hnsw = vector_index.HNSWIndex(embedder.dim, size)
+        hnsw.add(vectors, list(range(size)))
+        build = time.perf_counter() - started
+
+        exact, brute_ms = run(brute)
+        print(f"n={size}: brute force {brute_ms:.2f} ms/query, HNSW build {build:.1f} s")
+        for ef in sorted({64, default_ef, 256}):
+            vector_index.HNSW_EF_SEARCH = ef
+            approx, hnsw_ms = run(hnsw)
+            recall = np.mean([len(set(a) & set(e)) / 10 for a, e in zip(approx, exact)])
+            print(f"  HNSW ef={ef:<3d} {hnsw_ms:.3f} ms/query, recall@10 {recall:.3f}")
+        vector_index.HNSW_EF_SEARCH = default_ef
+
+
+def _resume(rnd: random.Random, roles: int) -> str:
+    skills = list(SKILL_ALIASES)
+    parts = ["Alex Example", "alex@example.com", "", "SUMMARY", _line(rnd, skills), ""]
+    parts.append("EXPERIENCE")
+    for role in range(roles):
+        parts.append(f"Engineer, Company {role}")
+        parts.extend(_line(rnd, skills) for _ in range(4))
+        parts.append("")
+    parts.append("PROJECTS")
+    parts.extend(_line(rnd, skills) for _ in range(roles))
+    parts += ["", "AWARDS"]
+    parts.extend(rnd.sample(_HOBBIES, 3))
+    parts += ["", "EDUCATION", "BSc Computer Science", "", "SKILLS"]
+    parts.append(", ".join(rnd.sample(skills, 15)))
+    return "\n".join(parts)
+
+
+def prompt(resumes: int) -> None:
+    os.environ["DATABASE_URL"] = (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    )
+    from sqlmodel import Session
+
+    from app.api.routes_job_match import RESUME_SECTION_TOKENS, _relevant_resume
+    from app.database import engine
+    from app.migrations import migrate
+    from app.models import Resume, User
+    from app.services.tokens import count_tokens
+
+    migrate()
+    rnd = random.Random(5)
+    skills = list(SKILL_ALIASES)
+    job = "Senior engineer. Requirements: " + ", ".join(rnd.sample(skills, 8))
+
+    print(f"prompt: resume tokens per job-match analysis (budget {RESUME_SECTION_TOKENS})")
+    with Session(engine) as db:
+        user = User(email="bench@example.com", hashed_password="x")
+        db.add(user)
+        db.commit()
+        for roles in (2, 4, 8, 16):
+            full, sent, ms = [], [], []
+            for _ in range(resumes):
+                resume = Resume(
+                    user_id=user.id,
+                    original_filename="resume.txt",
+                    content_type="text/plain",
+                    extracted_text=_resume(rnd, roles),
+                )
+                db.add(resume)
+                db.commit()
+                db.refresh(resume)
+                # First call indexes the resume, as its upload would have
+                _relevant_resume(db, user.id, resume.id, resume.extracted_text, job)
+
+                started = time.perf_counter()
+                text = _relevant_resume(db, user.id, resume.id, resume.extracted_text, job)
+                ms.append((time.perf_counter() - started) * 1000)
+                full.append(count_tokens(resume.extracted_text))
+                sent.append(count_tokens(text))
+            saved = 1 - sum(sent) / sum(full)
+            print(
+                f"  {roles:2d} roles: {np.mean(full):6.0f} -> {np.mean(sent):6.0f} tokens "
+                f"({saved:.0%} fewer), retrieval {np.mean(ms):.1f} ms"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--resumes", type=int, default=10)
+    args = parser.parse_args()
+
+    search(args.sizes, args.queries)
+    prompt(args.resumes)
+
+
+if __name__ == "__main__":
+    main()
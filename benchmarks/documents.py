@@ -0,0 +1,71 @@
+# benchmarks/documents.py
+"""Generated resume documents for the parsing benchmark and tests."""
+
+import io
+
+from starlette.datastructures import Headers, UploadFile
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+_LINE = "line {i} Python SQL AWS experience building backend systems"
+
+
+def make_pdf(pages: int, lines: int = 40) -> bytes:
+    """A text-layer PDF with `pages` pages of `lines` lines each."""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(pages):
+        text = "BT /F1 10 Tf 50 780 Td 12 TL " + " ".join(
+            f"(Page {page} {_LINE.format(i=i)}) '" for i in range(lines)
+        ) + " ET"
+        page_id = len(objects) + 1
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(text)} >>\nstream\n{text}\nendstream")
+        kids.append(page_id)
+    objects[1] = (
+        f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {pages} >>"
+    )
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode())
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF".encode()
+    )
+    return out.getvalue()
+
+
+def make_docx(paragraphs: int) -> bytes:
+    from docx import Document
+
+    doc = Document()
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Paragraph {_LINE.format(i=i)}")
+    out = io.BytesIO()
+    doc.save(out)
+    return out.getvalue()
+
+
+def make_txt(lines: int) -> bytes:
+    return "\n".join(_LINE.format(i=i) for i in range(lines)).encode()
+
+
+def upload(filename: str, data: bytes, content_type: str = "") -> UploadFile:
+    """An UploadFile like the one FastAPI hands to a route."""
+    headers = Headers({"content-type": content_type}) if content_type else None
+    return UploadFile(io.BytesIO(data), filename=filename, headers=headers)
@@ -0,0 +1,79 @@
+# benchmarks/fake_openai.py
+"""
+Local stand-in for the OpenAI Chat Completions API, so gateway and route
+benchmarks measure this app and not the network.
+
+    with fake_openai(delay=1.0) as base_url:
+        os.environ["OPENAI_BASE_URL"] = base_url
+        ...
+
+Every completion sleeps `delay` seconds (without blocking the fake
+server's own event loop) and answers `reply`; streamed completions send
+it in small chunks.
+"""
+
+import asyncio
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+
+def _app(delay: float, reply: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/v1/chat/completions")
+    async def chat(request: Request):
+        body = await request.json()
+        await asyncio.sleep(delay)
+        if body.get("stream"):
+            async def chunks():
+                for i in range(0, len(reply), 8):
+                    chunk = {
+                        "id": "c", "object": "chat.completion.chunk", "created": 0,
+                        "model": body["model"],
+                        "choices": [{"index": 0, "delta": {"content": reply[i:i + 8]},
+                                     "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(chunks(), media_type="text/event-stream")
+        return {
+            "id": "c", "object": "chat.completion", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": reply}}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }
+
+    return app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def fake_openai(delay: float = 1.0, reply: str = '{"ok": true}') -> Iterator[str]:
+    """Run the fake API in a background thread; yields its base URL."""
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(_app(delay, reply), host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}/v1"
+    finally:
+        server.should_exit = True
+        thread.join()
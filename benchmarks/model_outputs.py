@@ -0,0 +1,92 @@
+# benchmarks/model_outputs.py
+"""Malformed model output corpus for the structured-output benchmark and tests."""
+
+import json
+from typing import Any, Dict, List, Tuple
+
+LETTER = (
+    "Dear Hiring Manager,\n\n"
+    + "I am excited to apply for the Backend Engineer role at Acme. " * 12
+    + "\n\nSincerely,\nJane"
+)
+RESUME = (
+    "JANE DOE\nSenior Engineer\n\nEXPERIENCE\n"
+    "- Built payment APIs handling 2M req/day (Python, Postgres)\n"
+) * 10
+
+# name -> (a valid answer, its longest field, the one a cut-off answer breaks in)
+ANSWERS: Dict[str, Tuple[Dict[str, Any], str]] = {
+    "match": (
+        {
+            "match_score": 78,
+            "strong_points": ["Python", "APIs"],
+            "missing_skills": ["Go"],
+            "red_flags": [],
+            "recommendations": ["Mention Kubernetes"],
+        },
+        "recommendations",
+    ),
+    "cover": ({"cover_letter": LETTER}, "cover_letter"),
+    "improve": (
+        {"version1": RESUME, "version2": RESUME.upper(), "version3": RESUME.lower()},
+        "version3",
+    ),
+}
+
+
+def _variants(answer: Dict[str, Any], last_field: str) -> Dict[str, str]:
+    """The ways models wrap or mangle an otherwise valid answer."""
+    js = json.dumps(answer, indent=2)
+    # Token limit hit half-way through the last field
+    cut_at = js.rfind(f'"{last_field}"')
+    return {
+        "clean": js,
+        "fenced": f"```json\n{js}\n```",
+        "fenced_no_lang": f"```\n{js}\n```",
+        "prose_around": (
+            f"Sure! Here is the JSON you asked for:\n{js}\n"
+            "Let me know if you need anything else."
+        ),
+        "prose_after_braces": f"{js}\n\nNote: values like {{name}} were filled in.",
+        "trailing_commas": js.replace("\n}", ",\n}").replace('"]', '",]'),
+        "raw_newlines": js.replace("\\n", "\n"),
+        "fenced_raw_newlines": "```json\n" + js.replace("\\n", "\n") + "\n```",
+        "single_quotes": str(answer),
+        "truncated": js[: cut_at + (len(js) - cut_at) // 2],
+    }
+
+
+def corpus() -> List[Tuple[str, str, str]]:
+    """(answer name, kind of damage, raw output) for every case."""
+    cases = [
+        (name, kind, raw)
+        for name, (answer, last_field) in ANSWERS.items()
+        for kind, raw in _variants(answer, last_field).items()
+    ]
+    match, _ = ANSWERS["match"]
+    improve, _ = ANSWERS["improve"]
+    # Well-formed JSON with bad or missing fields
+    cases += [
+        ("match", "score_as_string", json.dumps({**match, "match_score": "85"})),
+        ("match", "null_list", json.dumps({**match, "red_flags": None})),
+        (
+            "match",
+            "missing_score",
+            json.dumps({k: v for k, v in match.items() if k != "match_score"}),
+        ),
+        ("improve", "empty_version", json.dumps({**improve, "version2": "  "})),
+        (
+            "improve",
+            "missing_version",
+            json.dumps({k: v for k, v in improve.items() if k != "version3"}),
+        ),
+        ("cover", "wrong_key", json.dumps({"coverLetter": LETTER})),
+        # Invalid \u escape (kept as written), and the closing brace is missing
+        (
+            "cover",
+            "bad_unicode_escape",
+            json.dumps({"cover_letter": LETTER})[:-1].replace("Dear", "\\uZZZZ Dear", 1),
+        ),
+        ("cover", "empty", ""),
+    ]
+    return cases
@@ -14,11 +14,13 @@ import { useNavigate } from "react-router-dom";
 const API_BASE_URL =
   import.meta.env.VITE_API_BASE_URL || "http://localhost:8000";
 
+// /user/resume/list only returns metadata; full text comes from /user/resume/{id}
 interface ResumeApi {
   id: number;
   original_filename: string;
   content_type: string | null;
-  extracted_text: string;
+  token_count: number | null;
+  summary: string | null;
   created_at: string;
   updated_at: string;
 }
@@ -80,18 +82,43 @@ export default function MyResumes() {
   const primaryResume = resumes[0] || null;
   const otherResumes = resumes.slice(1);
 
-  const handleDownload = (resume: ResumeApi) => {
-    const content = resume.extracted_text || "";
-    const blob = new Blob([content], { type: "text/plain" });
-    const url = URL.createObjectURL(blob);
-    const a = document.createElement("a");
-    a.href = url;
-    a.download = `${resume.original_filename || "resume"}.txt`;
-    document.body.appendChild(a);
-    a.click();
-    document.body.removeChild(a);
-    URL.revokeObjectURL(url);
-    setStatus("Downloaded resume as a .txt file.");
+  const handleDownload = async (resume: ResumeApi) => {
+    const token = getToken();
+    if (!token) {
+      setError("Please log in again to download your resume.");
+      return;
+    }
+
+    try {
+      setError(null);
+
+      const res = await fetch(`${API_BASE_URL}/user/resume/${resume.id}`, {
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
+      });
+
+      if (!res.ok) {
+        const text = await res.text();
+        throw new Error(text || "Failed to download resume.");
+      }
+
+      const data: { extracted_text: string } = await res.json();
+      const content = data.extracted_text || "";
+      const blob = new Blob([content], { type: "text/plain" });
+      const url = URL.createObjectURL(blob);
+      const a = document.createElement("a");
+      a.href = url;
+      a.download = `${resume.original_filename || "resume"}.txt`;
+      document.body.appendChild(a);
+      a.click();
+      document.body.removeChild(a);
+      URL.revokeObjectURL(url);
+      setStatus("Downloaded resume as a .txt file.");
+    } catch (err: any) {
+      console.error(err);
+      setError(err?.message || "Failed to download resume.");
+    }
   };
 
   const startRename = () => {
@@ -0,0 +1,50 @@
+# tests/conftest.py
+"""
+Shared test setup: every test session runs against a fresh SQLite file,
+created through the migrations like a new deployment would be. The
+environment is set before anything from `app` is imported.
+"""
+
+import os
+import tempfile
+
+_TMP_DIR = tempfile.mkdtemp(prefix="resume-api-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}"
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("JWT_SECRET_KEY", "test")
+os.environ.setdefault("JOB_INLINE_WORKER", "0")
+
+import pytest  # noqa: E402
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    from app.migrations import migrate
+
+    migrate()
+    yield
+
+
+
+@pytest.fixture
+def db():
+    from sqlmodel import Session
+
+    from app.database import engine
+
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def make_user(db):
+    """Create a user and return its id."""
+    from app.models import User
+
+    def make(tier: str = "free") -> int:
+        user = User(email=f"{os.urandom(6).hex()}@example.com", hashed_password="x", tier=tier)
+        db.add(user)
+        db.commit()
+        return user.id
+
+    return make
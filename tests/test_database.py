@@ -0,0 +1,43 @@
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.database import _WaitCounting
+
+
+class _Recording(QueuePool):
+    """Records the waiting gauge at every checkout from the queue."""
+
+    def _do_get(self):
+        self.seen.append(self.waiting)
+        return super()._do_get()
+
+
+class _Pool(_WaitCounting, _Recording):
+    seen: list
+
+
+def test_only_blocked_checkouts_count_as_waiting():
+    engine = create_engine("sqlite://", poolclass=_Pool, pool_size=1, max_overflow=0)
+    pool = engine.pool
+    pool.seen = []
+
+    for _ in range(5):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    assert pool.seen == [0] * 5
+
+    held = engine.connect()
+    waiter = threading.Thread(target=lambda: engine.connect().close())
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while pool.waiting == 0 and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert pool.waiting == 1
+
+    held.close()
+    waiter.join(5)
+    assert pool.waiting == 0
+    engine.dispose()
@@ -0,0 +1,96 @@
+import json
+import os
+
+import pytest
+
+from app.models import JobDescription
+from app.services import vector_index
+from app.services.job_descriptions import job_description_hash, record_submitter
+from app.services.vector_index import index_job_description, search_job_descriptions
+
+
+def _job(db, title, skills):
+    text = f"{title}\n\nWe need {', '.join(skills)}. {os.urandom(4).hex()}"
+    job = JobDescription(
+        content_hash=job_description_hash(text),
+        description_text=text,
+        title=title,
+        required_skills_json=json.dumps(skills),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    index_job_description(db, job)
+    return job
+
+
+@pytest.fixture(params=["brute_force", "hnsw"])
+def fresh_index(request, monkeypatch):
+    if request.param == "hnsw":
+        if vector_index.hnswlib is None:
+            pytest.skip("hnswlib not installed")
+        monkeypatch.setattr(vector_index, "ANN_THRESHOLD", 0)
+    monkeypatch.setattr(vector_index, "_job_index", vector_index._JobIndex())
+
+
+def test_search_only_returns_the_callers_postings(db, make_user, fresh_index):
+    alice, bob = make_user(), make_user()
+    python = _job(db, "Python Backend Engineer", ["python", "django", "postgresql"])
+    golang = _job(db, "Go Platform Engineer", ["go", "kubernetes", "grpc"])
+    secret = _job(db, "Python Data Engineer", ["python", "spark", "airflow"])
+    for job in (python, golang):
+        record_submitter(db, alice, job)
+    record_submitter(db, bob, secret)
+
+    hits = search_job_descriptions(db, "python engineer", [python.id, golang.id], 10)
+
+    assert [job_id for job_id, _ in hits][0] == python.id
+    assert secret.id not in {job_id for job_id, _ in hits}
+    assert search_job_descriptions(db, "python engineer", [], 10) == []
+
+
+def test_submitting_twice_is_recorded_once(db, make_user):
+    from sqlmodel import select
+
+    from app.models import UserJobDescription
+
+    user = make_user()
+    job = _job(db, "SRE", ["linux"])
+    record_submitter(db, user, job)
+    record_submitter(db, user, job)
+
+    rows = db.exec(
+        select(UserJobDescription).where(UserJobDescription.user_id == user)
+    ).all()
+    assert [row.job_description_id for row in rows] == [job.id]
+
+
+def test_other_users_postings_are_not_found(db, make_user):
+    import asyncio
+
+    from fastapi import HTTPException
+    from sqlmodel.ext.asyncio.session import AsyncSession
+
+    from app.api.routes_job_description import get_job_description
+    from app.database import get_async_engine
+    from app.models import User
+    from app.services.job_descriptions import resolve_job_text
+
+    alice, bob = make_user(), make_user()
+    job = _job(db, "Staff Engineer", ["rust"])
+    record_submitter(db, alice, job)
+
+    async def get(user_id):
+        async with AsyncSession(get_async_engine()) as session:
+            return await get_job_description(job.id, db.get(User, user_id), session)
+
+    assert asyncio.run(get(alice)).id == job.id
+    assert "Staff Engineer" in resolve_job_text(db, alice, job.id, None)
+
+    for lookup in (
+        lambda: asyncio.run(get(bob)),
+        lambda: resolve_job_text(db, bob, job.id, None),
+    ):
+        with pytest.raises(HTTPException) as caught:
+            lookup()
+        assert caught.value.status_code == 404
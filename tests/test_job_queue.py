@@ -0,0 +1,118 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import update
+from sqlmodel import Session, func, select
+
+from app.database import engine
+from app.models import BackgroundJob, UsageCounter
+from app.services import job_queue, usage_limits
+from app.services.job_queue import enqueue
+
+
+def test_concurrent_submits_never_exceed_the_pending_cap(db, make_user):
+    user_id = make_user()
+    calls = 4 * job_queue.JOB_MAX_PENDING_PER_USER
+    barrier = Barrier(calls)
+
+    def submit(_):
+        barrier.wait()
+        with Session(engine) as session:
+            try:
+                enqueue(session, user_id, "tailor", {})
+            except HTTPException as exc:
+                return exc.status_code
+            return 202
+
+    with ThreadPoolExecutor(max_workers=calls) as pool:
+        statuses = list(pool.map(submit, range(calls)))
+
+    assert statuses.count(202) == job_queue.JOB_MAX_PENDING_PER_USER
+    assert statuses.count(429) == calls - job_queue.JOB_MAX_PENDING_PER_USER
+    stored = db.exec(
+        select(func.count())
+        .select_from(BackgroundJob)
+        .where(BackgroundJob.user_id == user_id)
+    ).one()
+    assert stored == job_queue.JOB_MAX_PENDING_PER_USER
+
+
+def test_rejected_submit_gives_its_daily_slot_back(db, make_user, monkeypatch):
+    monkeypatch.setitem(usage_limits.DAILY_LIMITS, "tailor_saved", 100)
+    user_id = make_user()
+    for _ in range(job_queue.JOB_MAX_PENDING_PER_USER):
+        enqueue(db, user_id, "tailor", {}, usage_action="tailor_saved")
+
+    with pytest.raises(HTTPException) as exc_info:
+        enqueue(db, user_id, "tailor", {}, usage_action="tailor_saved")
+    assert exc_info.value.status_code == 429
+
+    db.expire_all()
+    used = db.exec(
+        select(UsageCounter.count).where(
+            UsageCounter.user_id == user_id, UsageCounter.action == "tailor_saved"
+        )
+    ).one()
+    assert used == job_queue.JOB_MAX_PENDING_PER_USER
+
+
+def _only_jobs_of(db, user_id):
+    """Finish every other user's unfinished jobs, so claims pick this user's."""
+    db.exec(
+        update(BackgroundJob)
+        .where(BackgroundJob.user_id != user_id)
+        .where(BackgroundJob.status.in_(job_queue.ACTIVE_STATUSES))
+        .values(status="failed")
+    )
+    db.commit()
+
+
+def test_claim_rechecks_the_running_cap(db, make_user, monkeypatch):
+    monkeypatch.setattr(job_queue, "JOB_MAX_RUNNING_PER_USER", 1)
+    user_id = make_user()
+    _only_jobs_of(db, user_id)
+    for _ in range(2):
+        enqueue(db, user_id, "tailor", {})
+
+    assert job_queue.claim_next_job().user_id == user_id
+    # Another worker's candidate query ran before that claim committed
+    monkeypatch.setattr(
+        job_queue, "_busy_users", lambda now: select(BackgroundJob.user_id).where(False)
+    )
+    assert job_queue.claim_next_job() is None
+
+
+def _used(db, user_id):
+    db.expire_all()
+    return db.exec(
+        select(UsageCounter.count).where(
+            UsageCounter.user_id == user_id, UsageCounter.action == "tailor_saved"
+        )
+    ).one()
+
+
+def _claim_and_kill():
+    """Claim the next job and fail its last attempt, dead-lettering it."""
+    job = job_queue.claim_next_job()
+    job.max_attempts = job.attempts
+    job_queue.record_failure(job, RuntimeError("model down"))
+    return job
+
+
+def test_requeued_dead_job_is_not_refunded_twice(db, make_user, monkeypatch):
+    monkeypatch.setitem(usage_limits.DAILY_LIMITS, "tailor_saved", 100)
+    user_id = make_user()
+    _only_jobs_of(db, user_id)
+    usage_limits.reserve_usage(db, user_id, "tailor_saved").commit()
+    job = enqueue(db, user_id, "tailor", {}, usage_action="tailor_saved")
+    assert _used(db, user_id) == 2
+
+    assert _claim_and_kill().id == job.id
+    assert _used(db, user_id) == 1
+
+    assert job_queue.requeue_dead_jobs() == 1
+    assert _claim_and_kill().id == job.id
+    # Its slot was given back the first time it died
+    assert _used(db, user_id) == 1
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.database import engine
+from app.models import LLMCacheEntry
+from app.services import llm_cache
+from app.services.llm_cache import SQLCacheBackend
+
+
+@pytest.fixture
+def backend():
+    backend = SQLCacheBackend(max_entries=3)
+    backend.clear()
+    yield backend
+    backend.clear()
+
+
+def _keys():
+    with Session(engine) as session:
+        return set(session.exec(select(LLMCacheEntry.key)).all())
+
+
+def _set_last_used(key, when):
+    with Session(engine) as session:
+        entry = session.get(LLMCacheEntry, key)
+        entry.last_used_at = when
+        session.add(entry)
+        session.commit()
+
+
+def _count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement.split()[0].upper())
+
+    event.listen(engine, "before_cursor_execute", record)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", record)
+
+
+def test_hit_on_fresh_entry_does_not_write(backend):
+    backend.set("a", "1", 60)
+
+    statements, stop = _count_statements()
+    try:
+        assert backend.get("a") == "1"
+    finally:
+        stop()
+    assert statements == ["SELECT"]
+
+
+def test_hit_on_stale_entry_refreshes_last_used(backend):
+    backend.set("a", "1", 60)
+    old = datetime.utcnow() - timedelta(seconds=llm_cache.CACHE_TOUCH_INTERVAL_SECONDS + 60)
+    _set_last_used("a", old)
+
+    assert backend.get("a") == "1"
+    with Session(engine) as session:
+        assert session.get(LLMCacheEntry, "a").last_used_at > old
+
+
+def test_expired_entry_is_a_miss(backend):
+    backend.set("a", "1", -1)
+    assert backend.get("a") is None
+
+
+def test_eviction_is_throttled(backend, monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_EVICT_INTERVAL_SECONDS", 3600)
+    for key in "abcde":
+        backend.set(key, key, 60)
+    # Only the first write ran eviction; the cap is enforced on a later pass
+    assert len(_keys()) == 5
+
+
+def test_eviction_drops_expired_then_least_recently_used(backend, monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_EVICT_INTERVAL_SECONDS", 3600)
+    now = datetime.utcnow()
+    backend.set("expired", "x", -1)
+    for age, key in enumerate("abcd"):
+        backend.set(key, key, 60)
+        _set_last_used(key, now - timedelta(minutes=10 - age))
+
+    backend._next_eviction = 0.0
+    backend.set("e", "e", 60)
+
+    # "expired" is gone, then the two oldest of a..e to get back to 3
+    assert _keys() == {"c", "d", "e"}
@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services import llm_gateway
+from benchmarks.fake_openai import fake_openai
+
+
+@pytest.fixture
+def fake_api(monkeypatch):
+    with fake_openai(delay=0.3) as base_url:
+        monkeypatch.setenv("OPENAI_BASE_URL", base_url)
+        monkeypatch.setattr(llm_gateway, "_client", None)
+        monkeypatch.setattr(llm_gateway, "_semaphore", None)
+        yield
+
+
+def test_calls_run_concurrently_on_one_event_loop(fake_api):
+    async def run():
+        messages = [{"role": "user", "content": "hi"}]
+        await llm_gateway.create_chat_completion("job_match", messages)
+
+        started = time.perf_counter()
+        answers = await asyncio.gather(*(
+            llm_gateway.create_chat_completion("job_match", messages) for _ in range(8)
+        ))
+        return answers, time.perf_counter() - started
+
+    answers, elapsed = asyncio.run(run())
+    assert answers == ['{"ok": true}'] * 8
+    # Serialized calls would take 8 * 0.3 s
+    assert elapsed < 1.2
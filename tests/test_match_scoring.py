@@ -0,0 +1,36 @@
+from app.services.match_scoring import extract_skills, score_match
+
+JOB = "Backend engineer. Requirements: Python, PostgreSQL, Docker and Kubernetes."
+
+
+def test_matching_resume_scores_higher_than_a_mismatch():
+    good = score_match("Built Python services on PostgreSQL, shipped with Docker.", JOB)
+    bad = score_match("Graphic designer: Photoshop, Illustrator, branding.", JOB)
+
+    assert good["match_score"] > bad["match_score"]
+    assert good["missing_skills"] == ["Kubernetes"]
+
+
+def test_profile_skills_count_as_the_candidates():
+    result = score_match("Built Python services.", JOB, "PostgreSQL, Docker, Kubernetes")
+    assert result["missing_skills"] == []
+
+
+def test_result_has_the_job_match_response_shape():
+    from app.api.routes_job_match import JobMatchResponse
+
+    JobMatchResponse.model_validate(score_match("Python", JOB))
+
+
+def test_ambiguous_short_skill_names_need_context():
+    assert "go" not in extract_skills("We go the extra mile for customers.")
+
+
+def test_generic_words_weigh_less_than_skills():
+    from app.services.match_scoring import text_similarity
+
+    job = "5+ years of strong experience with Kubernetes."
+    generic = text_similarity("Designer with years of strong experience.", job)
+    specific = text_similarity("Ran Kubernetes clusters.", job)
+
+    assert generic < 0.05 < specific
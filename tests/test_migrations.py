@@ -0,0 +1,79 @@
+from sqlalchemy import create_engine, inspect, text
+from sqlmodel import SQLModel
+
+from app.migrations import load_migrations
+
+# Schema the original startup create_all() made, before any migrations
+LEGACY_SCHEMA = [
+    """CREATE TABLE user (
+        id INTEGER NOT NULL, email VARCHAR NOT NULL,
+        hashed_password VARCHAR NOT NULL, created_at DATETIME NOT NULL,
+        PRIMARY KEY (id))""",
+    "CREATE UNIQUE INDEX ix_user_email ON user (email)",
+    """CREATE TABLE usagelog (
+        id INTEGER NOT NULL, user_id INTEGER NOT NULL, action VARCHAR NOT NULL,
+        timestamp DATETIME NOT NULL, PRIMARY KEY (id))""",
+    "CREATE INDEX ix_usagelog_timestamp ON usagelog (timestamp)",
+    "CREATE INDEX ix_usagelog_user_id ON usagelog (user_id)",
+    "CREATE INDEX ix_usagelog_action ON usagelog (action)",
+    """CREATE TABLE resume (
+        id INTEGER NOT NULL, user_id INTEGER NOT NULL,
+        original_filename VARCHAR NOT NULL, content_type VARCHAR,
+        extracted_text VARCHAR NOT NULL, created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL, PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES user (id))""",
+    """CREATE TABLE userprofile (
+        id INTEGER NOT NULL, user_id INTEGER NOT NULL, experience_level VARCHAR,
+        preferred_roles VARCHAR, preferred_industries VARCHAR,
+        preferred_locations VARCHAR, skills VARCHAR, work_authorization VARCHAR,
+        career_goal VARCHAR, created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL, PRIMARY KEY (id),
+        FOREIGN KEY(user_id) REFERENCES user (id))""",
+    "CREATE UNIQUE INDEX ix_userprofile_user_id ON userprofile (user_id)",
+]
+
+
+def _schema(engine):
+    inspector = inspect(engine)
+    return {
+        table: {
+            "columns": sorted(
+                (col["name"], str(col["type"]), col["nullable"])
+                for col in inspector.get_columns(table)
+            ),
+            "indexes": sorted(
+                (ix["name"], tuple(ix["column_names"]), bool(ix["unique"]))
+                for ix in inspector.get_indexes(table)
+            ),
+            "primary_key": inspector.get_pk_constraint(table)["constrained_columns"],
+        }
+        for table in inspector.get_table_names()
+        if table != "schemaversion"
+    }
+
+
+def test_legacy_database_migrates_to_the_model_schema(tmp_path):
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as conn:
+        for statement in LEGACY_SCHEMA:
+            conn.execute(text(statement))
+    for migration in load_migrations():
+        with legacy.begin() as conn:
+            migration.upgrade(conn)
+
+    new = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    SQLModel.metadata.create_all(new)
+
+    assert _schema(legacy) == _schema(new)
+
+
+def test_baseline_does_not_depend_on_the_models(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    baseline = load_migrations()[0]
+    with engine.begin() as conn:
+        baseline.upgrade(conn)
+
+    tables = set(inspect(engine).get_table_names())
+    # Added by later migrations, so the baseline must not create it
+    assert "backgroundjob" not in tables
+    assert "tier" not in {col["name"] for col in inspect(engine).get_columns("user")}
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import routes_auth
+from app.api.routes_health import router as health_router
+from app.models import User
+from app.services import model_router
+from app.services.llm_cache import make_cache_key
+from app.services.model_router import cache_model_key, select_models, set_user_tier
+
+
+@pytest.fixture
+def tier():
+    yield set_user_tier
+    set_user_tier(None)
+
+
+def _job_match_key():
+    return make_cache_key("job_match", cache_model_key("job_match"), "1", "resume", "job")
+
+
+def test_light_model_answers_are_not_shared_with_pro_users(tier):
+    tier("free")
+    # A small free-tier prompt is answered by the light model ...
+    assert select_models("job_match", 100)[0] == "gpt-4.1-nano"
+    free_key = _job_match_key()
+
+    tier("pro")
+    # ... which pro users never get, although job_match has no pro model
+    assert "gpt-4.1-nano" not in select_models("job_match", 100)
+    assert _job_match_key() != free_key
+
+
+def test_policy_change_invalidates_cache_keys(tier, monkeypatch):
+    tier("free")
+    before = cache_model_key("job_match")
+
+    policy = model_router.ROUTE_POLICIES["job_match"]
+    monkeypatch.setitem(
+        model_router.ROUTE_POLICIES,
+        "job_match",
+        model_router.RoutePolicy(**{**policy.__dict__, "light_max_input_tokens": 500}),
+    )
+
+    assert cache_model_key("job_match") != before
+
+
+def test_model_stats_are_admin_only(monkeypatch):
+    monkeypatch.setattr(routes_auth, "ADMIN_EMAILS", {"ops@example.com"})
+    route = next(r for r in health_router.routes if r.path == "/models")
+    assert any(d.dependency is routes_auth.get_admin_user for d in route.dependencies)
+
+    with pytest.raises(HTTPException) as caught:
+        asyncio.run(routes_auth.get_admin_user(User(email="user@example.com")))
+    assert caught.value.status_code == 403
+
+    admin = User(email="Ops@example.com")
+    assert asyncio.run(routes_auth.get_admin_user(admin)) is admin
@@ -0,0 +1,32 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import password_hashing
+from app.services.password_hashing import hash_password, verify_and_update
+
+
+def test_hash_and_verify_in_the_pool():
+    async def run():
+        hashed = await hash_password("correct horse")
+        assert await verify_and_update("correct horse", hashed) == (True, None)
+        assert (await verify_and_update("wrong", hashed))[0] is False
+
+    asyncio.run(run())
+
+
+def test_broken_pool_is_shut_down_and_replaced():
+    async def run():
+        broken = password_hashing._get_executor()
+        with pytest.raises(HTTPException) as exc:
+            # Kills the worker process, like the OS would
+            await password_hashing._run(os._exit, 1)
+        assert exc.value.status_code == 503
+        assert password_hashing._executor is None
+        assert broken._shutdown_thread
+
+        assert await hash_password("still works")
+
+    asyncio.run(run())
@@ -0,0 +1,59 @@
+from app.services.prompt_builder import compress_job_description
+
+REQUIREMENTS_JD = """Senior Backend Engineer
+
+Requirements:
+- 5+ years of Python experience
+- Production experience with PostgreSQL
+- Must pass a background check
+- Strong communication skills
+
+What you will do:
+- Design and run our payments APIs
+- We are an equal opportunity employer
+- Mentor other engineers"""
+
+
+def test_boilerplate_bullet_keeps_the_rest_of_its_list():
+    compressed = compress_job_description(REQUIREMENTS_JD, 1500)
+
+    assert "background check" not in compressed
+    assert "equal opportunity" not in compressed
+    for kept in (
+        "Senior Backend Engineer",
+        "Requirements:",
+        "- 5+ years of Python experience",
+        "- Production experience with PostgreSQL",
+        "- Strong communication skills",
+        "- Design and run our payments APIs",
+        "- Mentor other engineers",
+    ):
+        assert kept in compressed
+
+
+def test_boilerplate_sentence_keeps_the_rest_of_its_line():
+    jd = (
+        "About us\n"
+        "We build payroll software for small businesses. We are an equal "
+        "opportunity employer and value diversity. Our team is fully remote."
+    )
+    compressed = compress_job_description(jd, 1500)
+
+    assert compressed == (
+        "About us\n"
+        "We build payroll software for small businesses. Our team is fully remote."
+    )
+
+
+def test_boilerplate_only_paragraph_is_dropped():
+    jd = (
+        "Build data pipelines in Python.\n\n"
+        "All qualified applicants will receive consideration without regard "
+        "to race, color, religion, sex, sexual orientation or gender identity."
+    )
+    assert compress_job_description(jd, 1500) == "Build data pipelines in Python."
+
+
+def test_benefits_block_is_dropped():
+    jd = "Requirements:\n- Go and Kubernetes\n\nBenefits:\n\n- Free lunch\n- Gym"
+    assert compress_job_description(jd, 1500) == "Requirements:\n- Go and Kubernetes"
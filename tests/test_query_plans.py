@@ -0,0 +1,212 @@
+"""
+EXPLAIN checks for the hot-path queries: each must use its index (and the
+count / id lookups must be index-only) on a seeded database.
+
+- SQLite: always, on QUERY_PLAN_ROWS rows per table (default 20k; plans
+  don't change with size after ANALYZE, set 1000000 to check anyway)
+- Postgres: only with TEST_POSTGRES_URL set. It must be a throwaway
+  database: the tables are created, seeded and dropped.
+"""
+
+import os
+import random
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select, text
+from sqlmodel import SQLModel
+
+from app.models import EmbeddingChunk, Resume, UsageLog
+
+ROWS = int(os.getenv("QUERY_PLAN_ROWS", "20000"))
+USERS = max(1, ROWS // 3)
+ACTIONS = ["job_match_saved", "tailor_saved", "cover_letter_saved", "resume_improve"]
+
+# name -> (statement, plan text per dialect that must appear, must not appear)
+QUERIES = {
+    "quota count": (
+        select(func.count())
+        .select_from(UsageLog)
+        .where(UsageLog.user_id == 42)
+        .where(UsageLog.action == "job_match_saved")
+        .where(UsageLog.timestamp >= datetime(2026, 10, 18)),
+        {
+            "sqlite": "USING COVERING INDEX ix_usagelog_user_id_action_timestamp",
+            "postgresql": "Index Only Scan using ix_usagelog_user_id_action_timestamp",
+        },
+        None,
+    ),
+    "resume ids": (
+        select(Resume.id).where(Resume.user_id == 42),
+        {
+            "sqlite": "USING COVERING INDEX ix_resume_user_id_updated_at",
+            "postgresql": "Index Only Scan using ix_resume_user_id_updated_at",
+        },
+        None,
+    ),
+    "newest resume": (
+        select(Resume)
+        .where(Resume.user_id == 42)
+        .order_by(Resume.updated_at.desc())
+        .limit(1),
+        {
+            "sqlite": "USING INDEX ix_resume_user_id_updated_at",
+            "postgresql": "using ix_resume_user_id_updated_at",
+        },
+        {"sqlite": "TEMP B-TREE", "postgresql": "Sort"},
+    ),
+    "resume chunks": (
+        select(EmbeddingChunk)
+        .where(EmbeddingChunk.owner_type == "resume")
+        .where(EmbeddingChunk.user_id == 42)
+        .where(EmbeddingChunk.backend == "hashing"),
+        {
+            "sqlite": "USING INDEX ix_embeddingchunk_user",
+            "postgresql": "ix_embeddingchunk_user",
+        },
+        None,
+    ),
+    "chunks of one owner": (
+        select(EmbeddingChunk.id)
+        .where(EmbeddingChunk.owner_type == "resume")
+        .where(EmbeddingChunk.owner_id == 4242),
+        {
+            "sqlite": "USING COVERING INDEX ix_embeddingchunk_owner",
+            "postgresql": "ix_embeddingchunk_owner",
+        },
+        None,
+    ),
+}
+
+
+def _seed_sqlite(conn) -> None:
+    rnd = random.Random(1)
+    conn.exec_driver_sql(
+        'INSERT INTO "user" (id, email, hashed_password, created_at, tier) '
+        "VALUES (?, ?, 'x', '2026-10-01', 'free')",
+        [(i, f"user{i}@example.com") for i in range(1, USERS + 1)],
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO usagelog (user_id, action, timestamp) VALUES (?, ?, ?)",
+        [
+            (
+                rnd.randint(1, USERS),
+                rnd.choice(ACTIONS),
+                f"2026-10-{rnd.randint(1, 18):02d} 12:00:00",
+            )
+            for _ in range(ROWS)
+        ],
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO resume (user_id, original_filename, extracted_text, "
+        "created_at, updated_at) VALUES (?, 'cv.pdf', 'text', '2026-10-01', ?)",
+        [
+            (rnd.randint(1, USERS), f"2026-10-{rnd.randint(1, 18):02d} 12:00:00")
+            for _ in range(ROWS)
+        ],
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO embeddingchunk (owner_type, owner_id, user_id, section, "
+        "text, backend, vector, created_at) "
+        "VALUES ('resume', ?, ?, 'skills', 'x', 'hashing', x'', '2026-10-01')",
+        [(rnd.randint(1, ROWS), rnd.randint(1, USERS)) for _ in range(ROWS)],
+    )
+    conn.exec_driver_sql("ANALYZE")
+
+
+def _seed_postgres(conn) -> None:
+    conn.execute(
+        text(
+            'INSERT INTO "user" (id, email, hashed_password, created_at, tier) '
+            "SELECT i, 'user' || i || '@example.com', 'x', '2026-10-01', 'free' "
+            "FROM generate_series(1, :users) AS i"
+        ),
+        {"users": USERS},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO usagelog (user_id, action, timestamp) "
+            "SELECT 1 + (random() * (:users - 1))::int, "
+            "(ARRAY['job_match_saved', 'tailor_saved', 'cover_letter_saved', "
+            "'resume_improve'])[1 + (random() * 3)::int], "
+            "timestamp '2026-10-01' + random() * interval '18 days' "
+            "FROM generate_series(1, :rows)"
+        ),
+        {"users": USERS, "rows": ROWS},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO resume (user_id, original_filename, extracted_text, "
+            "created_at, updated_at) "
+            "SELECT 1 + (random() * (:users - 1))::int, 'cv.pdf', 'text', "
+            "timestamp '2026-10-01', timestamp '2026-10-01' + random() * interval '18 days' "
+            "FROM generate_series(1, :rows)"
+        ),
+        {"users": USERS, "rows": ROWS},
+    )
+    conn.execute(
+        text(
+            "INSERT INTO embeddingchunk (owner_type, owner_id, user_id, section, "
+            "text, backend, vector, created_at) "
+            "SELECT 'resume', 1 + (random() * (:rows - 1))::int, "
+            "1 + (random() * (:users - 1))::int, 'skills', 'x', 'hashing', "
+            "'', timestamp '2026-10-01' "
+            "FROM generate_series(1, :rows)"
+        ),
+        {"users": USERS, "rows": ROWS},
+    )
+
+
+@pytest.fixture(scope="module", params=["sqlite", "postgresql"])
+def seeded(request, tmp_path_factory):
+    if request.param == "sqlite":
+        path = tmp_path_factory.mktemp("plans") / "plans.db"
+        engine = create_engine(f"sqlite:///{path}")
+    else:
+        url = os.getenv("TEST_POSTGRES_URL")
+        if not url:
+            pytest.skip("TEST_POSTGRES_URL not set")
+        engine = create_engine(url)
+
+    SQLModel.metadata.create_all(engine)
+    try:
+        with engine.begin() as conn:
+            if engine.dialect.name == "sqlite":
+                _seed_sqlite(conn)
+            else:
+                _seed_postgres(conn)
+        if engine.dialect.name == "postgresql":
+            # Index-only scans need the visibility map VACUUM builds
+            with engine.connect() as conn:
+                conn.execution_options(isolation_level="AUTOCOMMIT").execute(
+                    text("VACUUM ANALYZE")
+                )
+        yield engine
+    finally:
+        if engine.dialect.name == "postgresql":
+            SQLModel.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def _plan(engine, statement) -> str:
+    sql = str(
+        statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+    )
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+            return "\n".join(row[-1] for row in rows)
+        rows = conn.exec_driver_sql(f"EXPLAIN {sql}").all()
+        return "\n".join(row[0] for row in rows)
+
+
+@pytest.mark.parametrize("name", list(QUERIES))
+def test_query_uses_its_index(seeded, name):
+    statement, expected, unwanted = QUERIES[name]
+    dialect = seeded.dialect.name
+
+    plan = _plan(seeded, statement)
+
+    assert expected[dialect] in plan, plan
+    if unwanted is not None:
+        assert unwanted[dialect] not in plan, plan
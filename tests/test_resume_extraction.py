@@ -0,0 +1,48 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import resume_extraction
+from app.services.resume_extraction import extract_text_from_file, run_parser
+from benchmarks.documents import make_pdf, make_txt, upload
+
+
+def _extract(filename, data, content_type=""):
+    return asyncio.run(extract_text_from_file(upload(filename, data, content_type)))
+
+
+def test_pdf_text_is_extracted_page_by_page():
+    text = _extract("resume.pdf", make_pdf(3, lines=2))
+    assert "Page 0 line 0" in text
+    assert "Page 2 line 1" in text
+
+
+def test_pdf_over_page_limit_is_rejected_before_parsing():
+    with pytest.raises(HTTPException) as exc:
+        _extract("resume.pdf", make_pdf(resume_extraction.MAX_PDF_PAGES + 1, lines=1))
+    assert exc.value.status_code == 413
+
+
+def test_upload_over_byte_limit_is_rejected(monkeypatch):
+    monkeypatch.setattr(resume_extraction, "MAX_UPLOAD_BYTES", 1024)
+    with pytest.raises(HTTPException) as exc:
+        _extract("resume.txt", make_txt(100))
+    assert exc.value.status_code == 413
+
+
+def test_broken_pool_is_shut_down_and_replaced():
+    async def run():
+        broken = resume_extraction._get_executor()
+        with pytest.raises(HTTPException) as exc:
+            # Kills the worker process, like the OS would
+            await run_parser(os._exit, 1)
+        assert exc.value.status_code == 400
+        assert resume_extraction._executor is None
+        assert broken._shutdown_thread
+
+        text = await extract_text_from_file(upload("resume.txt", b"still works"))
+        assert text == "still works"
+
+    asyncio.run(run())
@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+from app.startup_profile import STARTUP_BUDGET_MS, ready_time_ms
+
+# Loaded on first use only (first AI call, upload, login or vector search)
+LAZY_PACKAGES = ["openai", "docx", "pypdf", "jose", "passlib", "numpy", "hnswlib"]
+
+
+def test_app_import_leaves_heavy_packages_for_first_use():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, app.main; "
+            f"print(' '.join(m for m in {LAZY_PACKAGES!r} if m in sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.split() == []
+
+
+def test_time_to_first_ready_response_is_within_budget():
+    ready_ms, runs = ready_time_ms()
+    assert ready_ms <= STARTUP_BUDGET_MS, (
+        f"median {ready_ms:.0f} ms over the {STARTUP_BUDGET_MS:.0f} ms budget "
+        f"(runs: {', '.join(f'{ms:.0f}' for ms in runs)})"
+    )
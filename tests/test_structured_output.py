@@ -0,0 +1,69 @@
+import pytest
+
+from app.api.routes_cover_letter import CoverLetterDraft
+from app.api.routes_job_match import JobMatchAnalysis
+from app.api.routes_resume import ImprovedVersions
+from app.services.structured_output import (
+    StructuredOutputError,
+    parse_structured,
+    strip_code_fences,
+)
+from benchmarks.model_outputs import ANSWERS, corpus
+
+MODELS = {"match": JobMatchAnalysis, "cover": CoverLetterDraft, "improve": ImprovedVersions}
+
+# (name, kind) -> fields a repair call asks for again; None = full retry.
+# Anything not listed must parse as is.
+NEEDS_REPAIR = {
+    ("match", "single_quotes"): None,
+    ("cover", "single_quotes"): None,
+    ("improve", "single_quotes"): None,
+    # Only complete string fields survive a cut-off answer
+    ("match", "truncated"): None,
+    ("cover", "truncated"): None,
+    ("improve", "truncated"): ["version3"],
+    ("match", "missing_score"): ["match_score"],
+    ("improve", "empty_version"): ["version2"],
+    ("improve", "missing_version"): ["version3"],
+    ("cover", "wrong_key"): None,
+    ("cover", "empty"): None,
+}
+
+
+@pytest.mark.parametrize(
+    "name, kind, raw", corpus(), ids=[f"{name}-{kind}" for name, kind, _ in corpus()]
+)
+def test_malformed_output(name, kind, raw):
+    model = MODELS[name]
+    answer, _ = ANSWERS[name]
+
+    if (name, kind) not in NEEDS_REPAIR:
+        parsed = parse_structured(raw, model)
+        if kind == "score_as_string":
+            answer = {**answer, "match_score": 85}
+        elif kind == "bad_unicode_escape":
+            answer = {"cover_letter": "\\uZZZZ " + answer["cover_letter"]}
+        assert parsed == model.model_validate(answer)
+        return
+
+    with pytest.raises(StructuredOutputError) as caught:
+        parse_structured(raw, model)
+
+    expected = NEEDS_REPAIR[(name, kind)]
+    if expected is None:
+        assert sorted(caught.value.failed_fields) == sorted(model.model_fields)
+        assert caught.value.partial == {}
+    else:
+        assert caught.value.failed_fields == expected
+        # Everything else is kept, so the repair call only asks for `expected`
+        assert caught.value.partial == {
+            key: value for key, value in answer.items() if key not in expected
+        }
+
+
+@pytest.mark.parametrize(
+    "raw",
+    ["JANE DOE\nEngineer", "```\nJANE DOE\nEngineer\n```", "  ```text\nJANE DOE\nEngineer\n```\n"],
+)
+def test_plain_text_output_loses_its_fences(raw):
+    assert strip_code_fences(raw) == "JANE DOE\nEngineer"
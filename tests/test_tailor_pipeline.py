@@ -0,0 +1,116 @@
+import asyncio
+import os
+
+import pytest
+from sqlmodel import select
+
+from app.api import routes_tailored_resume
+from app.models import UsageCounter, UserJobDescription
+from app.services.job_descriptions import PostingAnalysis, job_description_hash
+
+RESUME = "Jane Doe\n\nEXPERIENCE\n" + "\n".join(
+    f"- Built Python service {i} on PostgreSQL and Docker" for i in range(20)
+)
+ANALYSIS = {
+    "title": "Backend Engineer",
+    "company": "Acme",
+    "seniority": "senior",
+    "summary": "Payments APIs.",
+    "required_skills": ["Python", "PostgreSQL"],
+    "nice_to_have_skills": [],
+    "keywords": ["payments"],
+}
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    """Stand-in LLM stages; returns the list of calls made."""
+    calls = []
+
+    async def analyze_posting(text):
+        calls.append("jd_analysis")
+        return PostingAnalysis(job_description_hash(text), text, ANALYSIS)
+
+    async def stream_chat_completion(route, messages, **kwargs):
+        calls.append(route)
+        yield RESUME + "\n" + routes_tailored_resume.CHANGES_MARKER + "\nBetter."
+
+    monkeypatch.setattr(routes_tailored_resume, "analyze_posting", analyze_posting)
+    monkeypatch.setattr(
+        routes_tailored_resume, "stream_chat_completion", stream_chat_completion
+    )
+    return calls
+
+
+def _analyses_used(db, user_id):
+    db.expire_all()
+    return db.exec(
+        select(UsageCounter.count).where(
+            UsageCounter.user_id == user_id,
+            UsageCounter.action == "job_description_analyze",
+        )
+    ).first() or 0
+
+
+def test_new_posting_is_analyzed_once_and_charged(db, make_user, llm_calls):
+    user_id = make_user()
+    posting = f"Senior backend engineer {os.urandom(4).hex()}: Python, PostgreSQL."
+
+    first = asyncio.run(
+        routes_tailored_resume._generate_tailored(user_id, RESUME, posting)
+    )
+    # Fit is scored locally: the only LLM calls are the analysis and the rewrite
+    assert llm_calls == ["jd_analysis", "tailor"]
+    assert first.initial_match.provisional
+    assert _analyses_used(db, user_id) == 1
+    assert db.exec(
+        select(UserJobDescription).where(UserJobDescription.user_id == user_id)
+    ).first() is not None
+
+    llm_calls.clear()
+    asyncio.run(routes_tailored_resume._generate_tailored(user_id, RESUME, posting))
+    # The stored analysis is reused (the rewrite is cached too)
+    assert llm_calls == []
+    assert _analyses_used(db, user_id) == 1
+
+
+def test_given_analysis_is_used_as_is(db, make_user, llm_calls):
+    user_id = make_user()
+    analysis = f"Title: Backend Engineer {os.urandom(4).hex()}\nRequired skills: Python"
+
+    asyncio.run(
+        routes_tailored_resume._generate_tailored(
+            user_id, RESUME, analysis, analyzed=True
+        )
+    )
+    assert llm_calls == ["tailor"]
+    assert _analyses_used(db, user_id) == 0
+
+
+def test_stream_keeps_no_slot_when_setup_fails(db, make_user, monkeypatch):
+    from app.models import Resume, User
+
+    user_id = make_user()
+    db.add(Resume(user_id=user_id, original_filename="cv.txt", extracted_text=RESUME))
+    db.commit()
+
+    def broken_focus(*args):
+        raise RuntimeError("embedding backend down")
+
+    monkeypatch.setattr(routes_tailored_resume, "_focus_sections", broken_focus)
+    payload = routes_tailored_resume.TailorFromSavedRequest(
+        job_description=f"Backend engineer {os.urandom(4).hex()}: Python."
+    )
+    with pytest.raises(RuntimeError):
+        routes_tailored_resume.tailor_resume_from_saved_stream(
+            payload, db.get(User, user_id), db
+        )
+
+    db.expire_all()
+    assert not db.exec(
+        select(UsageCounter.count).where(
+            UsageCounter.user_id == user_id,
+            UsageCounter.action == "tailor_saved",
+            UsageCounter.count > 0,
+        )
+    ).first()
@@ -0,0 +1,65 @@
+import asyncio
+import os
+import tracemalloc
+
+import pytest
+from fastapi import HTTPException
+
+from app.services import resume_extraction
+from app.services.resume_extraction import extract_text_from_file, spool_upload
+from benchmarks.documents import make_pdf, upload
+
+MB = 1024 * 1024
+
+
+def _peak(coro_factory):
+    """Peak traced memory (bytes) while running the coroutine, and its result."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        result = asyncio.run(coro_factory())
+    except HTTPException as exc:
+        result = exc
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak, result
+
+
+async def _spool(file):
+    path, size = await spool_upload(file)
+    os.unlink(path)
+    return size
+
+
+@pytest.mark.parametrize("size_mb", [4, 40])
+def test_spooling_memory_does_not_grow_with_upload_size(monkeypatch, size_mb):
+    monkeypatch.setattr(resume_extraction, "MAX_UPLOAD_BYTES", 100 * MB)
+    asyncio.run(_spool(upload("warm.txt", b"x")))
+    file = upload("resume.txt", b"x" * (size_mb * MB))
+
+    peak, size = _peak(lambda: _spool(file))
+
+    assert size == size_mb * MB
+    assert peak < 1 * MB
+
+
+def test_oversized_upload_is_rejected_without_buffering_it():
+    file = upload("resume.txt", b"x" * (50 * MB))
+
+    peak, result = _peak(lambda: extract_text_from_file(file))
+
+    assert isinstance(result, HTTPException) and result.status_code == 413
+    assert peak < 1 * MB
+
+
+def test_pdf_is_parsed_outside_the_api_process():
+    data = make_pdf(20, lines=200)
+    file = upload("resume.pdf", data)
+    asyncio.run(extract_text_from_file(upload("warm.pdf", make_pdf(1))))
+
+    peak, text = _peak(lambda: extract_text_from_file(file))
+
+    assert "Page 19" in text
+    # Only the extracted text comes back; the PDF is never loaded here
+    assert peak < 3 * len(text.encode()) + 512 * 1024
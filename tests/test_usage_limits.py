@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import Session, select
+
+from app.database import engine
+from app.models import UsageCounter
+from app.services.usage_limits import reserve_available_usage, reserve_usage
+
+
+def test_reserve_available_usage_clamps_to_the_slots_left(db, make_user):
+    user_id = make_user()
+    reserve_usage(db, user_id, "job_match_saved", count=7, limit=10)
+
+    reservation = reserve_available_usage(db, user_id, "job_match_saved", count=5, limit=10)
+    assert reservation.pending == 3
+
+    empty = reserve_available_usage(db, user_id, "job_match_saved", count=5, limit=10)
+    assert empty.pending == 0
+
+    with pytest.raises(HTTPException) as exc_info:
+        reserve_usage(db, user_id, "job_match_saved", limit=10)
+    assert exc_info.value.status_code == 429
+
+    # Given back slots can be taken again
+    reservation.release(2)
+    assert reserve_available_usage(db, user_id, "job_match_saved", count=5, limit=10).pending == 2
+
+
+def _in_threads(calls, worker):
+    """Run `worker` in `calls` threads released at the same moment."""
+    barrier = Barrier(calls)
+
+    def run(_):
+        barrier.wait()
+        return worker()
+
+    with ThreadPoolExecutor(max_workers=calls) as pool:
+        return list(pool.map(run, range(calls)))
+
+
+def _counter(db, user_id, action):
+    db.expire_all()
+    return db.exec(
+        select(UsageCounter.count).where(
+            UsageCounter.user_id == user_id, UsageCounter.action == action
+        )
+    ).one()
+
+
+def test_concurrent_reservations_never_exceed_the_limit(db, make_user):
+    user_id = make_user()
+
+    def reserve():
+        with Session(engine) as session:
+            try:
+                reserve_usage(session, user_id, "tailor_saved", limit=5)
+            except HTTPException as exc:
+                return exc.status_code
+            return 200
+
+    statuses = _in_threads(20, reserve)
+
+    assert statuses.count(200) == 5
+    assert statuses.count(429) == 15
+    assert _counter(db, user_id, "tailor_saved") == 5
+
+
+def test_concurrent_partial_reservations_never_exceed_the_limit(db, make_user):
+    user_id = make_user()
+
+    def reserve():
+        with Session(engine) as session:
+            return reserve_available_usage(
+                session, user_id, "job_match_saved", count=3, limit=10
+            ).pending
+
+    taken = _in_threads(10, reserve)
+
+    assert sum(taken) == 10
+    assert _counter(db, user_id, "job_match_saved") == 10
@@ -0,0 +1,68 @@
+from app.models import Resume
+from app.services.tokens import count_tokens
+from app.services.vector_index import relevant_resume_sections, relevant_resume_text
+
+RESUME = """Jane Doe
+jane@example.com
+
+SUMMARY
+Backend engineer who builds Python services.
+
+EXPERIENCE
+Built Django and PostgreSQL services handling payments at scale.
+Ran the Kubernetes clusters and wrote the Terraform for them.
+
+PROJECTS
+Watercolour painting portfolio site with photos of landscapes and flowers.
+Knitting pattern generator for scarves, hats and mittens.
+
+EDUCATION
+BSc Computer Science, University of Somewhere
+
+SKILLS
+Python, Django, PostgreSQL, Kubernetes, Terraform"""
+
+JOB = "Senior Python engineer: Django, PostgreSQL, Kubernetes and Terraform."
+
+
+def _resume(db, user_id):
+    resume = Resume(
+        user_id=user_id,
+        original_filename="resume.txt",
+        content_type="text/plain",
+        extracted_text=RESUME,
+    )
+    db.add(resume)
+    db.commit()
+    db.refresh(resume)
+    return resume
+
+
+def test_relevant_sections_rank_the_matching_ones_first(db, make_user):
+    user_id = make_user()
+    resume = _resume(db, user_id)
+
+    hits = relevant_resume_sections(db, user_id, resume.id, JOB, k=2)
+
+    assert len(hits) == 2
+    assert {hit.section for hit in hits} <= {"experience", "skills"}
+    assert hits[0].score >= hits[1].score
+
+
+def test_relevant_resume_text_fits_the_budget_in_resume_order(db, make_user):
+    user_id = make_user()
+    resume = _resume(db, user_id)
+    budget = count_tokens(RESUME) // 2
+
+    text = relevant_resume_text(db, user_id, resume.id, JOB, budget)
+
+    assert count_tokens(text) <= budget + 10  # plus the section headings
+    assert "Django and PostgreSQL" in text
+    assert "Knitting" not in text
+    assert text.index("EXPERIENCE") < text.index("SKILLS")
+
+
+def test_relevant_resume_text_is_none_for_another_users_resume(db, make_user):
+    resume = _resume(db, make_user())
+
+    assert relevant_resume_text(db, make_user(), resume.id, JOB, 1000) is None